@@ -0,0 +1,15 @@
+"""Benchmarks package - Offline latency and accuracy runs of both agent pipelines."""
+from .fake_llm import ScriptedLlm, scripted_models
+from .harness import GOLDEN_PATH, BenchPlugin, compare, expected_rows, print_summary, run_benchmark, summarize
+
+__all__ = [
+    "ScriptedLlm",
+    "scripted_models",
+    "GOLDEN_PATH",
+    "BenchPlugin",
+    "compare",
+    "expected_rows",
+    "print_summary",
+    "run_benchmark",
+    "summarize",
+]
@@ -0,0 +1,45 @@
+import argparse, asyncio, json, sys
+from . import GOLDEN_PATH, compare, print_summary, run_benchmark
+
+AGENTS = ("crm_agent", "crm_agent_classic")
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(prog="python -m benchmarks", description="Benchmark the agent pipelines offline with a scripted model.")
+    ap.add_argument("--agents", nargs="+", choices=AGENTS, default=list(AGENTS), help="Pipelines to run")
+    ap.add_argument("--golden", default=GOLDEN_PATH, help="Golden question set (JSON)")
+    ap.add_argument("--cases", nargs="+", help="Only these case ids")
+    ap.add_argument("--repeat", type=int, default=3, help="Runs per question and agent")
+    ap.add_argument("--latency", type=float, default=0.0, help="Simulated seconds per model call")
+    ap.add_argument("--cold", action="store_true", help="Clear the result cache before every run")
+    ap.add_argument("--library", action="store_true", help="Let crm_agent_classic reuse verified SQL across repeats")
+    ap.add_argument("--output", help="Write the full report (baseline format) to this JSON file")
+    ap.add_argument("--baseline", help="Compare against a report written by --output")
+    ap.add_argument("--max-regression", type=float, default=0.25, help="Allowed p50 slowdown vs the baseline (0.25 = 25%%)")
+    args = ap.parse_args()
+
+    with open(args.golden, encoding="utf-8") as f:
+        cases = json.load(f)["cases"]
+    if args.cases:
+        cases = [c for c in cases if c["id"] in args.cases]
+    agents = {}
+    if "crm_agent" in args.agents:
+        from crm_agent.agent import root_agent
+        agents["crm_agent"] = root_agent
+    if "crm_agent_classic" in args.agents:
+        from crm_agent_classic.agent import root_agent as classic_agent
+        agents["crm_agent_classic"] = classic_agent
+
+    report = asyncio.run(run_benchmark(agents, cases, args.repeat, args.latency, args.cold, args.library))
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+    print_summary(report, baseline)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    problems = compare(report, baseline, args.max_regression) if baseline else []
+    for p in problems:
+        print(f"REGRESSION {p}")
+    failed = any(r["error"] or not r["correct"] for r in report["runs"])
+    sys.exit(1 if problems or failed else 0)
@@ -0,0 +1,144 @@
+"""Scripted LLM - Deterministic stand-in for Gemini in offline benchmarks.
+
+Every ``LlmAgent`` of a pipeline gets a ``ScriptedLlm`` for its role (the
+agent name). The model finds the golden case whose question appears in
+the request and answers the way a well-behaved model would for that role:
+
+- ``crm_agent``: calls ``get_schema``, then ``run_sql_query`` with the
+  case's ``first_sql`` (if any) and ``sql``, then writes the answer,
+- ``query_analyst``: restates the question as requirements,
+- ``sql_architect``: tries its SQL once through ``run_sql_query``, then
+  returns it as the final answer; speculative candidates other than
+  ``sql_architect_1`` use the case's ``sql`` instead of ``first_sql``,
+- ``sql_debugger``: returns the corrected ``sql``,
+- ``business_analyst``: writes the answer.
+
+The step within a role is the number of tool results in the request
+since the latest question, so the model itself is stateless and
+multi-turn sessions replay correctly. Each call sleeps ``latency``
+seconds and reports token counts estimated from the text length.
+"""
+import asyncio
+import json
+from contextlib import contextmanager
+from typing import Any, AsyncGenerator, Dict, Iterator, List, Tuple
+
+from google.adk.agents import BaseAgent
+from google.adk.agents.llm_agent import LlmAgent
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.adk.planners.plan_re_act_planner import FINAL_ANSWER_TAG, PLANNING_TAG
+from google.genai import types
+
+_CHARS_PER_TOKEN = 4
+
+
+def _tokens(text: str) -> int:
+    return max(1, len(text) // _CHARS_PER_TOKEN) if text else 0
+
+
+def _request_text(llm_request: LlmRequest) -> str:
+    parts = [str(llm_request.config.system_instruction or "")] if llm_request.config else []
+    for content in llm_request.contents:
+        for part in content.parts or []:
+            if part.text:
+                parts.append(part.text)
+            elif part.function_call:
+                parts.append(json.dumps(part.function_call.args or {}))
+            elif part.function_response:
+                parts.append(json.dumps(part.function_response.response or {}, default=str))
+    return "\n".join(parts)
+
+
+class ScriptedLlm(BaseLlm):
+    """Replays the golden-case script for one pipeline role."""
+
+    role: str
+    cases: List[Dict[str, Any]]
+    latency: float = 0.0
+
+    def _case(self, llm_request: LlmRequest) -> Tuple[Dict[str, Any], int]:
+        """The case asked about most recently and the index of the content that asks it."""
+        contents = llm_request.contents
+        for i in range(len(contents) - 1, -1, -1):
+            if contents[i].role != "user":
+                continue
+            for p in contents[i].parts or []:
+                for case in self.cases:
+                    if p.text and case["question"] in p.text:
+                        return case, i
+        instruction = str(llm_request.config.system_instruction or "") if llm_request.config else ""
+        for case in self.cases:
+            if case["question"] in instruction:  # Agents without history get it there
+                return case, len(contents)
+        raise LookupError(f"{self.role}: request matches no golden question")
+
+    def _reply(self, case: Dict[str, Any], step: int) -> types.Content:
+        first = case.get("first_sql") or case["sql"]
+
+        def call(name: str, **args: Any) -> types.Content:
+            return types.Content(role="model", parts=[types.Part(function_call=types.FunctionCall(name=name, args=args))])
+
+        def text(value: str) -> types.Content:
+            return types.Content(role="model", parts=[types.Part(text=value)])
+
+        if self.role == "crm_agent":
+            attempts = [first, case["sql"]] if case.get("first_sql") else [case["sql"]]
+            if step == 0:
+                return call("get_schema")
+            if step <= len(attempts):
+                return call("run_sql_query", sql=attempts[step - 1])
+            return text(case.get("answer", f"Answer: {case['question']}"))
+        if self.role == "query_analyst":
+            return text(f"Requirements: answer '{case['question']}' from the tables it names.")
+        if self.role.startswith("sql_architect"):
+            # Speculative candidates after the first (sql_architect_2, ...) get it right straight away
+            sql = first if self.role in ("sql_architect", "sql_architect_1") else case["sql"]
+            if step == 0:
+                return call("run_sql_query", sql=sql)
+            return text(f"{PLANNING_TAG}\nRun the query.\n{FINAL_ANSWER_TAG}\n{sql}")
+        if self.role == "sql_debugger":
+            return text(case["sql"])
+        if self.role == "business_analyst":
+            return text(case.get("answer", f"Answer: {case['question']}"))
+        raise LookupError(f"No script for agent '{self.role}'")
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        case, asked = self._case(llm_request)
+        # Earlier turns of the session carry their own tool results
+        step = sum(1 for c in llm_request.contents[asked:] for p in c.parts or [] if p.function_response)
+        content = self._reply(case, step)
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        completion = " ".join(p.text or json.dumps(p.function_call.args or {}) for p in content.parts)
+        yield LlmResponse(
+            content=content,
+            usage_metadata=types.GenerateContentResponseUsageMetadata(
+                prompt_token_count=_tokens(_request_text(llm_request)),
+                candidates_token_count=_tokens(completion),
+            ),
+        )
+
+
+def _llm_agents(agent: BaseAgent) -> Iterator[LlmAgent]:
+    if isinstance(agent, LlmAgent):
+        yield agent
+    for sub in agent.sub_agents:
+        yield from _llm_agents(sub)
+
+
+@contextmanager
+def scripted_models(root: BaseAgent, cases: List[Dict[str, Any]], latency: float = 0.0) -> Iterator[None]:
+    """Swap every model in ``root``'s agent tree for a ``ScriptedLlm`` while the block runs."""
+    saved: List[tuple] = []
+    try:
+        for agent in _llm_agents(root):
+            saved.append((agent, agent.model))
+            agent.model = ScriptedLlm(model=f"scripted-{agent.name}", role=agent.name, cases=cases, latency=latency)
+        yield
+    finally:
+        for agent, model in saved:
+            agent.model = model
@@ -0,0 +1,256 @@
+"""Benchmark Harness - Run the agent pipelines over the golden questions offline.
+
+Each golden question is asked ``repeat`` times, each in a fresh session,
+through the real ADK runner with every model replaced by a ``ScriptedLlm``.
+A runner plugin observes the run and records per question:
+
+- wall time, and the share of it spent in SQLite work on the DB threads,
+- model calls and estimated prompt/completion tokens,
+- tool calls, SQL executions and ``sql_loop`` iterations,
+- peak Python heap (``tracemalloc``),
+- whether the last successful query result matches the expected rows,
+  computed by running the case's SQL directly against the database.
+
+``compare`` checks a run against a saved baseline, so CI can fail on a
+latency regression or a lost answer.
+"""
+import os
+import sqlite3
+import statistics
+import time
+import tracemalloc
+import uuid
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from google.adk.agents import BaseAgent
+from google.adk.apps import App
+from google.adk.plugins.base_plugin import BasePlugin
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+
+from crm_agent.config import DB_PATH
+from crm_agent.db import executor_stats, result_cache, sql_library, workload_log
+from crm_agent.tracing import tracer
+from .fake_llm import scripted_models
+
+GOLDEN_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "golden.json")
+_APP = "crm_bench"
+_USER = "bench"
+
+
+class BenchPlugin(BasePlugin):
+    """Counts model/tool activity and captures query results for one run at a time."""
+
+    def __init__(self):
+        super().__init__(name="bench")
+        self.reset()
+
+    def reset(self) -> None:
+        self.llm_calls = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.tool_calls = 0
+        self.loop_iterations = 0
+        self.results: List[Dict[str, Any]] = []
+
+    async def before_agent_callback(self, *, agent, callback_context):
+        if agent.name == "sql_validator_agent":
+            self.loop_iterations += 1
+        return None
+
+    async def after_agent_callback(self, *, agent, callback_context):
+        if agent.name == "sql_executor_agent":
+            res = callback_context.state.get("query_results")
+            if isinstance(res, dict):
+                self.results.append(res)
+        return None
+
+    async def before_model_callback(self, *, callback_context, llm_request):
+        self.llm_calls += 1
+        return None
+
+    async def after_model_callback(self, *, callback_context, llm_response):
+        usage = llm_response.usage_metadata
+        if usage is not None:
+            self.prompt_tokens += usage.prompt_token_count or 0
+            self.completion_tokens += usage.candidates_token_count or 0
+        return None
+
+    async def before_tool_callback(self, *, tool, tool_args, tool_context):
+        self.tool_calls += 1
+        return None
+
+    async def after_tool_callback(self, *, tool, tool_args, tool_context, result):
+        if tool.name == "run_sql_query" and isinstance(result, dict):
+            self.results.append(result)
+            if tool_context.agent_name == "crm_agent":
+                self.loop_iterations += 1  # Each query attempt is one iteration of the agent's own loop
+        return None
+
+
+# ── Correctness ─────────────────────────────────────────────
+def _normalize(rows: Sequence[Sequence[Any]], ordered: bool) -> List[Tuple[Any, ...]]:
+    norm = [tuple(round(v, 6) if isinstance(v, float) else v for v in row) for row in rows]
+    return norm if ordered else sorted(norm, key=repr)
+
+
+def expected_rows(cases: List[Dict[str, Any]], db_path: str = DB_PATH) -> Dict[str, List[Tuple[Any, ...]]]:
+    """Answer of every case, from its SQL run directly on the database (no caches or rewrites)."""
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        return {c["id"]: _normalize(conn.execute(c["sql"]).fetchall(), c.get("ordered", False)) for c in cases}
+    finally:
+        conn.close()
+
+
+def _answer(results: List[Dict[str, Any]]) -> Optional[List[List[Any]]]:
+    for res in reversed(results):
+        if res.get("status") == "success":
+            return res.get("rows", [])
+    return None
+
+
+# ── Runs ────────────────────────────────────────────────────
+async def run_case(runner: InMemoryRunner, plugin: BenchPlugin, case: Dict[str, Any],
+                   expected: List[Tuple[Any, ...]], cold: bool = False) -> Dict[str, Any]:
+    """Ask one golden question in a new session and measure it."""
+    if cold:
+        result_cache.clear()
+    plugin.reset()
+    session = await runner.session_service.create_session(app_name=_APP, user_id=_USER, session_id=uuid.uuid4().hex)
+    message = types.Content(role="user", parts=[types.Part(text=case["question"])])
+    db_before = executor_stats()["run_s"]
+    tracemalloc.reset_peak()
+    error = None
+    started = time.perf_counter()
+    try:
+        async for _ in runner.run_async(user_id=_USER, session_id=session.id, new_message=message):
+            pass
+    except Exception as e:  # A crashed run is a benchmark result, not a harness failure
+        error = f"{type(e).__name__}: {e}"
+    wall = time.perf_counter() - started
+    rows = _answer(plugin.results)
+    return {
+        "case": case["id"],
+        "wall_s": round(wall, 6),
+        "db_s": round(executor_stats()["run_s"] - db_before, 6),
+        "llm_calls": plugin.llm_calls,
+        "prompt_tokens": plugin.prompt_tokens,
+        "completion_tokens": plugin.completion_tokens,
+        "tool_calls": plugin.tool_calls,
+        "sql_runs": len(plugin.results),
+        "loop_iterations": plugin.loop_iterations,
+        "peak_mb": round(tracemalloc.get_traced_memory()[1] / 1e6, 3),
+        "correct": rows is not None and _normalize(rows, case.get("ordered", False)) == expected,
+        "error": error,
+    }
+
+
+async def run_benchmark(
+    agents: Dict[str, BaseAgent], cases: List[Dict[str, Any]], repeat: int = 3, latency: float = 0.0,
+    cold: bool = False, library: bool = False,
+) -> Dict[str, Any]:
+    """Run every case ``repeat`` times through each agent.
+
+    Args:
+        agents: Root agents by report name
+        cases: Golden cases
+        repeat: Runs per case and agent
+        latency: Simulated seconds per model call
+        cold: Clear the result cache before every run
+        library: Keep the verified SQL library on (repeats then reuse SQL)
+
+    Returns:
+        Dictionary with meta, per-run results and a per-agent summary
+    """
+    expected = expected_rows(cases)
+    saved = sql_library.path, workload_log.path, tracer.exporters
+    if not library:
+        sql_library.path = None  # Repeats would otherwise skip SQL generation
+    workload_log.path = None  # Keep benchmark statements out of the advisor's workload
+    tracer.exporters = []  # ... and out of the trace file
+    runs: List[Dict[str, Any]] = []
+    tracing = tracemalloc.is_tracing()
+    if not tracing:
+        tracemalloc.start()
+    try:
+        for name, agent in agents.items():
+            plugin = BenchPlugin()
+            runner = InMemoryRunner(app=App(name=_APP, root_agent=agent, plugins=[plugin]))
+            with scripted_models(agent, cases, latency):
+                for i in range(repeat):
+                    for case in cases:
+                        r = await run_case(runner, plugin, case, expected[case["id"]], cold)
+                        runs.append({"agent": name, "run": i, **r})
+    finally:
+        if not tracing:
+            tracemalloc.stop()
+        sql_library.path, workload_log.path, tracer.exporters = saved
+    return {
+        "meta": {"timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"), "repeat": repeat, "latency_s": latency,
+                 "cold": cold, "library": library, "cases": [c["id"] for c in cases]},
+        "runs": runs,
+        "summary": summarize(runs),
+    }
+
+
+def _pct(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+def summarize(runs: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Per-agent latency percentiles, totals and accuracy."""
+    summary = {}
+    for agent in dict.fromkeys(r["agent"] for r in runs):
+        mine = [r for r in runs if r["agent"] == agent]
+        walls = [r["wall_s"] for r in mine]
+        summary[agent] = {
+            "runs": len(mine),
+            "wall_p50_s": round(statistics.median(walls), 6),
+            "wall_p95_s": round(_pct(walls, 0.95), 6),
+            "wall_total_s": round(sum(walls), 6),
+            "db_total_s": round(sum(r["db_s"] for r in mine), 6),
+            "llm_calls": sum(r["llm_calls"] for r in mine),
+            "prompt_tokens": sum(r["prompt_tokens"] for r in mine),
+            "completion_tokens": sum(r["completion_tokens"] for r in mine),
+            "tool_calls": sum(r["tool_calls"] for r in mine),
+            "loop_iterations": sum(r["loop_iterations"] for r in mine),
+            "peak_mb": max(r["peak_mb"] for r in mine),
+            "accuracy": round(sum(r["correct"] for r in mine) / len(mine), 4),
+            "errors": sum(1 for r in mine if r["error"]),
+        }
+    return summary
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], max_regression: float = 0.25) -> List[str]:
+    """Regressions of ``current`` against ``baseline``: slower p50 wall time, more model calls, lost accuracy."""
+    problems = []
+    for agent, now in current["summary"].items():
+        before = baseline.get("summary", {}).get(agent)
+        if not before:
+            continue
+        if before["wall_p50_s"] and now["wall_p50_s"] > before["wall_p50_s"] * (1 + max_regression):
+            problems.append(f"{agent}: p50 wall time {before['wall_p50_s'] * 1e3:.1f}ms -> {now['wall_p50_s'] * 1e3:.1f}ms")
+        if now["runs"] == before["runs"] and now["llm_calls"] > before["llm_calls"]:
+            problems.append(f"{agent}: model calls {before['llm_calls']} -> {now['llm_calls']}")
+        if now["accuracy"] < before["accuracy"]:
+            problems.append(f"{agent}: accuracy {before['accuracy']:.0%} -> {now['accuracy']:.0%}")
+    return problems
+
+
+def print_summary(report: Dict[str, Any], baseline: Optional[Dict[str, Any]] = None) -> None:
+    """Per-agent table, with the change against ``baseline`` when given."""
+    print(f"{'agent':<20}{'runs':>6}{'p50 ms':>10}{'p95 ms':>10}{'db ms':>9}{'llm':>6}{'tools':>7}"
+          f"{'loops':>7}{'peak MB':>9}{'correct':>9}")
+    for agent, s in report["summary"].items():
+        line = (f"{agent:<20}{s['runs']:>6}{s['wall_p50_s'] * 1e3:>10.1f}{s['wall_p95_s'] * 1e3:>10.1f}"
+                f"{s['db_total_s'] * 1e3:>9.1f}{s['llm_calls']:>6}{s['tool_calls']:>7}{s['loop_iterations']:>7}"
+                f"{s['peak_mb']:>9.2f}{s['accuracy']:>9.0%}")
+        before = (baseline or {}).get("summary", {}).get(agent)
+        if before and before["wall_p50_s"]:
+            line += f"  p50 {(s['wall_p50_s'] / before['wall_p50_s'] - 1):+.0%} vs baseline"
+        print(line)
+    for r in report["runs"]:
+        if r["error"] or not r["correct"]:
+            print(f"  {r['agent']}/{r['case']} run {r['run']}: {r['error'] or 'wrong answer'}")
@@ -1,5 +1,23 @@
+import importlib
+
 from .config import MODEL_NAME, DB_PATH
-from .db import get_schema, run_sql_query
-from .agent import root_agent
 
-__all__ = ["root_agent", "get_schema", "run_sql_query", "MODEL_NAME", "DB_PATH"]
+# Heavy members load on first access (PEP 562), so importing the package,
+# its config or one subpackage does not build the agent or import ADK
+_LAZY_MEMBERS = {
+    "app": ".agent",
+    "root_agent": ".agent",
+    "get_schema": ".db",
+    "run_sql_query": ".db",
+}
+
+
+def __getattr__(name):
+    if name not in _LAZY_MEMBERS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_LAZY_MEMBERS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+__all__ = ["app", "root_agent", "get_schema", "run_sql_query", "MODEL_NAME", "DB_PATH"]
@@ -9,16 +9,30 @@ Instead of a rigid multi-step pipeline, the model autonomously decides:
   4. How to present the final answer
 
 Tools:
-  - get_schema()    → Returns CREATE TABLE statements for all tables
-  - run_sql_query() → Executes read-only SQL and returns results
+  - get_schema()    → Returns a compact schema of the tables relevant to the
+                      question (columns, row counts, small value lists);
+                      pass tables=[...] to describe others
+  - run_sql_query() → Executes read-only SQL and returns bounded results;
+                      the turn's last successful query is kept as a
+                      session result table for follow-ups
 """
 
 import os
 from google.adk.agents.llm_agent import LlmAgent
+from google.adk.apps import App
 from google.adk.planners import BuiltInPlanner
 from google.genai.types import ThinkingConfig
-from .config import MODEL_NAME
-from .db import get_schema, run_sql_query
+from .config import MODEL_NAME, WARMUP
+from .warmup import start_warmup
+from .tools import get_schema, keep_answer, run_sql_query
+from .compaction import CompactionPlugin
+from .tracing import TracingPlugin
+
+# ── Startup Warm-up ─────────────────────────────────────────
+# Caches, connections and the database pages are prepared in the background
+# while the rest of the agent is built and the first request is awaited
+if WARMUP:
+    start_warmup()
 
 # ── Load Instructions ───────────────────────────────────────
 _INSTRUCTION_PATH = os.path.join(os.path.dirname(__file__), "instruction.md")
@@ -43,4 +57,10 @@ root_agent = LlmAgent(
     instruction=_INSTRUCTION,
     planner=planner,
     tools=[get_schema, run_sql_query],
+    after_agent_callback=keep_answer,  # Only the answer's query becomes a session result table
 )
+
+# ── App (plugins) ───────────────────────────────────────────
+# ADK web and runners pick up ``app`` first; plugins trace every stage and
+# compact each finished turn (large tool results are stored by hash)
+app = App(name="crm_agent", root_agent=root_agent, plugins=[TracingPlugin(), CompactionPlugin()])
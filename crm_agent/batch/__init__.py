@@ -0,0 +1,11 @@
+"""Batch package - Answer a file of questions concurrently, streaming JSONL results."""
+from .runner import answer_question, done_ids, load_app, load_questions, run_batch, run_batch_to_file
+
+__all__ = [
+    "answer_question",
+    "done_ids",
+    "load_app",
+    "load_questions",
+    "run_batch",
+    "run_batch_to_file",
+]
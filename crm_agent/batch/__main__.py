@@ -0,0 +1,23 @@
+import argparse, asyncio, json, sys
+from ..config import BATCH_CONCURRENCY, BATCH_RETRIES, BATCH_TIMEOUT_S
+from . import done_ids, load_app, load_questions, run_batch_to_file
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(prog="python -m crm_agent.batch", description="Answer a file of CRM questions concurrently.")
+    ap.add_argument("questions", help="One question per line, or .jsonl objects with 'question' and optional 'id'")
+    ap.add_argument("--agent", choices=("crm_agent", "crm_agent_classic"), default="crm_agent", help="Pipeline to run")
+    ap.add_argument("--concurrency", type=int, default=BATCH_CONCURRENCY, help="Questions answered at once")
+    ap.add_argument("--timeout", type=float, default=BATCH_TIMEOUT_S, help="Seconds allowed per question (0 for no limit)")
+    ap.add_argument("--retries", type=int, default=BATCH_RETRIES, help="Retries after a model rate-limit error")
+    ap.add_argument("--output", help="Append JSONL results here instead of printing them")
+    ap.add_argument("--resume", action="store_true", help="Skip questions already answered in --output")
+    args = ap.parse_args()
+
+    questions = load_questions(args.questions)
+    if args.resume and args.output:
+        done = done_ids(args.output)
+        questions = [q for q in questions if q["id"] not in done]
+    totals = asyncio.run(run_batch_to_file(load_app(args.agent), questions, args.output, args.concurrency,
+                                           args.timeout or None, args.retries))
+    print(json.dumps(totals), file=sys.stderr)
+    sys.exit(0 if totals["success"] == totals["questions"] else 1)
@@ -0,0 +1,213 @@
+"""Batch Runner - Answer many questions concurrently through one ADK app.
+
+All questions share one runner, and with it the process-wide connection
+pool, DB thread pool, schema catalog and result cache; each question
+gets its own session, deleted once answered. Concurrency is bounded by a
+semaphore, so at most ``concurrency`` questions talk to the model at once
+while SQLite work stays on the DB threads (``run_in_db_thread``) and never
+blocks the event loop.
+
+- a question that exceeds ``timeout_s`` is cancelled, which also aborts
+  its running statement through the query guard,
+- a model rate-limit error (HTTP 429 / RESOURCE_EXHAUSTED) is retried in a
+  fresh session after an exponential backoff, holding its slot meanwhile,
+- results are yielded as each question completes, not in input order.
+"""
+import asyncio
+import json
+import os
+import time
+import uuid
+from contextlib import aclosing
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence
+
+from google.adk.apps import App
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+
+from ..config import BATCH_CONCURRENCY, BATCH_RETRIES, BATCH_RETRY_BACKOFF_S, BATCH_TIMEOUT_S
+from ..warmup import start_warmup
+
+_USER = "batch"
+
+
+def load_questions(path: str) -> List[Dict[str, Any]]:
+    """Questions from a file, each as ``{"id", "question"}``.
+
+    ``.jsonl`` files hold one object per line with a ``question`` and an
+    optional ``id``; any other file holds one question per line, with
+    blank lines and ``#`` comments skipped. Missing ids are line numbers.
+    """
+    questions = []
+    with open(path, encoding="utf-8") as f:
+        for n, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            if path.endswith(".jsonl"):
+                item = json.loads(line)
+                questions.append({"id": str(item.get("id", n)), "question": item["question"]})
+            else:
+                questions.append({"id": str(n), "question": line})
+    return questions
+
+
+def _is_rate_limit(error: BaseException) -> bool:
+    return getattr(error, "code", None) == 429 or "RESOURCE_EXHAUSTED" in str(error)
+
+
+def _text(event: Any) -> str:
+    parts = event.content.parts if event.content and event.content.parts else []
+    return "".join(p.text for p in parts if p.text and not p.thought)
+
+
+async def _ask(runner: InMemoryRunner, question: str) -> Dict[str, Any]:
+    """Run one question in a new session; the last final response is the answer."""
+    session = await runner.session_service.create_session(
+        app_name=runner.app_name, user_id=_USER, session_id=uuid.uuid4().hex
+    )
+    message = types.Content(role="user", parts=[types.Part(text=question)])
+    answer, author = "", None
+    try:
+        async with aclosing(runner.run_async(user_id=_USER, session_id=session.id, new_message=message)) as events:
+            async for event in events:
+                if event.is_final_response() and _text(event):
+                    answer, author = _text(event), event.author
+    finally:
+        await runner.session_service.delete_session(app_name=runner.app_name, user_id=_USER, session_id=session.id)
+    return {"answer": answer, "author": author, "session_id": session.id}
+
+
+async def answer_question(
+    runner: InMemoryRunner,
+    item: Dict[str, Any],
+    timeout_s: Optional[float] = BATCH_TIMEOUT_S,
+    retries: int = BATCH_RETRIES,
+    backoff_s: float = BATCH_RETRY_BACKOFF_S,
+) -> Dict[str, Any]:
+    """Answer one ``{"id", "question"}`` item; never raises for a failed question.
+
+    Returns:
+        The item plus status ("success", "timeout" or "error"), answer,
+        author (agent that gave the answer), attempts, elapsed_s and error
+    """
+    result: Dict[str, Any] = {**item, "status": "error", "answer": None, "attempts": 0, "error": None}
+    started = time.perf_counter()
+
+    async def attempts() -> None:
+        for attempt in range(retries + 1):
+            result["attempts"] = attempt + 1
+            try:
+                result.update(await _ask(runner, item["question"]), status="success", error=None)
+                return
+            except Exception as e:
+                result["error"] = f"{type(e).__name__}: {e}"
+                if attempt == retries or not _is_rate_limit(e):
+                    return
+                await asyncio.sleep(backoff_s * 2 ** attempt)
+
+    try:
+        await asyncio.wait_for(attempts(), timeout_s)
+    except asyncio.TimeoutError:
+        result.update(status="timeout", error=f"No answer within {timeout_s:g}s")
+    result["elapsed_s"] = round(time.perf_counter() - started, 3)
+    return result
+
+
+async def run_batch(
+    app: App,
+    questions: Sequence[Dict[str, Any]],
+    concurrency: int = BATCH_CONCURRENCY,
+    timeout_s: Optional[float] = BATCH_TIMEOUT_S,
+    retries: int = BATCH_RETRIES,
+) -> AsyncIterator[Dict[str, Any]]:
+    """Answer ``questions`` with at most ``concurrency`` in flight, yielding each result as it completes.
+
+    Args:
+        app: ADK app to run (e.g. ``crm_agent.app`` or ``crm_agent_classic.app``)
+        questions: Items with ``id`` and ``question`` (see ``load_questions``)
+        concurrency: Questions answered at once
+        timeout_s: Per-question limit in seconds (None for no limit)
+        retries: Extra attempts after a model rate-limit error
+
+    Closing the iterator early cancels the questions still running.
+    """
+    runner = InMemoryRunner(app=app)
+    # Warm the shared caches once instead of in every first question at once
+    await asyncio.to_thread(start_warmup().join)
+    slots = asyncio.Semaphore(max(1, concurrency))
+
+    async def bounded(item: Dict[str, Any]) -> Dict[str, Any]:
+        async with slots:
+            return await answer_question(runner, item, timeout_s, retries)
+
+    tasks = [asyncio.create_task(bounded(item)) for item in questions]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await runner.close()
+
+
+async def run_batch_to_file(
+    app: App,
+    questions: Sequence[Dict[str, Any]],
+    output: Optional[str] = None,
+    concurrency: int = BATCH_CONCURRENCY,
+    timeout_s: Optional[float] = BATCH_TIMEOUT_S,
+    retries: int = BATCH_RETRIES,
+) -> Dict[str, Any]:
+    """Stream ``run_batch`` results as JSON lines to ``output`` (stdout if None).
+
+    Returns:
+        Totals: questions, success, timeout, error, wall_s and questions_per_s
+    """
+    totals: Dict[str, Any] = {"questions": len(questions), "success": 0, "timeout": 0, "error": 0}
+    started = time.perf_counter()
+    f = open(output, "a", encoding="utf-8") if output else None
+    try:
+        async for result in run_batch(app, questions, concurrency, timeout_s, retries):
+            totals[result["status"]] += 1
+            line = json.dumps(result, default=str)
+            if f is not None:
+                f.write(line + "\n")
+                f.flush()
+            else:
+                print(line, flush=True)
+    finally:
+        if f is not None:
+            f.close()
+    wall = time.perf_counter() - started
+    totals["wall_s"] = round(wall, 3)
+    totals["questions_per_s"] = round(len(questions) / wall, 3) if wall else 0.0
+    return totals
+
+
+def load_app(name: str) -> App:
+    """The ``app`` of the ``crm_agent`` or ``crm_agent_classic`` package."""
+    if name == "crm_agent":
+        from .. import app
+        return app
+    if name == "crm_agent_classic":
+        from crm_agent_classic import app
+        return app
+    raise ValueError(f"Unknown agent '{name}' (expected crm_agent or crm_agent_classic)")
+
+
+def done_ids(path: str) -> set:
+    """Ids already answered successfully in an existing output file, for resuming a batch."""
+    if not os.path.isfile(path):
+        return set()
+    ids = set()
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                result = json.loads(line)
+            except ValueError:
+                continue
+            if result.get("status") == "success":
+                ids.add(str(result.get("id")))
+    return ids
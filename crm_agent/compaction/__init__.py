@@ -0,0 +1,16 @@
+"""Compaction package - Content-addressed artifacts and per-turn session compaction."""
+from .blobs import BlobStore, blob_store, is_ref
+from .compactor import compact_turn, enforce_budget, event_bytes, superseded, turn_starts
+from .plugin import CompactionPlugin
+
+__all__ = [
+    "BlobStore",
+    "blob_store",
+    "is_ref",
+    "compact_turn",
+    "enforce_budget",
+    "event_bytes",
+    "superseded",
+    "turn_starts",
+    "CompactionPlugin",
+]
@@ -0,0 +1,82 @@
+"""Blob Store - Content-addressed storage for large session artifacts.
+
+Result sets, schema text and long tool outputs are stored once under the
+hash of their canonical JSON form; compacted events keep only the
+reference (``blob:<hash>``). Identical payloads from different turns or
+sessions share one entry. The store is an in-process LRU bounded by
+bytes, so an evicted reference resolves to None; every stored result
+can still be recomputed from the SQL that produced it.
+"""
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from ..config import SESSION_BLOB_STORE_MAX_BYTES
+
+_PREFIX = "blob:"
+
+
+def encode(value: Any) -> str:
+    """Canonical JSON used for hashing and sizing."""
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), default=str)
+
+
+class BlobStore:
+    """LRU of JSON payloads keyed on their content hash."""
+
+    def __init__(self, max_bytes: int = SESSION_BLOB_STORE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, Tuple[str, int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats: Dict[str, int] = {"puts": 0, "dedup_hits": 0, "gets": 0, "misses": 0, "evictions": 0}
+
+    def put(self, value: Any) -> str:
+        """Store ``value`` (if new) and return its reference."""
+        data = encode(value)
+        ref = _PREFIX + hashlib.sha1(data.encode()).hexdigest()[:20]
+        with self._lock:
+            self._stats["puts"] += 1
+            if ref in self._entries:
+                self._stats["dedup_hits"] += 1
+                self._entries.move_to_end(ref)
+                return ref
+            if self.max_bytes <= 0 or len(data) > self.max_bytes:
+                return ref  # Too large to keep; the reference still names the content
+            self._entries[ref] = (data, len(data))
+            self._bytes += len(data)
+            while self._bytes > self.max_bytes:
+                _, (_, size) = self._entries.popitem(last=False)
+                self._bytes -= size
+                self._stats["evictions"] += 1
+        return ref
+
+    def get(self, ref: str) -> Optional[Any]:
+        """The stored value, or None if unknown or evicted."""
+        with self._lock:
+            self._stats["gets"] += 1
+            entry = self._entries.get(ref)
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(ref)
+        return json.loads(entry[0])
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self._stats, entries=len(self._entries), bytes=self._bytes, max_bytes=self.max_bytes)
+
+
+def is_ref(value: Any) -> bool:
+    return isinstance(value, str) and value.startswith(_PREFIX)
+
+
+# Process-wide store shared by every session
+blob_store = BlobStore()
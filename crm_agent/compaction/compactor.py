@@ -0,0 +1,140 @@
+"""Session Compactor - Shrinks the events of finished turns.
+
+A finished turn keeps what later turns need (the question, the final
+SQL, the answer) and loses what they do not:
+
+- large tool results and long texts move to the blob store and are
+  replaced by a reference plus a small preview (status, row count,
+  columns, first rows),
+- large ``state_delta`` values are replaced by references too (the
+  session state itself already holds the current value),
+- model thoughts (PlanReAct planning and reasoning) are dropped,
+- events of superseded loop iterations are dropped, keeping only the
+  last validate/execute/verify/correct pass,
+- once the session is over its byte budget, the oldest turns go.
+
+Only finished turns are touched: the running turn's agents still need
+their full tool results.
+"""
+from typing import Any, Dict, List, Optional, Sequence
+
+from google.genai import types
+
+from ..config import SESSION_BLOB_MIN_BYTES, SESSION_MAX_BYTES, SESSION_PREVIEW_ROWS
+from .blobs import BlobStore, blob_store, encode, is_ref
+
+
+def event_bytes(event: Any) -> int:
+    """Serialized size of an event as a session service would store it."""
+    return len(event.model_dump_json(exclude_none=True))
+
+
+def _reference(value: Any, store: BlobStore, preview_rows: int) -> Dict[str, Any]:
+    """Stand-in for a large tool result: its reference plus what a model needs to follow the history."""
+    ref = store.put(value)
+    stub: Dict[str, Any] = {"ref": ref, "bytes": len(encode(value))}
+    if isinstance(value, dict):
+        for key in ("status", "error", "row_count", "total_rows", "truncated", "columns"):
+            if key in value:
+                stub[key] = value[key]
+        if isinstance(value.get("rows"), list):
+            stub["rows_preview"] = value["rows"][:preview_rows]
+        if isinstance(value.get("result"), str):
+            stub["result_preview"] = value["result"][:SESSION_BLOB_MIN_BYTES // 4]
+    return stub
+
+
+def _compact_part(part: types.Part, store: BlobStore, min_bytes: int, preview_rows: int) -> Optional[types.Part]:
+    """The part with large payloads referenced, or None if it should be dropped."""
+    if part.thought:
+        return None
+    response = part.function_response
+    if response is not None and response.response and not is_ref(response.response.get("ref")):
+        if len(encode(response.response)) > min_bytes:
+            response.response = _reference(response.response, store, preview_rows)
+    elif part.text and len(part.text) > min_bytes:
+        ref = store.put(part.text)
+        part.text = f"{part.text[:min_bytes // 2]}\n… [{len(part.text)} chars stored as {ref}]"
+    return part
+
+
+def _compact_event(event: Any, store: BlobStore, min_bytes: int, preview_rows: int) -> bool:
+    """Compact one event in place; False if nothing is left worth keeping."""
+    if event.content and event.content.parts:
+        parts = [_compact_part(p, store, min_bytes, preview_rows) for p in event.content.parts]
+        event.content.parts = [p for p in parts if p is not None]
+        if not event.content.parts and not (event.actions and (event.actions.state_delta or event.actions.escalate)):
+            return False
+    delta = event.actions.state_delta if event.actions else None
+    if delta:
+        for key, value in list(delta.items()):
+            if not (isinstance(value, dict) and is_ref(value.get("ref"))) and len(encode(value)) > min_bytes:
+                delta[key] = {"ref": store.put(value), "bytes": len(encode(value))}
+    return True
+
+
+def superseded(events: Sequence[Any], loop_agents: Sequence[str]) -> List[Any]:
+    """Events of every loop iteration but the last one.
+
+    ``loop_agents`` are the loop's sub-agent names in order; an event by
+    the first one starts a new iteration.
+    """
+    if not loop_agents:
+        return []
+    members = set(loop_agents)
+    iterations: List[List[Any]] = []
+    for event in events:
+        if event.author not in members:
+            continue
+        if event.author == loop_agents[0] or not iterations:
+            iterations.append([])
+        iterations[-1].append(event)
+    return [e for iteration in iterations[:-1] for e in iteration]
+
+
+def compact_turn(
+    events: Sequence[Any],
+    loop_agents: Sequence[str] = (),
+    store: BlobStore = blob_store,
+    min_bytes: int = SESSION_BLOB_MIN_BYTES,
+    preview_rows: int = SESSION_PREVIEW_ROWS,
+) -> List[Any]:
+    """Compact the events of one finished turn; returns the events to keep.
+
+    Kept events are modified in place.
+    """
+    dropped = {id(e) for e in superseded(events, loop_agents)}
+    kept = []
+    for event in events:
+        if id(event) in dropped:
+            continue
+        if _compact_event(event, store, min_bytes, preview_rows):
+            kept.append(event)
+    return kept
+
+
+def turn_starts(events: Sequence[Any]) -> List[int]:
+    """Indexes of the user messages that open each turn.
+
+    Turns are split on user events rather than ``invocation_id``, which
+    events built by hand in custom agents leave empty.
+    """
+    return [i for i, e in enumerate(events) if e.author == "user"] or ([0] if events else [])
+
+
+def enforce_budget(events: List[Any], max_bytes: int = SESSION_MAX_BYTES) -> List[Any]:
+    """Drop the oldest turns until the events fit ``max_bytes``; the latest turn always stays."""
+    if max_bytes <= 0:
+        return events
+    sizes = [event_bytes(e) for e in events]
+    total = sum(sizes)
+    if total <= max_bytes:
+        return events
+    starts = turn_starts(events)
+    cut = 0
+    for end in starts[1:]:
+        if total <= max_bytes:
+            break
+        total -= sum(sizes[cut:end])
+        cut = end
+    return events[cut:]
@@ -0,0 +1,85 @@
+"""Compaction Plugin - Compacts each turn's session events once the turn has finished.
+
+Registered on an ``App``, the plugin runs ``compact_turn`` over the
+events of the invocation that just ended, then ``enforce_budget`` over
+the whole session. Kept events are edited in place; dropping events
+needs the stored session, which the in-memory session service (the
+default for ``adk web`` and ``InMemoryRunner``) exposes. With other
+session services the events already persisted are left as they are.
+"""
+import threading
+from typing import Any, Dict, List, Optional, Sequence
+
+from google.adk.plugins.base_plugin import BasePlugin
+from google.adk.sessions import InMemorySessionService
+
+from ..config import SESSION_BLOB_MIN_BYTES, SESSION_MAX_BYTES, SESSION_PREVIEW_ROWS
+from .blobs import BlobStore, blob_store
+from .compactor import compact_turn, enforce_budget, event_bytes
+
+
+class CompactionPlugin(BasePlugin):
+    """Stores large payloads by hash and drops superseded events after every turn."""
+
+    def __init__(
+        self,
+        loop_agents: Sequence[str] = (),
+        store: BlobStore = blob_store,
+        min_bytes: int = SESSION_BLOB_MIN_BYTES,
+        preview_rows: int = SESSION_PREVIEW_ROWS,
+        max_bytes: int = SESSION_MAX_BYTES,
+        name: str = "compaction",
+    ):
+        """
+        Args:
+            loop_agents: Sub-agent names of the retry loop, in order; all
+                but the last iteration of a turn are dropped
+            store: Where large payloads go
+            min_bytes: Payloads larger than this are stored by reference
+            preview_rows: Rows kept inline in a referenced result
+            max_bytes: Session event budget (0 for none)
+        """
+        super().__init__(name=name)
+        self.loop_agents = list(loop_agents)
+        self.store = store
+        self.min_bytes = min_bytes
+        self.preview_rows = preview_rows
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._stats: Dict[str, int] = {"turns": 0, "events_dropped": 0, "turn_bytes_before": 0, "turn_bytes_after": 0}
+
+    @staticmethod
+    def _stored_events(invocation_context: Any) -> Optional[List[Any]]:
+        service = invocation_context.session_service
+        if not isinstance(service, InMemorySessionService):
+            return None
+        s = invocation_context.session
+        stored = service.sessions.get(s.app_name, {}).get(s.user_id, {}).get(s.id)
+        return stored.events if stored is not None else None
+
+    async def after_run_callback(self, *, invocation_context):
+        session = invocation_context.session
+        inv = invocation_context.invocation_id
+        # The turn runs from this invocation's user message to the end
+        start = next((i for i, e in enumerate(session.events) if e.invocation_id == inv), None)
+        if start is None:
+            return
+        turn = session.events[start:]
+        before = sum(event_bytes(e) for e in turn)
+        kept = compact_turn(turn, self.loop_agents, self.store, self.min_bytes, self.preview_rows)
+        after = sum(event_bytes(e) for e in kept)
+        dropped = {id(e) for e in turn} - {id(e) for e in kept}
+        for events in (session.events, self._stored_events(invocation_context)):
+            if events is None:
+                continue
+            trimmed = enforce_budget([e for e in events if id(e) not in dropped], self.max_bytes)
+            events[:] = trimmed
+        with self._lock:
+            self._stats["turns"] += 1
+            self._stats["events_dropped"] += len(dropped)
+            self._stats["turn_bytes_before"] += before
+            self._stats["turn_bytes_after"] += after
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._stats)
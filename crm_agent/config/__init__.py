@@ -1,5 +1,114 @@
 """Configuration package - Model and Database settings."""
 from .model import MODEL_NAME
-from .database import DB_PATH, PROJECT_ROOT
+from .database import (
+    DB_PATH,
+    PROJECT_ROOT,
+    DB_POOL_SIZE,
+    DB_MMAP_SIZE,
+    DB_CACHE_SIZE_KB,
+    RESULT_CACHE_MAX_BYTES,
+    RESULT_CACHE_MAX_ENTRY_BYTES,
+    RESULT_MAX_ROWS,
+    RESULT_MAX_BYTES,
+    RESULT_FETCH_BATCH,
+    RESULT_COUNT_LIMIT,
+    DIGEST_MIN_ROWS,
+    DIGEST_SAMPLE_ROWS,
+    DIGEST_TOP_K,
+    DIGEST_MAX_PERIODS,
+    DIGEST_MAX_COLUMNS,
+    DIGEST_MAX_SOURCE_ROWS,
+    QUERY_GUARDS,
+    SNAPSHOT_SERVING,
+    SNAPSHOT_POLL_S,
+    DB_THREADS,
+    DB_SESSION_CONCURRENCY,
+    WARMUP,
+    WARMUP_CONNECTIONS,
+    CLASSIC_SQL_CANDIDATES,
+    SQL_PARSE_CACHE_SIZE,
+    ORDERS_ALL_AUTO_REFRESH,
+    SQL_REWRITE_MONTHLY_UNIONS,
+    ROLLUP_ROUTING,
+    ROLLUP_VERIFY,
+    QUERY_LOG_PATH,
+    QUERY_LOG_MEMORY,
+    QUERY_LOG_MAX_MB,
+    ADVISOR_MAX_INDEX_COLUMNS,
+    TRACE_EXPORTER,
+    TRACE_PATH,
+    TRACE_MAX_MB,
+    TRACE_MEMORY,
+    TRACE_SQL_MAX_CHARS,
+    TRACE_OPEN_SPAN_TTL_S,
+    BATCH_CONCURRENCY,
+    BATCH_TIMEOUT_S,
+    BATCH_RETRIES,
+    BATCH_RETRY_BACKOFF_S,
+    SESSION_BLOB_MIN_BYTES,
+    SESSION_PREVIEW_ROWS,
+    SESSION_MAX_BYTES,
+    SESSION_BLOB_STORE_MAX_BYTES,
+    SESSION_RESULTS,
+    SESSION_RESULTS_MAX_TABLES,
+    SESSION_RESULTS_MAX_BYTES,
+    SQL_LIBRARY_PATH,
+    SQL_LIBRARY_MIN_SCORE,
+)
 
-__all__ = ["MODEL_NAME", "DB_PATH", "PROJECT_ROOT"]
+__all__ = [
+    "MODEL_NAME",
+    "DB_PATH",
+    "PROJECT_ROOT",
+    "DB_POOL_SIZE",
+    "DB_MMAP_SIZE",
+    "DB_CACHE_SIZE_KB",
+    "RESULT_CACHE_MAX_BYTES",
+    "RESULT_CACHE_MAX_ENTRY_BYTES",
+    "RESULT_MAX_ROWS",
+    "RESULT_MAX_BYTES",
+    "RESULT_FETCH_BATCH",
+    "RESULT_COUNT_LIMIT",
+    "DIGEST_MIN_ROWS",
+    "DIGEST_SAMPLE_ROWS",
+    "DIGEST_TOP_K",
+    "DIGEST_MAX_PERIODS",
+    "DIGEST_MAX_COLUMNS",
+    "DIGEST_MAX_SOURCE_ROWS",
+    "QUERY_GUARDS",
+    "SNAPSHOT_SERVING",
+    "SNAPSHOT_POLL_S",
+    "DB_THREADS",
+    "DB_SESSION_CONCURRENCY",
+    "WARMUP",
+    "WARMUP_CONNECTIONS",
+    "CLASSIC_SQL_CANDIDATES",
+    "SQL_PARSE_CACHE_SIZE",
+    "ORDERS_ALL_AUTO_REFRESH",
+    "SQL_REWRITE_MONTHLY_UNIONS",
+    "ROLLUP_ROUTING",
+    "ROLLUP_VERIFY",
+    "QUERY_LOG_PATH",
+    "QUERY_LOG_MEMORY",
+    "QUERY_LOG_MAX_MB",
+    "ADVISOR_MAX_INDEX_COLUMNS",
+    "TRACE_EXPORTER",
+    "TRACE_PATH",
+    "TRACE_MAX_MB",
+    "TRACE_MEMORY",
+    "TRACE_SQL_MAX_CHARS",
+    "TRACE_OPEN_SPAN_TTL_S",
+    "BATCH_CONCURRENCY",
+    "BATCH_TIMEOUT_S",
+    "BATCH_RETRIES",
+    "BATCH_RETRY_BACKOFF_S",
+    "SESSION_BLOB_MIN_BYTES",
+    "SESSION_PREVIEW_ROWS",
+    "SESSION_MAX_BYTES",
+    "SESSION_BLOB_STORE_MAX_BYTES",
+    "SESSION_RESULTS",
+    "SESSION_RESULTS_MAX_TABLES",
+    "SESSION_RESULTS_MAX_BYTES",
+    "SQL_LIBRARY_PATH",
+    "SQL_LIBRARY_MIN_SCORE",
+]
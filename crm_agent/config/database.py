@@ -1,5 +1,6 @@
 """Database configuration."""
 import os
+from typing import Dict
 from dotenv import load_dotenv
 
 # Load environment variables from parent directory (.env is in crm_agent/)
@@ -10,3 +11,101 @@ load_dotenv(os.path.join(_crm_agent_dir, ".env"))
 # Project root is two levels up from config directory
 PROJECT_ROOT: str = os.path.dirname(_crm_agent_dir)
 DB_PATH: str = os.path.join(PROJECT_ROOT, "data", "crm.db")
+
+# ── Connection Pool ─────────────────────────────────────────
+DB_POOL_SIZE: int = int(os.getenv("CRM_DB_POOL_SIZE", "8"))            # Max idle connections kept open
+DB_MMAP_SIZE: int = int(os.getenv("CRM_DB_MMAP_SIZE", str(256 * 1024 * 1024)))  # Bytes mapped per connection
+DB_CACHE_SIZE_KB: int = int(os.getenv("CRM_DB_CACHE_SIZE_KB", "65536"))  # Page cache per connection
+
+# ── Result Cache ────────────────────────────────────────────
+RESULT_CACHE_MAX_BYTES: int = int(os.getenv("CRM_RESULT_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))  # 0 disables
+RESULT_CACHE_MAX_ENTRY_BYTES: int = int(os.getenv("CRM_RESULT_CACHE_MAX_ENTRY_BYTES", str(8 * 1024 * 1024)))
+
+# ── Result Limits ───────────────────────────────────────────
+RESULT_MAX_ROWS: int = int(os.getenv("CRM_RESULT_MAX_ROWS", "1000"))          # Rows kept per result
+RESULT_MAX_BYTES: int = int(os.getenv("CRM_RESULT_MAX_BYTES", str(256 * 1024)))  # Serialized bytes kept per result
+RESULT_FETCH_BATCH: int = int(os.getenv("CRM_RESULT_FETCH_BATCH", "256"))     # fetchmany() batch size
+RESULT_COUNT_LIMIT: int = int(os.getenv("CRM_RESULT_COUNT_LIMIT", "100000"))  # Extra rows counted past the cap
+
+# ── Result Digest (classic response agent) ──────────────────
+DIGEST_MIN_ROWS: int = int(os.getenv("CRM_DIGEST_MIN_ROWS", "50"))        # Larger results reach the analyst as a digest
+DIGEST_SAMPLE_ROWS: int = int(os.getenv("CRM_DIGEST_SAMPLE_ROWS", "20"))  # Leading rows kept verbatim
+DIGEST_TOP_K: int = int(os.getenv("CRM_DIGEST_TOP_K", "10"))              # Top rows / frequent values listed
+DIGEST_MAX_PERIODS: int = int(os.getenv("CRM_DIGEST_MAX_PERIODS", "24"))  # Months kept in the trend
+DIGEST_MAX_COLUMNS: int = int(os.getenv("CRM_DIGEST_MAX_COLUMNS", "20"))  # Columns profiled
+DIGEST_MAX_SOURCE_ROWS: int = int(os.getenv("CRM_DIGEST_MAX_SOURCE_ROWS", "100000"))  # Rows re-read to profile a truncated result
+
+# ── Query Guard (per agent) ─────────────────────────────────
+# timeout_s: wall-clock limit, max_vm_steps: SQLite VM instruction budget,
+# max_plan_rows: estimated row combinations a nested-loop join may visit.
+QUERY_GUARDS: Dict[str, Dict[str, float]] = {
+    "crm_agent": {
+        "timeout_s": float(os.getenv("CRM_AGENT_QUERY_TIMEOUT_S", "10")),
+        "max_vm_steps": int(os.getenv("CRM_AGENT_QUERY_MAX_VM_STEPS", "200000000")),
+        "max_plan_rows": int(os.getenv("CRM_AGENT_QUERY_MAX_PLAN_ROWS", "50000000")),
+    },
+    "crm_agent_classic": {
+        "timeout_s": float(os.getenv("CRM_CLASSIC_QUERY_TIMEOUT_S", "15")),
+        "max_vm_steps": int(os.getenv("CRM_CLASSIC_QUERY_MAX_VM_STEPS", "300000000")),
+        "max_plan_rows": int(os.getenv("CRM_CLASSIC_QUERY_MAX_PLAN_ROWS", "50000000")),
+    },
+}
+
+# ── Snapshot Serving ────────────────────────────────────────
+SNAPSHOT_SERVING: bool = os.getenv("CRM_SNAPSHOT", "0") == "1"  # Serve reads from an in-memory copy of crm.db
+SNAPSHOT_POLL_S: float = float(os.getenv("CRM_SNAPSHOT_POLL_S", "2"))  # Seconds between checks of crm.db (0: no reloads)
+
+# ── Async Execution ─────────────────────────────────────────
+DB_THREADS: int = int(os.getenv("CRM_DB_THREADS", str(DB_POOL_SIZE)))                 # Worker threads for SQLite calls
+DB_SESSION_CONCURRENCY: int = int(os.getenv("CRM_DB_SESSION_CONCURRENCY", "2"))  # In-flight queries per session
+
+# ── Startup Warm-up ─────────────────────────────────────────
+WARMUP: bool = os.getenv("CRM_WARMUP", "1") == "1"  # Warm caches on a background thread when an agent is built
+WARMUP_CONNECTIONS: int = int(os.getenv("CRM_WARMUP_CONNECTIONS", str(DB_THREADS)))  # Pooled connections opened ahead
+
+# ── Speculative SQL (classic pipeline) ──────────────────────
+CLASSIC_SQL_CANDIDATES: int = int(os.getenv("CRM_CLASSIC_SQL_CANDIDATES", "1"))  # >1 generates that many SQL candidates in parallel
+
+# ── SQL Parsing / Validation ────────────────────────────────
+SQL_PARSE_CACHE_SIZE: int = int(os.getenv("CRM_SQL_PARSE_CACHE_SIZE", "1024"))  # Parsed statements kept
+
+# ── Materialized Tables ─────────────────────────────────────
+ORDERS_ALL_AUTO_REFRESH: bool = os.getenv("CRM_ORDERS_ALL_AUTO_REFRESH", "0") == "1"  # Rebuild stale orders_all on use (writes)
+SQL_REWRITE_MONTHLY_UNIONS: bool = os.getenv("CRM_SQL_REWRITE_MONTHLY_UNIONS", "1") == "1"  # Route UNION ALL to orders_all
+ROLLUP_ROUTING: bool = os.getenv("CRM_ROLLUP_ROUTING", "1") == "1"  # Answer matching aggregates from the _rollup_* tables
+ROLLUP_VERIFY: bool = os.getenv("CRM_ROLLUP_VERIFY", "0") == "1"  # Also run routed queries on the base tables and compare
+
+# ── Workload Log / Index Advisor ────────────────────────────
+QUERY_LOG_PATH: str = os.getenv("CRM_QUERY_LOG", os.path.join(PROJECT_ROOT, "data", "query_log.jsonl"))  # "" disables
+QUERY_LOG_MEMORY: int = int(os.getenv("CRM_QUERY_LOG_MEMORY", "1000"))  # Recent statements kept in memory
+QUERY_LOG_MAX_MB: float = float(os.getenv("CRM_QUERY_LOG_MAX_MB", "20"))  # Rotated to <path>.1 past this size; 0 = no cap
+ADVISOR_MAX_INDEX_COLUMNS: int = int(os.getenv("CRM_ADVISOR_MAX_INDEX_COLUMNS", "4"))  # Widest suggested index
+
+# ── Tracing ─────────────────────────────────────────────────
+TRACE_EXPORTER: str = os.getenv("CRM_TRACE_EXPORTER", "jsonl")  # jsonl, memory, otel or none
+TRACE_PATH: str = os.getenv("CRM_TRACE_PATH", os.path.join(PROJECT_ROOT, "data", "traces.jsonl"))
+TRACE_MAX_MB: float = float(os.getenv("CRM_TRACE_MAX_MB", "50"))  # Rotated to <path>.1 past this size; 0 = no cap
+TRACE_MEMORY: int = int(os.getenv("CRM_TRACE_MEMORY", "10000"))  # Spans kept by the in-memory exporter
+TRACE_SQL_MAX_CHARS: int = int(os.getenv("CRM_TRACE_SQL_MAX_CHARS", "2000"))  # SQL/question text kept per span
+TRACE_OPEN_SPAN_TTL_S: float = float(os.getenv("CRM_TRACE_OPEN_SPAN_TTL_S", "900"))  # Spans of abandoned runs closed after
+
+# ── Batch Runner ────────────────────────────────────────────
+BATCH_CONCURRENCY: int = int(os.getenv("CRM_BATCH_CONCURRENCY", "8"))       # Questions answered at once
+BATCH_TIMEOUT_S: float = float(os.getenv("CRM_BATCH_TIMEOUT_S", "180"))      # Per-question limit
+BATCH_RETRIES: int = int(os.getenv("CRM_BATCH_RETRIES", "3"))               # Retries after a model rate-limit error
+BATCH_RETRY_BACKOFF_S: float = float(os.getenv("CRM_BATCH_RETRY_BACKOFF_S", "2"))  # First retry delay, doubled each time
+
+# ── Session Compaction ──────────────────────────────────────
+SESSION_BLOB_MIN_BYTES: int = int(os.getenv("CRM_SESSION_BLOB_MIN_BYTES", "2048"))  # Larger payloads of finished turns stored by hash
+SESSION_PREVIEW_ROWS: int = int(os.getenv("CRM_SESSION_PREVIEW_ROWS", "5"))         # Rows kept inline in a referenced result
+SESSION_MAX_BYTES: int = int(os.getenv("CRM_SESSION_MAX_BYTES", str(1024 * 1024)))  # Event budget per session; oldest turns go first
+SESSION_BLOB_STORE_MAX_BYTES: int = int(os.getenv("CRM_SESSION_BLOB_STORE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+# ── Session Result Tables ───────────────────────────────────
+SESSION_RESULTS: bool = os.getenv("CRM_SESSION_RESULTS", "1") == "1"  # Keep each session's results as tables for follow-ups
+SESSION_RESULTS_MAX_TABLES: int = int(os.getenv("CRM_SESSION_RESULTS_MAX_TABLES", "5"))  # Tables kept per session
+SESSION_RESULTS_MAX_BYTES: int = int(os.getenv("CRM_SESSION_RESULTS_MAX_BYTES", str(64 * 1024 * 1024)))  # All sessions; LRU
+
+# ── Verified SQL Library ────────────────────────────────────
+SQL_LIBRARY_PATH: str = os.getenv("CRM_SQL_LIBRARY", os.path.join(PROJECT_ROOT, "data", "sql_library.db"))  # "" disables
+SQL_LIBRARY_MIN_SCORE: float = float(os.getenv("CRM_SQL_LIBRARY_MIN_SCORE", "0.9"))  # Cosine needed to reuse SQL
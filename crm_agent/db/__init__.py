@@ -0,0 +1,137 @@
+"""Database package - Pooled read-only access to the CRM database."""
+import importlib
+
+# Members load with their module on first access (PEP 562): sqlglot,
+# numpy and pandas are only imported once a query, lookup or digest needs them
+_LAZY_MEMBERS = {
+    "ConnectionPool": ".pool",
+    "get_pool": ".pool",
+    "connection": ".pool",
+    "pool_stats": ".pool",
+    "file_version": ".pool",
+    "SnapshotManager": ".snapshot",
+    "snapshots": ".snapshot",
+    "ResultCache": ".cache",
+    "result_cache": ".cache",
+    "cache_stats": ".cache",
+    "fetch_bounded": ".streaming",
+    "iter_batches": ".streaming",
+    "to_columnar": ".streaming",
+    "parse_sql": ".parsing",
+    "parse_stats": ".parsing",
+    "sql_key": ".parsing",
+    "QueryGuard": ".guard",
+    "QueryTooExpensive": ".guard",
+    "estimate_table_rows": ".guard",
+    "ENTITY_KEYS": ".catalog",
+    "ORDERS_ALL": ".catalog",
+    "SchemaCatalog": ".catalog",
+    "TableInfo": ".catalog",
+    "schema_catalog": ".catalog",
+    "format_diagnostics": ".validate",
+    "validate_sql": ".validate",
+    "FuzzyIndexRegistry": ".fuzzy",
+    "TrigramIndex": ".fuzzy",
+    "fuzzy_index": ".fuzzy",
+    "OrdersAllState": ".materialize",
+    "orders_all_state": ".materialize",
+    "refresh_orders_all": ".materialize",
+    "rewrite_monthly_unions": ".rewrite",
+    "rewrite_stats": ".rewrite",
+    "Rollup": ".rollup",
+    "RollupState": ".rollup",
+    "rollup_state": ".rollup",
+    "rollup_stats": ".rollup",
+    "route_rollup": ".rollup",
+    "WorkloadLog": ".workload",
+    "workload_log": ".workload",
+    "SessionResultStore": ".result_tables",
+    "session_results": ".result_tables",
+    "LibraryMatch": ".library",
+    "SqlLibrary": ".library",
+    "sql_library": ".library",
+    "BLOCKED": ".queries",
+    "get_schema": ".queries",
+    "get_compact_schema": ".queries",
+    "run_sql_query": ".queries",
+    "run_sql_query_bounded": ".queries",
+    "stream_sql_query": ".queries",
+    "digest_query": ".digest",
+    "digest_result": ".digest",
+    "run_in_db_thread": ".aio",
+    "run_sql_query_async": ".aio",
+    "get_schema_async": ".aio",
+    "get_compact_schema_async": ".aio",
+    "executor_stats": ".aio",
+}
+
+
+def __getattr__(name):
+    if name not in _LAZY_MEMBERS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_LAZY_MEMBERS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+__all__ = [
+    "BLOCKED",
+    "ConnectionPool",
+    "get_pool",
+    "connection",
+    "pool_stats",
+    "file_version",
+    "SnapshotManager",
+    "snapshots",
+    "ResultCache",
+    "result_cache",
+    "cache_stats",
+    "fetch_bounded",
+    "iter_batches",
+    "to_columnar",
+    "parse_sql",
+    "parse_stats",
+    "sql_key",
+    "QueryGuard",
+    "QueryTooExpensive",
+    "estimate_table_rows",
+    "ENTITY_KEYS",
+    "ORDERS_ALL",
+    "SchemaCatalog",
+    "TableInfo",
+    "schema_catalog",
+    "validate_sql",
+    "format_diagnostics",
+    "FuzzyIndexRegistry",
+    "TrigramIndex",
+    "fuzzy_index",
+    "OrdersAllState",
+    "orders_all_state",
+    "refresh_orders_all",
+    "rewrite_monthly_unions",
+    "rewrite_stats",
+    "Rollup",
+    "RollupState",
+    "rollup_state",
+    "rollup_stats",
+    "route_rollup",
+    "WorkloadLog",
+    "workload_log",
+    "SessionResultStore",
+    "session_results",
+    "LibraryMatch",
+    "SqlLibrary",
+    "sql_library",
+    "get_schema",
+    "get_compact_schema",
+    "run_sql_query",
+    "run_sql_query_bounded",
+    "stream_sql_query",
+    "digest_query",
+    "digest_result",
+    "run_in_db_thread",
+    "run_sql_query_async",
+    "get_schema_async",
+    "get_compact_schema_async",
+    "executor_stats",
+]
@@ -0,0 +1,396 @@
+"""Index Advisor - Secondary index suggestions from the logged workload.
+
+1. Every logged statement is parsed with sqlglot: as it ran when a UNION
+   chain was rewritten onto ``orders_all``, as submitted when it was
+   routed to a rollup (a rollup answers from a few hundred rows, so the
+   base tables are what needs indexes). Each ``SELECT`` scope yields, per
+   table, the columns it filters by equality (``=``, ``IN``,
+   ``IS``, join keys), by range (``<``, ``BETWEEN``, prefix ``LIKE``),
+   groups or orders by, and reads.
+2. Those become candidate indexes: equality columns, then one range or
+   ordering column, plus a covering variant that appends the remaining
+   columns read when it stays within ``ADVISOR_MAX_INDEX_COLUMNS``.
+3. Each candidate is created in an in-memory copy of the database and
+   the workload is re-planned with ``EXPLAIN QUERY PLAN``. The benefit is
+   the drop in estimated rows visited, weighted by statement frequency.
+
+Usage::
+
+    python -m crm_agent.db.advisor             # review suggestions
+    python -m crm_agent.db.advisor --apply     # create them and ANALYZE
+"""
+import argparse
+import re
+import sqlite3
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from sqlglot import exp
+from sqlglot.errors import SqlglotError
+
+from ..config import ADVISOR_MAX_INDEX_COLUMNS, DB_PATH
+from .guard import table_aliases
+from .parsing import parse_sql
+from .rollup import ROLLUP_PREFIX
+from .workload import workload_log
+
+_RANGE = (exp.GT, exp.GTE, exp.LT, exp.LTE, exp.Between)
+_EQ_TERM = re.compile(r"(?<![<>!])=\?")
+_INDEX_NAME = re.compile(r"USING (?:COVERING )?INDEX (\S+)")
+_SUBQUERY = re.compile(r"^(?:MATERIALIZE|CO-ROUTINE) (\S+)")
+_DEFAULT_SUBQUERY_ROWS = 100
+
+
+@dataclass
+class TableAccess:
+    """How one SELECT scope uses one table."""
+    table: str
+    eq: Set[str] = field(default_factory=set)
+    range: List[str] = field(default_factory=list)
+    order: List[str] = field(default_factory=list)
+    used: Set[str] = field(default_factory=set)
+
+
+@dataclass
+class Recommendation:
+    """A suggested index with its estimated benefit."""
+    table: str
+    columns: Tuple[str, ...]
+    benefit: float
+    statements: int
+    example: str = ""
+
+    @property
+    def name(self) -> str:
+        return f"idx_adv_{self.table}_{'_'.join(self.columns)}"
+
+    @property
+    def sql(self) -> str:
+        cols = ", ".join(f'"{c}"' for c in self.columns)
+        return f'CREATE INDEX IF NOT EXISTS "{self.name}" ON "{self.table}" ({cols})'
+
+
+# ── Workload parsing ────────────────────────────────────────
+def _conjuncts(condition: Optional[exp.Expression]) -> Iterable[exp.Expression]:
+    if condition is None:
+        return []
+    return condition.flatten() if isinstance(condition, exp.And) else [condition]
+
+
+def extract_access(sql: str, schema: Dict[str, Set[str]]) -> List[TableAccess]:
+    """Per-scope table accesses of a statement; tables not in ``schema`` are ignored."""
+    try:
+        tree = parse_sql(sql)
+    except SqlglotError:
+        return []
+    accesses: List[TableAccess] = []
+    for select in tree.find_all(exp.Select):
+        sources: Dict[str, str] = {}
+        nodes = [select.args["from_"].this] if select.args.get("from_") else []
+        nodes += [j.this for j in select.args.get("joins") or []]
+        for node in nodes:
+            if isinstance(node, exp.Table) and node.name in schema:
+                sources[node.alias_or_name] = node.name
+        if not sources:
+            continue
+        by_table = {t: TableAccess(t) for t in set(sources.values())}
+
+        def owner(col: exp.Column) -> Optional[str]:
+            if col.table:
+                return sources.get(col.table)
+            tables = {t for t in sources.values() if col.name in schema[t]}
+            return tables.pop() if len(tables) == 1 else None
+
+        def own_columns(node: exp.Expression) -> List[exp.Column]:
+            return [c for c in node.find_all(exp.Column) if c.find_ancestor(exp.Select) is select]
+
+        for col in own_columns(select):
+            t = owner(col)
+            if t and col.name in schema[t]:
+                by_table[t].used.add(col.name)
+
+        conditions = [select.args["where"].this] if select.args.get("where") else []
+        conditions += [j.args["on"] for j in select.args.get("joins") or [] if j.args.get("on")]
+        for cond in conditions:
+            for term in _conjuncts(cond):
+                cols = own_columns(term)
+                if not cols:
+                    continue
+                if isinstance(term, (exp.EQ, exp.In, exp.Is)):
+                    if isinstance(term, exp.EQ) and all(isinstance(s, exp.Column) for s in (term.this, term.expression)):
+                        targets = [term.this, term.expression]  # Join key: either side can be the inner lookup
+                    elif isinstance(term.this, exp.Column) and len(cols) == 1:
+                        targets = [term.this]
+                    elif isinstance(term, exp.EQ) and isinstance(term.expression, exp.Column) and len(cols) == 1:
+                        targets = [term.expression]
+                    else:
+                        continue
+                    for col in targets:
+                        t = owner(col)
+                        if t and col.name in schema[t]:
+                            by_table[t].eq.add(col.name)
+                elif isinstance(term, _RANGE) or (
+                    isinstance(term, exp.Like) and isinstance(term.expression, exp.Literal)
+                    and not term.expression.this.startswith(("%", "_"))
+                ):
+                    if isinstance(term.this, exp.Column) and len(cols) == 1:
+                        t = owner(term.this)
+                        if t and term.this.name in schema[t] and term.this.name not in by_table[t].range:
+                            by_table[t].range.append(term.this.name)
+
+        for key in ("group", "order"):
+            clause = select.args.get(key)
+            for node in clause.expressions if clause else []:
+                col = node.this if isinstance(node, exp.Ordered) else node
+                if isinstance(col, exp.Column):
+                    t = owner(col)
+                    if t and col.name in schema[t] and col.name not in by_table[t].order:
+                        by_table[t].order.append(col.name)
+        accesses.extend(by_table.values())
+    return accesses
+
+
+def candidate_columns(access: TableAccess, max_columns: int = ADVISOR_MAX_INDEX_COLUMNS) -> List[Tuple[str, ...]]:
+    """Key-only and covering index column lists for one access."""
+    key = sorted(access.eq)
+    if access.range:
+        key.append(access.range[0])
+    else:
+        key += [c for c in access.order if c not in key]
+    key = key[:max_columns]
+    if not key:
+        return []
+    out = [tuple(key)]
+    rest = sorted(access.used - set(key))
+    if rest and len(key) + len(rest) <= max_columns:
+        out.append(tuple(key + rest))
+    return out
+
+
+# ── Cost model ──────────────────────────────────────────────
+def _stat_rows(conn: sqlite3.Connection, index: str, eq_terms: int) -> Optional[float]:
+    row = conn.execute("SELECT stat FROM sqlite_stat1 WHERE idx = ?", (index,)).fetchone() if _has_stats(conn) else None
+    if not row:
+        return None
+    parts = row[0].split()
+    if len(parts) < 2:
+        return None
+    return float(parts[min(max(eq_terms, 1), len(parts) - 1)])
+
+
+def _has_stats(conn: sqlite3.Connection) -> bool:
+    return bool(conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'").fetchone())
+
+
+def plan_cost(conn: sqlite3.Connection, sql: str, table_rows: Dict[str, int]) -> float:
+    """Estimated rows visited by ``sql``'s query plan.
+
+    Sibling plan nodes form a nested loop: each node costs its estimated
+    rows times the rows produced by the nodes before it. ``SCAN`` visits
+    the whole table (half for covering index scans), ``SEARCH`` the rows
+    per key from ``sqlite_stat1`` (doubled when every row needs a table
+    lookup) and temp B-trees sort the rows produced so far.
+    """
+    plan = conn.execute(f"EXPLAIN QUERY PLAN {sql}").fetchall()
+    aliases = table_aliases(sql)
+    children: Dict[int, List[Tuple[int, str]]] = {}
+    for node_id, parent, _, detail in plan:
+        children.setdefault(parent, []).append((node_id, detail))
+    subquery_rows: Dict[str, float] = {}
+
+    def loop(parent: int) -> Tuple[float, float]:
+        cost, outer = 0.0, 1.0
+        for node_id, detail in children.get(parent, []):
+            sub = _SUBQUERY.match(detail)
+            if sub:
+                sub_cost, sub_rows = loop(node_id)
+                subquery_rows[sub.group(1)] = sub_rows
+                cost += sub_cost
+                continue
+            if node_id in children:
+                cost += loop(node_id)[0]
+            if detail.startswith("USE TEMP B-TREE"):
+                cost += outer * 0.5
+                continue
+            words = detail.split()
+            if len(words) < 2 or words[0] not in ("SCAN", "SEARCH"):
+                continue
+            name = words[1]
+            n = subquery_rows.get(name) or table_rows.get(aliases.get(name, name), _DEFAULT_SUBQUERY_ROWS)
+            covering = "COVERING INDEX" in detail
+            if words[0] == "SCAN":
+                rows = float(n)
+                step = rows * (0.5 if covering else 1.0)
+            else:
+                if "AUTOMATIC" in detail:
+                    cost += n  # Built for this statement
+                cond = detail[detail.find("(") + 1:-1] if detail.endswith(")") else ""
+                eq_terms = len(_EQ_TERM.findall(cond))
+                if "PRIMARY KEY" in detail and eq_terms:
+                    rows = 1.0
+                else:
+                    index = _INDEX_NAME.search(detail)
+                    rows = (index and _stat_rows(conn, index.group(1), eq_terms)) or max(n / 10 ** eq_terms, 1.0)
+                if re.search(r"[<>]", cond):
+                    rows = max(rows / 4, 1.0)
+                step = rows * (1.0 if covering or "PRIMARY KEY" in detail else 2.0)
+            cost += outer * step
+            outer *= rows
+        return cost, outer
+
+    return loop(0)[0]
+
+
+# ── Advisor ─────────────────────────────────────────────────
+def _schema(conn: sqlite3.Connection) -> Dict[str, Set[str]]:
+    tables = [r[0] for r in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%'")]
+    return {t: {r[1] for r in conn.execute(f'PRAGMA table_info("{t}")')} for t in tables}
+
+
+def existing_indexes(conn: sqlite3.Connection, table: str) -> List[Tuple[str, ...]]:
+    """Column lists of the indexes already on ``table``."""
+    out = []
+    for idx in conn.execute(f'PRAGMA index_list("{table}")').fetchall():
+        out.append(tuple(r[2] for r in conn.execute(f'PRAGMA index_info("{idx[1]}")')))
+    return out
+
+
+def _covered(columns: Sequence[str], indexes: Iterable[Sequence[str]]) -> bool:
+    return any(tuple(ix[:len(columns)]) == tuple(columns) for ix in indexes)
+
+
+def workload_statements(entries: Iterable[Dict[str, Any]]) -> List[str]:
+    """Statements of successful or too-expensive log entries, on the tables they should be indexed for."""
+    statements = []
+    for e in entries:
+        if e.get("status") not in ("success", "too_expensive"):
+            continue
+        ran = e.get("exec_sql")
+        statements.append(ran if ran and ROLLUP_PREFIX not in ran.lower() else e["sql"])
+    return statements
+
+
+def advise(
+    statements: Optional[Sequence[str]] = None,
+    db_path: str = DB_PATH,
+    top: int = 10,
+    max_columns: int = ADVISOR_MAX_INDEX_COLUMNS,
+) -> List[Recommendation]:
+    """Rank new indexes for the workload by estimated benefit.
+
+    Args:
+        statements: SQL to advise for, defaults to the successful and
+            too-expensive statements in the workload log
+        db_path: Database the indexes are meant for; it is copied into
+            memory and never modified
+        top: Maximum number of recommendations
+        max_columns: Widest index considered
+
+    Returns:
+        Recommendations with a positive benefit, best first, without
+        candidates that are a prefix of a better one on the same table
+    """
+    if statements is None:
+        statements = workload_statements(workload_log.load())
+    workload = Counter(s.strip().rstrip(";") for s in statements if s and s.strip())
+    if not workload:
+        return []
+
+    src = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    mem = sqlite3.connect(":memory:")
+    try:
+        src.backup(mem)
+    finally:
+        src.close()
+    try:
+        mem.execute("ANALYZE")
+        schema = _schema(mem)
+        table_rows = {t: mem.execute(f'SELECT MAX(rowid) FROM "{t}"').fetchone()[0] or 0 for t in schema}
+
+        candidates: Dict[Tuple[str, Tuple[str, ...]], Set[str]] = {}
+        touches: Dict[str, Set[str]] = {}
+        for sql in workload:
+            for access in extract_access(sql, schema):
+                touches.setdefault(access.table, set()).add(sql)
+                for cols in candidate_columns(access, max_columns):
+                    candidates.setdefault((access.table, cols), set()).add(sql)
+
+        baseline: Dict[str, float] = {}
+        for sql in workload:
+            try:
+                baseline[sql] = plan_cost(mem, sql, table_rows)
+            except sqlite3.Error:
+                continue
+
+        recs: List[Recommendation] = []
+        for (table, cols), sqls in candidates.items():
+            if _covered(cols, existing_indexes(mem, table)):
+                continue
+            rec = Recommendation(table, cols, 0.0, len(sqls), min(sqls, key=len))
+            try:
+                mem.execute(rec.sql)
+                mem.execute(f'ANALYZE "{rec.name}"')
+                for sql in touches.get(table, ()):
+                    if sql in baseline:
+                        rec.benefit += workload[sql] * (baseline[sql] - plan_cost(mem, sql, table_rows))
+            except sqlite3.Error:
+                continue
+            finally:
+                mem.execute(f'DROP INDEX IF EXISTS "{rec.name}"')
+            if rec.benefit > 0:
+                recs.append(rec)
+    finally:
+        mem.close()
+
+    recs.sort(key=lambda r: (-r.benefit, len(r.columns)))
+    chosen: List[Recommendation] = []
+    for rec in recs:
+        if not _covered(rec.columns, [c.columns for c in chosen if c.table == rec.table]):
+            chosen.append(rec)
+        if len(chosen) >= top:
+            break
+    return chosen
+
+
+def apply_recommendations(recs: Sequence[Recommendation], db_path: str = DB_PATH) -> List[str]:
+    """Create the recommended indexes and re-run ANALYZE; returns the index names."""
+    conn = sqlite3.connect(db_path, timeout=30)
+    try:
+        with conn:
+            for rec in recs:
+                conn.execute(rec.sql)
+            for table in {r.table for r in recs}:
+                conn.execute(f'ANALYZE "{table}"')
+    finally:
+        conn.close()
+    return [r.name for r in recs]
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    ap = argparse.ArgumentParser(prog="python -m crm_agent.db.advisor", description=__doc__.split("\n")[0])
+    ap.add_argument("--db", default=DB_PATH, help="Database to advise for")
+    ap.add_argument("--log", default=None, help="Workload log (JSON lines), defaults to CRM_QUERY_LOG")
+    ap.add_argument("--top", type=int, default=10, help="Maximum number of suggestions")
+    ap.add_argument("--min-benefit", type=float, default=0.0, help="Only keep suggestions above this benefit")
+    ap.add_argument("--apply", action="store_true", help="Create the suggested indexes and run ANALYZE")
+    args = ap.parse_args(argv)
+
+    statements = workload_statements(workload_log.load(args.log))
+    print(f"{len(statements)} logged statements ({len(set(statements))} distinct)")
+    recs = [r for r in advise(statements, args.db, args.top) if r.benefit > args.min_benefit]
+    if not recs:
+        print("No index suggestions.")
+        return
+    for i, r in enumerate(recs, 1):
+        print(f"{i:>2}. benefit {r.benefit:>14,.0f}  statements {r.statements:>4}  {r.sql}")
+    if args.apply:
+        created = apply_recommendations(recs, args.db)
+        print(f"\nCreated {len(created)} indexes and re-ran ANALYZE.")
+    else:
+        print("\nRe-run with --apply to create them.")
+
+
+if __name__ == "__main__":
+    main()
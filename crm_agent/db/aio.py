@@ -0,0 +1,174 @@
+"""Async Execution - Runs SQLite work off the asyncio event loop.
+
+ADK runs every session on one event loop, so a synchronous sqlite3 call
+inside an agent or tool stalls every other session's event stream. The
+awaitable variants here hand the call to a bounded thread pool instead:
+
+- at most ``DB_THREADS`` statements run at once process-wide,
+- at most ``DB_SESSION_CONCURRENCY`` of them belong to any one session,
+- cancelling the awaiting task (e.g. the runner cancelling a session)
+  sets a cancel event that aborts the running statement through the
+  ``QueryGuard`` progress handler.
+"""
+import asyncio
+import contextvars
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar
+
+from ..config import DB_THREADS, DB_SESSION_CONCURRENCY
+from .queries import get_schema, get_compact_schema, run_sql_query_bounded
+
+T = TypeVar("T")
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+_stats_lock = threading.Lock()
+_stats: Dict[str, float] = {
+    "submitted": 0, "queued": 0, "running": 0, "completed": 0, "failed": 0, "cancelled": 0,
+    "throttled": 0, "queue_wait_s": 0.0, "max_queue_wait_s": 0.0, "run_s": 0.0,
+}
+# (event loop, session id) -> (semaphore, number of tasks holding or waiting on it)
+_session_slots: Dict[Tuple[int, str], Tuple[asyncio.Semaphore, int]] = {}
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=DB_THREADS, thread_name_prefix="crm-db")
+    return _executor
+
+
+def _bump(**deltas: float) -> None:
+    with _stats_lock:
+        for k, v in deltas.items():
+            _stats[k] += v
+
+
+def _slot(session_id: str) -> asyncio.Semaphore:
+    key = (id(asyncio.get_running_loop()), session_id)
+    sem, users = _session_slots.get(key, (None, 0))
+    if sem is None:
+        sem = asyncio.Semaphore(DB_SESSION_CONCURRENCY)
+    _session_slots[key] = (sem, users + 1)
+    return sem
+
+
+def _release_slot(session_id: str) -> None:
+    key = (id(asyncio.get_running_loop()), session_id)
+    sem, users = _session_slots[key]
+    if users <= 1:
+        del _session_slots[key]
+    else:
+        _session_slots[key] = (sem, users - 1)
+
+
+async def run_in_db_thread(
+    fn: Callable[..., T],
+    *args: Any,
+    session_id: Optional[str] = None,
+    cancellable: bool = False,
+    **kwargs: Any,
+) -> T:
+    """Run ``fn(*args, **kwargs)`` on the DB thread pool and await its result.
+
+    Args:
+        fn: Synchronous function doing SQLite work
+        session_id: Session the call belongs to, for per-session limits
+        cancellable: Pass a ``cancel`` event to ``fn`` that is set if the
+            awaiting task is cancelled
+
+    Raises:
+        asyncio.CancelledError: If the awaiting task is cancelled
+    """
+    cancel = threading.Event()
+    if cancellable:
+        kwargs["cancel"] = cancel
+    submitted = time.monotonic()
+    claimed = [False]  # Set by whichever of the worker and the canceller gets there first
+
+    def call() -> T:
+        started = time.monotonic()
+        wait = started - submitted
+        with _stats_lock:
+            if claimed[0]:
+                return None  # type: ignore[return-value]  # Cancelled while queued
+            claimed[0] = True
+            _stats["queued"] -= 1
+            _stats["running"] += 1
+            _stats["queue_wait_s"] += wait
+            _stats["max_queue_wait_s"] = max(_stats["max_queue_wait_s"], wait)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _bump(running=-1, run_s=time.monotonic() - started)
+
+    sem = _slot(session_id) if session_id else None
+    try:
+        if sem is not None:
+            if sem.locked():
+                _bump(throttled=1)
+            await sem.acquire()
+        try:
+            _bump(submitted=1, queued=1)
+            # Carry the caller's context (e.g. the current trace span) onto the worker thread
+            future = asyncio.get_running_loop().run_in_executor(_get_executor(), contextvars.copy_context().run, call)
+            try:
+                result = await future
+            except asyncio.CancelledError:
+                cancel.set()
+                with _stats_lock:
+                    if not claimed[0]:
+                        claimed[0] = True
+                        _stats["queued"] -= 1
+                    _stats["cancelled"] += 1
+                raise
+            except Exception:
+                _bump(failed=1)
+                raise
+            _bump(completed=1)
+            return result
+        finally:
+            if sem is not None:
+                sem.release()
+    finally:
+        if session_id:
+            _release_slot(session_id)
+
+
+async def run_sql_query_async(sql: str, session_id: Optional[str] = None, **kwargs: Any) -> Dict[str, Any]:
+    """Awaitable ``run_sql_query_bounded``; keyword arguments are forwarded.
+
+    The query reads and keeps result tables of ``session_id`` unless
+    ``session`` is passed explicitly.
+    """
+    kwargs.setdefault("session", session_id)
+    return await run_in_db_thread(run_sql_query_bounded, sql, session_id=session_id, cancellable=True, **kwargs)
+
+
+async def get_schema_async(session_id: Optional[str] = None) -> str:
+    """Awaitable ``get_schema``."""
+    return await run_in_db_thread(get_schema, session_id=session_id)
+
+
+async def get_compact_schema_async(
+    question: Optional[str] = None, tables: Optional[List[str]] = None, session_id: Optional[str] = None
+) -> str:
+    """Awaitable ``get_compact_schema``, listing the result tables of ``session_id``."""
+    return await run_in_db_thread(get_compact_schema, question, tables, session_id, session_id=session_id)
+
+
+def executor_stats() -> Dict[str, Any]:
+    """Queue, throughput and cancellation counters for the DB thread pool."""
+    with _stats_lock:
+        s: Dict[str, Any] = dict(_stats)
+    for k in ("submitted", "queued", "running", "completed", "failed", "cancelled", "throttled"):
+        s[k] = int(s[k])
+    started = s["submitted"] - s["queued"]
+    s["avg_queue_wait_s"] = s["queue_wait_s"] / started if started else 0.0
+    s["threads"] = DB_THREADS
+    s["sessions_active"] = len(_session_slots)
+    return s
@@ -0,0 +1,236 @@
+"""Result Cache - LRU cache of query results keyed on canonical SQL.
+
+Keys are built from a sqlglot-normalized form of the statement, so
+whitespace, keyword/identifier case and table/column alias spellings that
+do not change the result all map to the same entry. Output column names
+are re-derived from the incoming statement on every hit, so a cached
+``SUM(x) AS total`` can answer ``sum(x) AS revenue``.
+
+Every entry is tagged with a database version built from the file's
+identity and mtime plus ``PRAGMA data_version``; a change to either drops
+the whole cache.
+"""
+import sqlite3
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+from sqlglot import exp
+from sqlglot.errors import SqlglotError
+from sqlglot.optimizer.normalize_identifiers import normalize_identifiers
+
+from ..config import DB_PATH, RESULT_CACHE_MAX_BYTES, RESULT_CACHE_MAX_ENTRY_BYTES
+from .parsing import parse_sql
+from .pool import file_version as _file_version
+
+# Functions whose value changes between executions of the same statement.
+_VOLATILE = (exp.Rand, exp.CurrentDate, exp.CurrentTime, exp.CurrentTimestamp)
+_VOLATILE_NAMES = {"random", "randomblob", "changes", "total_changes", "last_insert_rowid"}
+
+
+# ── SQL canonicalization ────────────────────────────────────
+def _output_names(query: exp.Expression) -> Optional[List[Optional[str]]]:
+    """Column names SQLite will report, where they follow from the SQL text.
+
+    Aliased projections report the alias, bare columns report the column
+    name as written; anything else (functions, expressions) is ``None``.
+    Returns ``None`` when a ``*`` makes the column list schema-dependent.
+    """
+    while isinstance(query, exp.SetOperation):
+        query = query.this
+    if not isinstance(query, exp.Select):
+        return None
+    names: List[Optional[str]] = []
+    for proj in query.selects:
+        if isinstance(proj, exp.Star) or (isinstance(proj, exp.Column) and isinstance(proj.this, exp.Star)):
+            return None
+        if isinstance(proj, exp.Alias):
+            names.append(proj.alias)
+        elif isinstance(proj, exp.Column):
+            names.append(proj.name)
+        else:
+            names.append(None)
+    return names
+
+
+def _canonicalize_table_aliases(tree: exp.Expression) -> None:
+    """Rename table/subquery aliases to positional ``_tN`` names in place."""
+    taken = {t.name for t in tree.find_all(exp.Table)}
+    taken |= {cte.alias for cte in tree.find_all(exp.CTE)}
+    mapping: Dict[str, str] = {}
+    for ta in tree.find_all(exp.TableAlias):
+        if not isinstance(ta.parent, (exp.Table, exp.Subquery)) or not ta.name or ta.name in taken:
+            continue
+        mapping.setdefault(ta.name, f"_t{len(mapping)}")
+        ta.set("this", exp.to_identifier(mapping[ta.name]))
+    if not mapping:
+        return
+    for col in tree.find_all(exp.Column):
+        if col.table in mapping:
+            col.set("table", exp.to_identifier(mapping[col.table]))
+
+
+def _canonicalize_column_aliases(tree: exp.Expression) -> None:
+    """Rename top-level projection aliases (and ORDER BY uses) to ``_cN``.
+
+    Skipped whenever an alias name is referenced anywhere other than the
+    top-level ORDER BY, where renaming could change what it resolves to.
+    """
+    if not isinstance(tree, exp.Select):
+        return
+    aliases = {p.alias: f"_c{i}" for i, p in enumerate(tree.selects) if isinstance(p, exp.Alias)}
+    if not aliases:
+        return
+    order = tree.args.get("order")
+    order_cols = set(id(c) for c in order.find_all(exp.Column)) if order else set()
+    for col in tree.find_all(exp.Column):
+        if col.name in aliases and (col.table or id(col) not in order_cols):
+            return
+    for proj in tree.selects:
+        if isinstance(proj, exp.Alias):
+            proj.set("alias", exp.to_identifier(aliases[proj.alias]))
+    for col in (order.find_all(exp.Column) if order else ()):
+        if col.name in aliases:
+            col.set("this", exp.to_identifier(aliases[col.name]))
+
+
+@lru_cache(maxsize=1024)
+def canonicalize(sql: str) -> Tuple[Optional[str], Optional[Tuple[Optional[str], ...]]]:
+    """Return ``(canonical_sql, output_names)`` for a statement.
+
+    ``canonical_sql`` is ``None`` when the statement cannot be parsed or
+    is non-deterministic and therefore must not be cached.
+    """
+    try:
+        tree = parse_sql(sql).copy()  # Identifiers and aliases are normalized in place below
+    except SqlglotError:
+        return None, None
+    for node in tree.walk():
+        if isinstance(node, _VOLATILE):
+            return None, None
+        if isinstance(node, exp.Anonymous) and node.name.lower() in _VOLATILE_NAMES:
+            return None, None
+        if isinstance(node, exp.Literal) and node.is_string and node.name.lower() == "now":
+            return None, None
+    names = _output_names(tree)
+    tree = normalize_identifiers(tree, dialect="sqlite")
+    _canonicalize_table_aliases(tree)
+    _canonicalize_column_aliases(tree)
+    return tree.sql(dialect="sqlite"), tuple(names) if names is not None else None
+
+
+def _estimate_bytes(rows: List[List[Any]]) -> int:
+    """Rough in-memory footprint of a result set."""
+    total = 64
+    for row in rows:
+        total += 56 + 8 * len(row)
+        for v in row:
+            total += len(v) + 49 if isinstance(v, (str, bytes)) else 24
+    return total
+
+
+# ── Cache ───────────────────────────────────────────────────
+class ResultCache:
+    """Byte-bounded LRU cache of successful ``run_sql_query`` results."""
+
+    def __init__(self, max_bytes: int = RESULT_CACHE_MAX_BYTES,
+                 max_entry_bytes: int = RESULT_CACHE_MAX_ENTRY_BYTES, path: str = DB_PATH):
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes
+        self.path = path
+        self._entries: "OrderedDict[Tuple[str, Hashable], Tuple[Dict[str, Any], int]]" = OrderedDict()
+        self._bytes = 0
+        self._version: Optional[Tuple[Any, ...]] = None
+        self._data_versions: Dict[int, int] = {}
+        self._lock = threading.Lock()
+        self._stats: Dict[str, int] = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0, "invalidations": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def _check_version(self, conn: sqlite3.Connection) -> None:
+        """Drop every entry if the file or its committed data changed."""
+        file_version = _file_version(self.path)
+        data_version = conn.execute("PRAGMA data_version").fetchone()[0]
+        with self._lock:
+            seen = self._data_versions.get(id(conn))
+            self._data_versions[id(conn)] = data_version
+            if file_version != self._version or (seen is not None and seen != data_version):
+                if self._entries:
+                    self._stats["invalidations"] += 1
+                self._entries.clear()
+                self._bytes = 0
+                self._version = file_version
+
+    def get(self, sql: str, conn: sqlite3.Connection, variant: Hashable = None) -> Optional[Dict[str, Any]]:
+        """Return a copy of the cached result for ``sql``, or ``None``.
+
+        ``variant`` distinguishes results of the same statement fetched
+        under different limits (e.g. row/byte caps).
+        """
+        if not self.enabled:
+            return None
+        canonical, names = canonicalize(sql)
+        if canonical is None:
+            return None
+        key = (canonical, variant)
+        self._check_version(conn)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            result = entry[0]
+        cols = list(result["columns"])
+        if names is not None and len(names) == len(cols):
+            cols = [n if n is not None else c for n, c in zip(names, cols)]
+        return dict(result, columns=cols, rows=[list(r) for r in result["rows"]])
+
+    def put(self, sql: str, result: Dict[str, Any], variant: Hashable = None) -> None:
+        """Store a successful result unless it exceeds the per-entry budget."""
+        if not self.enabled or result.get("status") != "success":
+            return
+        canonical, _ = canonicalize(sql)
+        if canonical is None:
+            return
+        key = (canonical, variant)
+        size = _estimate_bytes(result["rows"])
+        if size > self.max_entry_bytes:
+            return
+        entry = dict(result, rows=[list(r) for r in result["rows"]])
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._entries[key] = (entry, size)
+            self._bytes += size
+            self._stats["stores"] += 1
+            while self._bytes > self.max_bytes and self._entries:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._bytes -= evicted
+                self._stats["evictions"] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters plus current entry count and byte usage."""
+        with self._lock:
+            s: Dict[str, Any] = dict(self._stats, entries=len(self._entries), bytes=self._bytes)
+        lookups = s["hits"] + s["misses"]
+        s["hit_rate"] = s["hits"] / lookups if lookups else 0.0
+        return s
+
+
+result_cache = ResultCache()
+
+
+def cache_stats() -> Dict[str, Any]:
+    """Statistics for the shared result cache."""
+    return result_cache.stats()
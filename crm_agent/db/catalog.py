@@ -0,0 +1,323 @@
+"""Schema Catalog - Cached table metadata and compact schema rendering.
+
+The catalog is read from ``sqlite_master`` once and reused until the
+database changes: a new ``PRAGMA schema_version`` rebuilds it, any other
+change to the file only refreshes row counts and value samples. Neither
+scans a large table: row counts are ``MAX(rowid)`` (exact for the tables
+the loader and the ``orders_all`` refresh create), and beyond
+``_SAMPLE_SCAN_ROWS`` rows only indexed columns are sampled, with one
+index seek per distinct value.
+
+``render()`` produces a compact description (one line per table, tables
+with identical columns folded into one line, low-cardinality text columns
+with their values) limited to the tables relevant to a question, which is
+far smaller than the raw ``CREATE TABLE`` dump.
+"""
+import hashlib
+import re
+import sqlite3
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from .pool import connection, file_version
+
+# Columns that identify the same entity across tables
+ENTITY_KEYS: Tuple[str, ...] = ("account", "sales_agent", "product")
+# Materialized union of the monthly order tables (see ``materialize``)
+ORDERS_ALL = "orders_all"
+_SAMPLE_LIMIT = 12  # Text columns with at most this many distinct values list them
+_SAMPLE_SCAN_ROWS = 1000  # Larger tables sample indexed columns only
+
+_MONTHS = {m: i for i, m in enumerate(
+    ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"], start=1)}
+_MONTH_WORDS = {
+    "january": 1, "february": 2, "march": 3, "april": 4, "june": 6, "july": 7, "august": 8,
+    "september": 9, "sept": 9, "october": 10, "november": 11, "december": 12,
+    **_MONTHS,
+}
+_QUARTERS = {"q1": (1, 2, 3), "q2": (4, 5, 6), "q3": (7, 8, 9), "q4": (10, 11, 12)}
+_MONTH_LEVEL = {"month", "months", "monthly", "mom", "trend", "trends", "quarter", "quarterly", "seasonal", "order", "orders"}
+_MONTHLY_TABLE = re.compile(r"^([a-z]{3})_(\d{4})_orders$")
+
+# Column names too generic to select a table: "revenue" in a question means
+# deal/order value, not the accounts' company revenue column
+_GENERIC_COLUMNS = {"revenue"}
+
+# Question words that point at a table without naming one of its columns
+_SYNONYMS: Dict[str, Tuple[str, ...]] = {
+    "deal": ("sales_pipeline",), "deals": ("sales_pipeline",), "stage": ("sales_pipeline",),
+    "pipeline": ("sales_pipeline",), "opportunity": ("sales_pipeline",), "opportunities": ("sales_pipeline",),
+    "team": ("sales_teams_1",), "teams": ("sales_teams_1",), "region": ("sales_teams_1",),
+    "regional": ("sales_teams_1",), "manager": ("sales_teams_1",), "managers": ("sales_teams_1",),
+    "international": ("intl_accounts",), "intl": ("intl_accounts",), "country": ("intl_accounts",),
+    "countries": ("intl_accounts",), "location": ("intl_accounts",), "domestic": ("accounts_3",),
+    "price": ("products",), "prices": ("products",), "series": ("products",),
+}
+
+
+@dataclass
+class TableInfo:
+    """Columns, size and value samples of one table."""
+    name: str
+    ddl: str
+    columns: List[Tuple[str, str]]
+    row_count: int = 0
+    samples: Dict[str, List[Any]] = field(default_factory=dict)
+
+    @property
+    def column_names(self) -> List[str]:
+        return [c for c, _ in self.columns]
+
+    @property
+    def month(self) -> Optional[int]:
+        """Calendar month for ``<mon>_<year>_orders`` tables."""
+        m = _MONTHLY_TABLE.match(self.name)
+        return _MONTHS.get(m.group(1)) if m else None
+
+
+def month_period(table: str) -> Optional[str]:
+    """'YYYY-MM' period of a ``<mon>_<year>_orders`` table, or None."""
+    m = _MONTHLY_TABLE.match(table)
+    return f"{m.group(2)}-{_MONTHS[m.group(1)]:02d}" if m and m.group(1) in _MONTHS else None
+
+
+def _tokens(text: str) -> List[str]:
+    return re.findall(r"[a-z0-9]+", text.lower())
+
+
+def _indexed_columns(conn: sqlite3.Connection, table: str) -> Set[str]:
+    """Columns that lead an index of ``table``."""
+    found = set()
+    for idx in conn.execute(f'PRAGMA index_list("{table}")').fetchall():
+        first = conn.execute(f'PRAGMA index_info("{idx[1]}")').fetchone()
+        if first is not None and first[2] is not None:
+            found.add(first[2])
+    return found
+
+
+def _seek_distinct(conn: sqlite3.Connection, table: str, col: str, limit: int) -> List[Any]:
+    """Up to ``limit`` distinct non-NULL values of an indexed column, one index seek each."""
+    values: List[Any] = []
+    row = conn.execute(f'SELECT "{col}" FROM "{table}" WHERE "{col}" IS NOT NULL ORDER BY "{col}" LIMIT 1').fetchone()
+    while row is not None and len(values) < limit:
+        values.append(row[0])
+        row = conn.execute(
+            f'SELECT "{col}" FROM "{table}" WHERE "{col}" > ? ORDER BY "{col}" LIMIT 1', (row[0],)).fetchone()
+    return values
+
+
+class SchemaCatalog:
+    """Process-wide cache of table metadata, rebuilt when the database changes."""
+
+    def __init__(self):
+        self.tables: Dict[str, TableInfo] = {}
+        self.join_keys: Dict[str, List[str]] = {}
+        self.schema_version: Optional[int] = None
+        self._file_version: Optional[Tuple[Any, ...]] = None
+        self._lock = threading.Lock()
+        self._stats: Dict[str, int] = {"builds": 0, "refreshes": 0, "hits": 0}
+
+    # ── Loading ─────────────────────────────────────────────
+    def _load_schema(self, conn: sqlite3.Connection) -> None:
+        tables: Dict[str, TableInfo] = {}
+        for name, ddl in conn.execute(
+            "SELECT name, sql FROM sqlite_master WHERE type='table' AND sql IS NOT NULL "
+            "AND name NOT LIKE 'sqlite_%' AND name NOT LIKE '\\_%' ESCAPE '\\' ORDER BY rowid"
+        ):
+            cols = [(r[1], r[2] or "") for r in conn.execute(f'PRAGMA table_info("{name}")')]
+            tables[name] = TableInfo(name, ddl, cols)
+        self.tables = tables
+        self.join_keys = {
+            key: [t.name for t in tables.values() if key in t.column_names] for key in ENTITY_KEYS
+        }
+        self.join_keys = {k: v for k, v in self.join_keys.items() if len(v) > 1}
+
+    def _load_stats(self, conn: sqlite3.Connection) -> None:
+        for t in self.tables.values():
+            t.row_count = conn.execute(f'SELECT MAX(rowid) FROM "{t.name}"').fetchone()[0] or 0
+            t.samples = {}
+            small = t.row_count <= _SAMPLE_SCAN_ROWS
+            indexed = set() if small else _indexed_columns(conn, t.name)
+            for col, typ in t.columns:
+                if "CHAR" not in typ.upper() and "TEXT" not in typ.upper() and typ:
+                    continue
+                if small:
+                    values = [r[0] for r in conn.execute(
+                        f'SELECT DISTINCT "{col}" FROM "{t.name}" WHERE "{col}" IS NOT NULL LIMIT {_SAMPLE_LIMIT + 1}'
+                    )]
+                elif col in indexed:
+                    values = _seek_distinct(conn, t.name, col, _SAMPLE_LIMIT + 1)
+                else:
+                    continue
+                if 0 < len(values) <= _SAMPLE_LIMIT:
+                    t.samples[col] = sorted(values, key=str)
+
+    def refresh(self, force: bool = False) -> "SchemaCatalog":
+        """Bring the catalog up to date with the database file."""
+        version = file_version()
+        if not force and version == self._file_version:
+            with self._lock:
+                self._stats["hits"] += 1
+            return self
+        with self._lock:
+            if not force and version == self._file_version:
+                self._stats["hits"] += 1
+                return self
+            with connection() as conn:
+                schema_version = conn.execute("PRAGMA schema_version").fetchone()[0]
+                if force or schema_version != self.schema_version:
+                    self._load_schema(conn)
+                    self.schema_version = schema_version
+                    self._stats["builds"] += 1
+                else:
+                    self._stats["refreshes"] += 1
+                self._load_stats(conn)
+            self._file_version = version
+        return self
+
+    def fingerprint(self) -> str:
+        """Hash of the table and column names.
+
+        Unlike ``schema_version`` it survives reloads that recreate the
+        same tables, so it identifies which SQL still fits the schema.
+        """
+        self.refresh()
+        shape = ";".join(f"{t.name}({','.join(t.column_names)})" for t in sorted(self.tables.values(), key=lambda t: t.name))
+        return hashlib.sha1(shape.encode()).hexdigest()[:16]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self._stats, tables=len(self.tables), schema_version=self.schema_version)
+
+    # ── Relevance ───────────────────────────────────────────
+    def monthly_tables(self, months: Optional[Iterable[int]] = None) -> List[str]:
+        """Monthly order tables in calendar order, optionally for given months only."""
+        wanted = set(months) if months is not None else None
+        found = [t for t in self.tables.values() if t.month is not None and (wanted is None or t.month in wanted)]
+        return [t.name for t in sorted(found, key=lambda t: (t.name[4:8], t.month))]
+
+    def relevant_tables(self, question: str) -> List[str]:
+        """Tables a question plausibly needs, in catalog order.
+
+        Month names, quarters or words like "monthly" select the monthly
+        order tables (instead of ``sales_pipeline``); table and column
+        names, low-cardinality values and a few synonyms add the others.
+        ``sales_pipeline`` is included whenever no fact table matched.
+        """
+        words = _tokens(question)
+        if not words:
+            return list(self.tables)
+        grams = set(words) | {f"{a}_{b}" for a, b in zip(words, words[1:])}
+        picked: Set[str] = set()
+
+        months: Set[int] = set()
+        for w in words:
+            if w == "may" and not _mentions_month_may(question):
+                continue
+            if w in _MONTH_WORDS:
+                months.add(_MONTH_WORDS[w])
+            months.update(_QUARTERS.get(w, ()))
+        if grams & _MONTH_LEVEL:
+            picked.update(self.monthly_tables())
+        elif months:
+            picked.update(self.monthly_tables(months))
+        if (grams & _MONTH_LEVEL or months) and ORDERS_ALL in self.tables:
+            picked.add(ORDERS_ALL)
+
+        for t in self.tables.values():
+            if t.month is not None or t.name == ORDERS_ALL:
+                continue
+            names = {t.name, *t.name.split("_")} - {"sales", "1", "3", "2017"}
+            if grams & names or grams & (set(t.column_names) - set(ENTITY_KEYS) - _GENERIC_COLUMNS):
+                picked.add(t.name)
+                continue
+            for values in t.samples.values():
+                if any(" ".join(_tokens(str(v))) in question.lower() for v in values if len(str(v)) > 2):
+                    picked.add(t.name)
+                    break
+        for w in grams:
+            picked.update(t for t in _SYNONYMS.get(w, ()) if t in self.tables)
+
+        facts = {"sales_pipeline", ORDERS_ALL, *self.monthly_tables()}
+        if not picked & facts and "sales_pipeline" in self.tables:
+            picked.add("sales_pipeline")
+        return [name for name in self.tables if name in picked]
+
+    # ── Rendering ───────────────────────────────────────────
+    def summarize_tables(self, names: Iterable[str]) -> str:
+        """Comma-separated table names, folding 3+ monthly order tables into a count."""
+        names = list(names)
+        monthly = [n for n in names if n in self.tables and self.tables[n].month is not None]
+        if len(monthly) < 3:
+            return ", ".join(names)
+        other = [n for n in names if n not in monthly]
+        return ", ".join(other + [f"{len(monthly)} monthly order tables"])
+
+    def _render_columns(self, t: TableInfo) -> str:
+        parts = []
+        for col, typ in t.columns:
+            s = f"{col} {typ}".strip()
+            if col in t.samples:
+                s += " [" + ", ".join(str(v) for v in t.samples[col]) + "]"
+            parts.append(s)
+        return ", ".join(parts)
+
+    def render(self, question: Optional[str] = None, tables: Optional[Iterable[str]] = None) -> str:
+        """Compact schema text for the given tables, or those relevant to ``question``.
+
+        Tables with identical column lists are folded into one line, and
+        tables left out are listed by name so they can still be asked for.
+        """
+        self.refresh()
+        if tables is not None:
+            names = [n for n in self.tables if n in set(tables)]
+        elif question:
+            names = self.relevant_tables(question)
+        else:
+            names = list(self.tables)
+
+        groups: Dict[Tuple[Tuple[str, str], ...], List[TableInfo]] = {}
+        for n in names:
+            t = self.tables[n]
+            groups.setdefault(tuple(t.columns), []).append(t)
+
+        lines: List[str] = []
+        for members in groups.values():
+            if len(members) == 1 or not all(t.month is not None for t in members):
+                for t in members:
+                    lines.append(f"{t.name} ({t.row_count} rows): {self._render_columns(t)}")
+                continue
+            members.sort(key=lambda t: (t.name[4:8], t.month))
+            sizes = ", ".join(f"{t.name} ({t.row_count})" for t in members)
+            lines.append(f"Monthly tables, identical columns — {sizes}: {self._render_columns(members[0])}")
+
+        keys = []
+        for key, owners in self.join_keys.items():
+            shown = [o for o in owners if o in names]
+            if len(shown) > 1:
+                monthly = [o for o in shown if self.tables[o].month is not None]
+                other = [o for o in shown if self.tables[o].month is None]
+                label = other + (["monthly tables"] if len(monthly) > 1 else monthly)
+                if len(label) < 2:
+                    continue
+                keys.append(f"{key} ({', '.join(label)})")
+        if keys:
+            lines.append("Join keys: " + "; ".join(keys))
+        omitted = [n for n in self.tables if n not in names]
+        if omitted:
+            lines.append("Other tables (not shown): " + ", ".join(omitted))
+        return "\n".join(lines)
+
+    def ddl(self) -> str:
+        """Raw ``CREATE TABLE`` statements for every table."""
+        self.refresh()
+        return "\n\n".join(t.ddl for t in self.tables.values())
+
+
+def _mentions_month_may(question: str) -> bool:
+    """Tell the month "May" from the modal verb "may"."""
+    return bool(re.search(r"\bMay\b|\bmay\s+(?:20\d\d|orders?|sales|revenue)\b|\bin\s+may\b", question))
+
+
+schema_catalog = SchemaCatalog()
@@ -0,0 +1,205 @@
+"""Result Digest - Compact, fixed-size profile of a large query result.
+
+Handing an LLM a thousand raw rows to summarize is slow, costly and
+error-prone (it adds up numbers token by token). Above a row threshold
+the result is replaced, for prompting only, by a digest computed with
+pandas in a few vectorized passes:
+
+- per numeric column: total, mean, min/max, percentiles and null count,
+- per text column: distinct count and the most frequent values,
+- the top-k rows by the main numeric column,
+- a month-over-month series (value, delta, % change) when a column holds
+  dates or months,
+- the first rows as a bounded sample.
+
+When the stored result was truncated, ``digest_query`` re-reads the full
+result in batches (up to ``DIGEST_MAX_SOURCE_ROWS``) so totals and
+percentiles cover every row, not just the ones kept for the prompt.
+
+Every part is capped (columns, top-k, periods, sample), so the digest's
+size does not grow with the row count. The full result stays where it
+was (``query_results``) for export.
+
+pandas and numpy are imported on the first digest, not with the module,
+so they stay off the startup path.
+"""
+import re
+import sqlite3
+import threading
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+from ..config import (
+    DIGEST_MAX_COLUMNS, DIGEST_MAX_PERIODS, DIGEST_MAX_SOURCE_ROWS, DIGEST_MIN_ROWS, DIGEST_SAMPLE_ROWS, DIGEST_TOP_K,
+)
+from .guard import QueryGuard, QueryTooExpensive
+from .queries import stream_sql_query
+
+_PERIOD = re.compile(r"^\d{4}-\d{2}")  # '2017-03', '2017-03-15', '2017-03-15 10:00'
+_ID_NAME = re.compile(r"(^|_)(id|key)$", re.I)
+_METRIC_NAME = re.compile(r"revenue|value|total|amount|sum|sales|count|price", re.I)
+
+
+def _num(value: Any) -> Any:
+    """Plain Python number, rounded for the prompt."""
+    import numpy as np
+
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return None
+    if isinstance(value, (np.integer, int)) or float(value).is_integer():
+        return int(value)
+    return round(float(value), 2)
+
+
+def _metric(df: "pd.DataFrame", numeric: List[str]) -> Optional[str]:
+    """Main measure: a numeric column named like one, else the last non-id numeric column."""
+    candidates = [c for c in numeric if not _ID_NAME.search(c)] or numeric
+    named = [c for c in candidates if _METRIC_NAME.search(c)]
+    return (named or candidates or [None])[-1]
+
+
+def _period_column(df: "pd.DataFrame", text: List[str]) -> Optional[str]:
+    for c in text:
+        values = df[c].dropna().astype(str)
+        if len(values) and values.str.match(_PERIOD).all():
+            return c
+    return None
+
+
+def _trend(df: "pd.DataFrame", period: str, metric: str, max_periods: int) -> Dict[str, Any]:
+    months = df[period].astype(str).str.slice(0, 7)
+    series = df[metric].groupby(months).sum().sort_index()
+    delta = series.diff()
+    pct = series.pct_change(fill_method=None) * 100
+    rows = [[m, _num(v), _num(d), _num(p)] for m, v, d, p in zip(series.index, series.values, delta.values, pct.values)]
+    return {
+        "period_column": period,
+        "metric": metric,
+        "columns": ["month", metric, "delta", "pct_change"],
+        "rows": rows[-max_periods:],
+        "periods": len(rows),
+    }
+
+
+def digest_result(
+    result: Dict[str, Any],
+    min_rows: int = DIGEST_MIN_ROWS,
+    sample_rows: int = DIGEST_SAMPLE_ROWS,
+    top_k: int = DIGEST_TOP_K,
+    max_periods: int = DIGEST_MAX_PERIODS,
+    max_columns: int = DIGEST_MAX_COLUMNS,
+) -> Dict[str, Any]:
+    """The result itself if small or failed, otherwise its digest.
+
+    Args:
+        result: ``run_sql_query`` result (row format)
+        min_rows: Results with more rows than this are digested
+        sample_rows: Leading rows kept verbatim
+        top_k: Rows per top-k list and values per text column
+        max_periods: Most recent months kept in the trend
+        max_columns: Columns profiled
+
+    Returns:
+        Dictionary with status, ``digest: True``, columns, row_count,
+        total_rows, truncated, profiled_rows, numeric, text, top_rows,
+        trend (or None), sample and omitted_columns
+    """
+    rows = result.get("rows") or []
+    if result.get("status") != "success" or len(rows) <= min_rows:
+        return result
+    import numpy as np
+    import pandas as pd
+
+    columns = list(result.get("columns") or [])
+    df = pd.DataFrame.from_records(rows, columns=range(len(columns)))
+    # Duplicate names (e.g. two "account" columns from a join) get a positional suffix
+    names = [c if columns.count(c) == 1 else f"{c}_{i + 1}" for i, c in enumerate(columns)]
+    df.columns = names
+    df = df.infer_objects()
+    profiled = names[:max_columns]
+    numeric = [c for c in profiled if pd.api.types.is_numeric_dtype(df[c]) and not pd.api.types.is_bool_dtype(df[c])]
+    text = [c for c in profiled if c not in numeric]
+
+    numeric_profile: Dict[str, Dict[str, Any]] = {}
+    if numeric:
+        stats = df[numeric].agg(["sum", "mean", "min", "max"])
+        quantiles = df[numeric].quantile([0.25, 0.5, 0.75, 0.9])
+        nulls = df[numeric].isna().sum()
+        for c in numeric:
+            numeric_profile[c] = {
+                "sum": _num(stats.at["sum", c]), "mean": _num(stats.at["mean", c]),
+                "min": _num(stats.at["min", c]), "p25": _num(quantiles.at[0.25, c]),
+                "p50": _num(quantiles.at[0.5, c]), "p75": _num(quantiles.at[0.75, c]),
+                "p90": _num(quantiles.at[0.9, c]), "max": _num(stats.at["max", c]), "nulls": int(nulls[c]),
+            }
+
+    text_profile: Dict[str, Dict[str, Any]] = {}
+    for c in text:
+        counts = df[c].astype("string").value_counts(dropna=True)
+        text_profile[c] = {
+            "distinct": int(counts.size),
+            "nulls": int(df[c].isna().sum()),
+            "top": [[v, int(n)] for v, n in counts.head(top_k).items()],
+        }
+
+    metric = _metric(df, numeric)
+    top_rows = None
+    trend = None
+    if metric is not None:
+        top = df.nlargest(top_k, metric)
+        top_rows = {"by": metric, "rows": [[_num(v) if isinstance(v, (float, np.floating)) else v for v in row]
+                                           for row in top.astype(object).where(top.notna(), None).values.tolist()]}
+        period = _period_column(df, text)
+        if period is not None:
+            trend = _trend(df, period, metric, max_periods)
+
+    return {
+        "status": "success",
+        "digest": True,
+        "columns": columns,
+        "row_count": result.get("row_count", len(rows)),
+        "total_rows": result.get("total_rows", len(rows)),
+        "truncated": result.get("truncated", False),
+        "profiled_rows": len(rows),
+        "numeric": numeric_profile,
+        "text": text_profile,
+        "top_rows": top_rows,
+        "trend": trend,
+        "sample": rows[:sample_rows],
+        "omitted_columns": names[max_columns:],
+    }
+
+
+def digest_query(sql: str, result: Dict[str, Any], max_rows: int = DIGEST_MAX_SOURCE_ROWS,
+                 session: Optional[str] = None, guard: Optional[QueryGuard] = None,
+                 cancel: Optional[threading.Event] = None, **kwargs: Any) -> Dict[str, Any]:
+    """``digest_result`` over the full result of ``sql`` when ``result`` was truncated.
+
+    Rows are re-read in batches up to ``max_rows`` (``session`` lets the
+    query read that session's result tables) under the same ``guard`` and
+    ``cancel`` event as the original run; if the guard rejects or aborts
+    the re-read, the rows already in ``result`` are digested instead.
+    Keyword arguments are forwarded to ``digest_result``. Blocking: run it
+    on a DB thread.
+    """
+    if result.get("status") != "success" or not result.get("truncated") or not sql:
+        return digest_result(result, **kwargs)
+    rows: List[Any] = []
+    batches = stream_sql_query(sql, session=session, guard=guard, cancel=cancel)
+    try:
+        next(batches)  # Column names; the stored result already has them
+        for batch in batches:
+            rows.extend(batch[:max_rows - len(rows)])
+            if len(rows) >= max_rows:
+                break
+    except (QueryTooExpensive, sqlite3.Error, ValueError):
+        return digest_result(result, **kwargs)
+    finally:
+        batches.close()
+    full = dict(result, rows=rows)
+    digest = digest_result(full, **kwargs)
+    if digest is not full:
+        digest["sample"] = result["rows"][:len(digest["sample"])]
+    return digest
@@ -0,0 +1,158 @@
+"""Fuzzy Index - Trigram indexes for typo-tolerant entity lookup.
+
+Each indexed column keeps an inverted index from character trigrams to
+the distinct values containing them. A lookup counts shared (rare)
+trigrams for every value in one vectorized ``bincount``, keeps the best candidates by
+Dice coefficient and re-scores only those with ``difflib``'s ratio, so it
+stays sub-millisecond for 100k+ distinct values instead of running
+``SequenceMatcher`` against every candidate.
+
+Indexes are built lazily per (table, column), or per entity kind across
+every table holding that column, and dropped when the database changes.
+"""
+import difflib
+import re
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .catalog import ENTITY_KEYS, schema_catalog
+from .pool import connection, file_version
+
+_RESCORE = 16  # Candidates re-scored with difflib per lookup
+_COMMON_FRACTION = 0.02  # Trigrams in more than this share of values are skipped
+
+
+def normalize(value: str) -> str:
+    """Lowercase and drop punctuation/whitespace ('Kan-code' -> 'kancode')."""
+    return re.sub(r"[^0-9a-z]+", "", value.lower())
+
+
+def trigrams(norm: str) -> set:
+    padded = f"$${norm}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class TrigramIndex:
+    """Inverted trigram index over a fixed list of string values."""
+
+    def __init__(self, values: Sequence[str]):
+        self.values: List[str] = list(values)
+        self._norms = [normalize(v) for v in self.values]
+        postings: Dict[str, List[int]] = {}
+        sizes = np.zeros(len(self.values), dtype=np.int32)
+        for i, n in enumerate(self._norms):
+            grams = trigrams(n)
+            sizes[i] = len(grams)
+            for g in grams:
+                postings.setdefault(g, []).append(i)
+        self._sizes = sizes
+        self._postings = {g: np.asarray(ids, dtype=np.int32) for g, ids in postings.items()}
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def search(self, term: str, k: int = 5, cutoff: float = 0.0) -> List[Tuple[str, float]]:
+        """Top-``k`` ``(value, score)`` pairs with score >= ``cutoff``, best first.
+
+        The score is ``difflib.SequenceMatcher.ratio`` of the normalized
+        strings, so it is comparable with ``difflib.get_close_matches``.
+        """
+        q = normalize(term)
+        if not q or not self.values:
+            return []
+        grams = trigrams(q)
+        hits = sorted((self._postings[g] for g in grams if g in self._postings), key=len)
+        if not hits:
+            return []
+        # Trigrams shared by a large share of values barely discriminate but
+        # dominate the counting cost; generate candidates from the rarer ones.
+        common = max(_COMMON_FRACTION * len(self.values), _RESCORE)
+        rare = [h for h in hits if len(h) <= common]
+        hits = rare if len(rare) >= min(3, len(hits)) else hits[:3]
+        counts = np.bincount(np.concatenate(hits), minlength=len(self.values))
+        ids = np.flatnonzero(counts)
+        dice = 2.0 * counts[ids] / (len(grams) + self._sizes[ids])
+        if len(ids) > _RESCORE:
+            keep = np.argpartition(-dice, _RESCORE - 1)[:_RESCORE]
+            ids, dice = ids[keep], dice[keep]
+        scored = []
+        matcher = difflib.SequenceMatcher(b=q, autojunk=False)
+        for i in ids[np.argsort(-dice)]:
+            matcher.set_seq1(self._norms[i])
+            if matcher.real_quick_ratio() < cutoff or matcher.quick_ratio() < cutoff:
+                continue
+            score = matcher.ratio()
+            if score >= cutoff:
+                scored.append((self.values[i], score))
+        exact = term.casefold()
+        scored.sort(key=lambda x: (-x[1], x[0].casefold() != exact, x[0]))
+        return scored[:k]
+
+
+class FuzzyIndexRegistry:
+    """Lazily built indexes per column and per entity kind."""
+
+    def __init__(self):
+        self._columns: Dict[Tuple[str, str], TrigramIndex] = {}
+        self._entities: Dict[str, Tuple[TrigramIndex, Dict[str, List[str]]]] = {}
+        self._version: Optional[Tuple[Any, ...]] = None
+        self._lock = threading.Lock()
+
+    def _check_version(self) -> None:
+        version = file_version()
+        if version != self._version:
+            self._columns.clear()
+            self._entities.clear()
+            self._version = version
+
+    def _distinct(self, table: str, column: str) -> List[str]:
+        t = schema_catalog.refresh().tables.get(table)
+        if t is None or column not in t.column_names:
+            raise KeyError(f"Unknown column {table}.{column}")
+        with connection() as conn:
+            rows = conn.execute(f'SELECT DISTINCT "{column}" FROM "{table}" WHERE "{column}" IS NOT NULL').fetchall()
+        return [str(r[0]) for r in rows if r[0]]
+
+    def column(self, table: str, column: str) -> TrigramIndex:
+        """Index of the distinct values of ``table.column``.
+
+        Raises:
+            KeyError: If the table or column does not exist
+        """
+        with self._lock:
+            self._check_version()
+            index = self._columns.get((table, column))
+            if index is None:
+                index = self._columns[(table, column)] = TrigramIndex(self._distinct(table, column))
+            return index
+
+    def entity(self, kind: str) -> Tuple[TrigramIndex, Dict[str, List[str]]]:
+        """Index over ``kind`` values from every table with that column, plus their owning tables."""
+        with self._lock:
+            self._check_version()
+            if kind not in self._entities:
+                owners: Dict[str, List[str]] = {}
+                for t in schema_catalog.refresh().tables.values():
+                    if kind in t.column_names:
+                        for v in self._distinct(t.name, kind):
+                            owners.setdefault(v, []).append(t.name)
+                self._entities[kind] = (TrigramIndex(list(owners)), owners)
+            return self._entities[kind]
+
+    def warm(self, kinds: Sequence[str] = ENTITY_KEYS) -> None:
+        """Build the entity indexes ahead of the first lookup."""
+        for kind in kinds:
+            if any(kind in t.column_names for t in schema_catalog.refresh().tables.values()):
+                self.entity(kind)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "columns": {f"{t}.{c}": len(i) for (t, c), i in self._columns.items()},
+                "entities": {k: len(i) for k, (i, _) in self._entities.items()},
+            }
+
+
+fuzzy_index = FuzzyIndexRegistry()
@@ -0,0 +1,201 @@
+"""Query Guard - Cost limits for generated SQL.
+
+Two layers protect a worker from runaway LLM-written queries:
+
+1. Before execution, ``EXPLAIN QUERY PLAN`` is inspected and a query is
+   rejected when full scans feed a nested-loop join whose estimated row
+   combinations exceed ``max_plan_rows``.
+2. During execution, a progress handler aborts the statement once it
+   exceeds its wall-clock timeout or VM-step budget.
+
+Both surface as ``QueryTooExpensive``, which ``to_result()`` turns into a
+structured error the SQL debugger can act on.
+"""
+import re
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from sqlglot import exp
+from sqlglot.errors import SqlglotError
+
+from ..config import QUERY_GUARDS
+from .parsing import parse_sql
+from .pool import file_version
+
+_PROGRESS_INTERVAL = 10_000  # VM instructions between progress-handler calls
+_SCAN = re.compile(r"^SCAN (\S+)")
+_SUBQUERY = re.compile(r"^(?:MATERIALIZE|CO-ROUTINE) (\S+)")
+
+_HINTS = {
+    "plan": "Add join conditions between every pair of joined tables, aggregate each source in a CTE before joining, or filter earlier.",
+    "timeout": "Reduce the data scanned: filter earlier, aggregate before joining, or avoid joining the monthly order tables to each other.",
+    "vm_steps": "Reduce the data scanned: filter earlier, aggregate before joining, or avoid joining the monthly order tables to each other.",
+}
+
+
+class QueryTooExpensive(Exception):
+    """Raised when a query is rejected or aborted by a ``QueryGuard``."""
+
+    def __init__(self, reason: str, message: str, **details: Any):
+        super().__init__(message)
+        self.reason = reason
+        self.details = details
+
+    def to_result(self) -> Dict[str, Any]:
+        """Structured ``run_sql_query`` error payload."""
+        return {
+            "status": "error",
+            "error": f"Query too expensive: {self}",
+            "error_type": "too_expensive",
+            "reason": self.reason,
+            "hint": _HINTS.get(self.reason, ""),
+            **self.details,
+        }
+
+
+# ── Table size estimates ────────────────────────────────────
+_row_estimates: Dict[str, int] = {}
+_row_estimates_version: Optional[Tuple[Any, ...]] = None
+_row_estimates_lock = threading.Lock()
+
+
+def estimate_table_rows(conn: sqlite3.Connection, table: str) -> Optional[int]:
+    """Cheap row-count estimate (``MAX(rowid)``), cached per database version."""
+    global _row_estimates_version
+    version = file_version()
+    with _row_estimates_lock:
+        if version != _row_estimates_version:
+            _row_estimates.clear()
+            _row_estimates_version = version
+        if table in _row_estimates:
+            return _row_estimates[table]
+    try:
+        n = conn.execute(f'SELECT MAX(rowid) FROM "{table}"').fetchone()[0] or 0
+    except sqlite3.Error:
+        return None
+    with _row_estimates_lock:
+        _row_estimates[table] = n
+    return n
+
+
+def table_aliases(sql: str) -> Dict[str, str]:
+    """Map every alias (or bare name) used in the FROM clauses to its table."""
+    try:
+        tree = parse_sql(sql)
+    except SqlglotError:
+        return {}
+    return {t.alias_or_name: t.name for t in tree.find_all(exp.Table)}
+
+
+# ── Guard ───────────────────────────────────────────────────
+class QueryGuard:
+    """Per-agent execution budget for SQL statements."""
+
+    def __init__(self, timeout_s: float, max_vm_steps: int, max_plan_rows: int):
+        self.timeout_s = timeout_s
+        self.max_vm_steps = max_vm_steps
+        self.max_plan_rows = max_plan_rows
+
+    @classmethod
+    def for_agent(cls, name: str) -> "QueryGuard":
+        """Guard configured in ``QUERY_GUARDS`` for an agent package."""
+        cfg = QUERY_GUARDS[name]
+        return cls(float(cfg["timeout_s"]), int(cfg["max_vm_steps"]), int(cfg["max_plan_rows"]))
+
+    def estimate_plan_rows(self, conn: sqlite3.Connection, sql: str) -> int:
+        """Largest estimated row-combination count of any nested-loop group.
+
+        Plan nodes sharing a parent form one nested loop; each ``SCAN``
+        multiplies the loop by the scanned table's size, while ``SEARCH``
+        (index lookups) is treated as constant per outer row. Materialized
+        subqueries and co-routines are sized by their own loop estimate.
+        """
+        plan = conn.execute(f"EXPLAIN QUERY PLAN {sql}").fetchall()
+        aliases = table_aliases(sql)
+        children: Dict[int, List[Tuple[int, str]]] = {}
+        for node_id, parent, _, detail in plan:
+            children.setdefault(parent, []).append((node_id, detail))
+        subquery_rows: Dict[str, int] = {}
+        worst = 0
+
+        def loop_rows(parent: int) -> int:
+            nonlocal worst
+            rows, scans = 1, 0
+            for node_id, detail in children.get(parent, []):
+                sub = _SUBQUERY.match(detail)
+                if sub:
+                    subquery_rows[sub.group(1)] = loop_rows(node_id)
+                    continue
+                if node_id in children:
+                    loop_rows(node_id)
+                scan = _SCAN.match(detail)
+                if not scan or detail.startswith("SCAN CONSTANT ROW"):
+                    continue
+                name = scan.group(1)
+                if name in subquery_rows:
+                    n = subquery_rows[name]
+                else:
+                    n = estimate_table_rows(conn, aliases.get(name, name)) or 1
+                rows *= max(n, 1)
+                scans += 1
+            if scans > 1:
+                worst = max(worst, rows)
+            return rows
+
+        loop_rows(0)
+        return worst
+
+    def check_plan(self, conn: sqlite3.Connection, sql: str) -> None:
+        """Raise ``QueryTooExpensive`` if the plan's nested loops are too large."""
+        if self.max_plan_rows <= 0:
+            return
+        try:
+            estimate = self.estimate_plan_rows(conn, sql)
+        except sqlite3.Error:
+            return  # Let execution report the real error
+        if estimate > self.max_plan_rows:
+            raise QueryTooExpensive(
+                "plan",
+                f"full table scans feed a nested-loop join visiting ~{estimate:,} row combinations "
+                f"(limit {self.max_plan_rows:,})",
+                estimated_rows=estimate,
+                limit=self.max_plan_rows,
+            )
+
+    @contextmanager
+    def limits(self, conn: sqlite3.Connection, cancel: Optional[threading.Event] = None) -> Iterator[None]:
+        """Enforce the timeout and VM-step budget on ``conn`` inside the block.
+
+        ``cancel`` aborts the running statement as soon as it is set.
+        """
+        deadline = time.monotonic() + self.timeout_s if self.timeout_s > 0 else None
+        state = {"steps": 0, "tripped": None}
+
+        def progress() -> int:
+            state["steps"] += _PROGRESS_INTERVAL
+            if cancel is not None and cancel.is_set():
+                state["tripped"] = "cancelled"
+            elif deadline is not None and time.monotonic() > deadline:
+                state["tripped"] = "timeout"
+            elif self.max_vm_steps > 0 and state["steps"] > self.max_vm_steps:
+                state["tripped"] = "vm_steps"
+            return 1 if state["tripped"] else 0
+
+        conn.set_progress_handler(progress, _PROGRESS_INTERVAL)
+        try:
+            yield
+        except sqlite3.OperationalError as e:
+            reason = state["tripped"]
+            if reason == "timeout":
+                raise QueryTooExpensive(reason, f"exceeded the {self.timeout_s:g}s time limit",
+                                        limit=self.timeout_s) from e
+            if reason == "vm_steps":
+                raise QueryTooExpensive(reason, f"exceeded the {self.max_vm_steps:,} VM-step budget",
+                                        limit=self.max_vm_steps) from e
+            raise
+        finally:
+            conn.set_progress_handler(None, 0)
+
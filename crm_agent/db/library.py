@@ -0,0 +1,217 @@
+"""SQL Library - Verified question -> SQL pairs reused for recurring questions.
+
+Whenever a pipeline verifies that a query answered a question, the pair is
+stored together with the schema fingerprint it ran against. A later
+question is looked up with a local TF-IDF index (unigrams and bigrams of
+the question's content words, cosine similarity) and, on a confident hit,
+the stored SQL is reused instead of generating a new one.
+
+A hit needs both:
+
+- the same content words (after dropping filler words like "show me the"
+  and plural endings), so a changed filter value, number or entity never
+  matches, and
+- a cosine score of at least ``SQL_LIBRARY_MIN_SCORE``, which rejects
+  questions using the same words in a different arrangement.
+
+Entries live in a small SQLite file (``SQL_LIBRARY_PATH``) separate from
+the read-only CRM database; entries recorded against another schema
+fingerprint are ignored.
+"""
+import math
+import re
+import sqlite3
+import threading
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+
+from ..config import SQL_LIBRARY_PATH, SQL_LIBRARY_MIN_SCORE
+
+# Words that do not change which rows a question asks for. Negations,
+# comparisons and grouping words ("not", "top", "by", "per") are kept.
+_STOPWORDS = frozenset("""
+a an the of for in on at to from with and or is are was were be been do does did
+what which who whom whose how show me list give get find tell display return please
+i we you my our your can could would should will let us all any there their its this that these those
+""".split())
+
+
+def normalize_question(question: str) -> str:
+    """Lowercase words and numbers only ('What is  Q3 revenue?' -> 'what is q3 revenue')."""
+    return " ".join(re.findall(r"[a-z0-9]+(?:[.'][a-z0-9]+)*", question.lower()))
+
+
+def _stem(word: str) -> str:
+    if len(word) > 3 and word.endswith("s") and not word.endswith("ss") and not word.isdigit():
+        return word[:-1]
+    return word
+
+
+def content_terms(normalized: str) -> List[str]:
+    """Stemmed content words of a normalized question, in order."""
+    return [_stem(w) for w in normalized.split() if w not in _STOPWORDS]
+
+
+def _features(words: List[str]) -> Counter:
+    grams = Counter(words)
+    grams.update(f"{a} {b}" for a, b in zip(words, words[1:]))
+    return grams
+
+
+@dataclass
+class LibraryMatch:
+    """A stored query judged to answer a new question."""
+    id: int
+    question: str
+    sql: str
+    score: float
+
+
+class SqlLibrary:
+    """Store of verified question/SQL pairs with a TF-IDF lookup index."""
+
+    def __init__(self, path: Optional[str] = SQL_LIBRARY_PATH, min_score: float = SQL_LIBRARY_MIN_SCORE):
+        self.path = path or None
+        self.min_score = min_score
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._failed = False
+        # Index over the entries of one schema fingerprint, rebuilt when entries change
+        self._indexed: Optional[str] = None
+        self._entries: Dict[int, Tuple[str, str, FrozenSet[str], Counter]] = {}
+        self._postings: Dict[str, List[int]] = {}
+        self._norms: Dict[int, float] = {}
+        self._stats: Dict[str, int] = {"lookups": 0, "hits": 0, "recorded": 0, "forgotten": 0}
+
+    # ── Storage ─────────────────────────────────────────────
+    def _db(self) -> Optional[sqlite3.Connection]:
+        if self._conn is None and self.path and not self._failed:
+            try:
+                conn = sqlite3.connect(self.path, check_same_thread=False)
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS entries (id INTEGER PRIMARY KEY, question TEXT NOT NULL, "
+                    "normalized TEXT NOT NULL, sql TEXT NOT NULL, schema TEXT NOT NULL, hits INTEGER NOT NULL DEFAULT 0, "
+                    "created_at TEXT NOT NULL, used_at TEXT NOT NULL, UNIQUE (normalized, schema))"
+                )
+                conn.commit()
+                self._conn = conn
+            except sqlite3.Error:
+                self._failed = True  # The library is an optimization; never fail the pipeline over it
+        return self._conn
+
+    def record(self, question: str, sql: str, schema: str) -> Optional[int]:
+        """Store a verified pair; returns its id.
+
+        An entry already on file for the question keeps its SQL: the pair is
+        only replaced after ``forget`` dropped the stored one as failing.
+        """
+        normalized = normalize_question(question)
+        if not normalized or not sql.strip():
+            return None
+        with self._lock:
+            conn = self._db()
+            if conn is None:
+                return None
+            try:
+                inserted = conn.execute(
+                    "INSERT INTO entries (question, normalized, sql, schema, created_at, used_at) "
+                    "VALUES (?, ?, ?, ?, datetime('now'), datetime('now')) "
+                    "ON CONFLICT (normalized, schema) DO NOTHING",
+                    (question.strip(), normalized, sql.strip(), schema),
+                ).rowcount
+                row = conn.execute(
+                    "SELECT id FROM entries WHERE normalized = ? AND schema = ?", (normalized, schema)).fetchone()
+                conn.commit()
+            except sqlite3.Error:
+                return None
+            if inserted:
+                self._indexed = None
+                self._stats["recorded"] += 1
+            return row[0]
+
+    def touch(self, entry_id: int) -> None:
+        """Count a reuse of an entry."""
+        with self._lock:
+            conn = self._db()
+            if conn is None:
+                return
+            try:
+                conn.execute("UPDATE entries SET hits = hits + 1, used_at = datetime('now') WHERE id = ?", (entry_id,))
+                conn.commit()
+            except sqlite3.Error:
+                pass
+
+    def forget(self, entry_id: int) -> None:
+        """Drop an entry whose SQL no longer answers its question."""
+        with self._lock:
+            conn = self._db()
+            if conn is None:
+                return
+            try:
+                conn.execute("DELETE FROM entries WHERE id = ?", (entry_id,))
+                conn.commit()
+            except sqlite3.Error:
+                return
+            self._indexed = None
+            self._stats["forgotten"] += 1
+
+    # ── Index ───────────────────────────────────────────────
+    def _build(self, conn: sqlite3.Connection, schema: str) -> None:
+        entries, postings = {}, {}
+        for entry_id, question, normalized, sql in conn.execute(
+            "SELECT id, question, normalized, sql FROM entries WHERE schema = ?", (schema,)
+        ):
+            words = content_terms(normalized)
+            grams = _features(words)
+            entries[entry_id] = (question, sql, frozenset(words), grams)
+            for g in grams:
+                postings.setdefault(g, []).append(entry_id)
+        self._entries, self._postings, self._indexed = entries, postings, schema
+        self._norms = {i: math.sqrt(sum((tf * self._idf(g)) ** 2 for g, tf in e[3].items()))
+                       for i, e in entries.items()}
+
+    def _idf(self, gram: str) -> float:
+        return math.log((1 + len(self._entries)) / (1 + len(self._postings.get(gram, ())))) + 1.0
+
+    def lookup(self, question: str, schema: str) -> Optional[LibraryMatch]:
+        """Best stored entry answering ``question`` under ``schema``, or None."""
+        words = content_terms(normalize_question(question))
+        if not words:
+            return None
+        with self._lock:
+            self._stats["lookups"] += 1
+            conn = self._db()
+            if conn is None:
+                return None
+            if self._indexed != schema:
+                try:
+                    self._build(conn, schema)
+                except sqlite3.Error:
+                    return None
+            grams = _features(words)
+            query = {g: tf * self._idf(g) for g, tf in grams.items()}
+            norm = math.sqrt(sum(w * w for w in query.values()))
+            dots: Dict[int, float] = {}
+            for g, w in query.items():
+                for entry_id in self._postings.get(g, ()):
+                    dots[entry_id] = dots.get(entry_id, 0.0) + w * self._entries[entry_id][3][g] * self._idf(g)
+            terms = frozenset(words)
+            best: Optional[LibraryMatch] = None
+            for entry_id, dot in dots.items():
+                stored_question, sql, stored_terms, _ = self._entries[entry_id]
+                if stored_terms != terms:
+                    continue
+                score = dot / (norm * self._norms[entry_id]) if norm and self._norms[entry_id] else 0.0
+                if score >= self.min_score and (best is None or score > best.score):
+                    best = LibraryMatch(entry_id, stored_question, sql, round(score, 4))
+            if best is not None:
+                self._stats["hits"] += 1
+            return best
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self._stats, indexed=len(self._entries))
+
+
+sql_library = SqlLibrary()
@@ -0,0 +1,197 @@
+"""Materialized Tables - ``orders_all``, one indexed copy of the monthly order tables.
+
+Month-level questions otherwise need a ten-way ``UNION ALL`` that rescans
+every ``<mon>_<year>_orders`` table. ``orders_all`` holds the same rows in
+the same order plus a ``month`` column ('2017-03'), and is indexed on the
+entity keys, ``create_date`` and ``month``.
+
+A signature of the sources (row count, max rowid and per-column totals of
+each monthly table) is stored in ``_materializations``. The loader
+(``python -m data``) calls ``refresh_orders_all()`` after every load,
+which rebuilds the table only when the signature no longer matches. The
+query path only compares signatures and leaves ``orders_all`` out of
+rewrites and rollup routing while they differ. With
+``ORDERS_ALL_AUTO_REFRESH`` on, the first query after a change rebuilds
+it instead; that opens a write connection and is meant for development
+databases only.
+
+Only the standard library is imported here, so the loader can use it.
+"""
+import json
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..config import DB_PATH, ORDERS_ALL_AUTO_REFRESH
+from .catalog import ORDERS_ALL, month_period
+from .pool import connection, file_version
+
+META_TABLE = "_materializations"
+ORDERS_ALL_INDEXES: Tuple[str, ...] = ("account", "sales_agent", "product", "create_date", "month")
+
+Source = Tuple[str, str, List[Tuple[str, str]]]  # (table, 'YYYY-MM', [(column, type)])
+
+
+def monthly_sources(conn: sqlite3.Connection) -> List[Source]:
+    """Every monthly order table with its period and columns, in calendar order."""
+    found = []
+    for (name,) in conn.execute("SELECT name FROM sqlite_master WHERE type='table'"):
+        period = month_period(name)
+        if period:
+            cols = [(r[1], r[2] or "") for r in conn.execute(f'PRAGMA table_info("{name}")')]
+            found.append((name, period, cols))
+    return sorted(found, key=lambda s: s[1])
+
+
+def signature(conn: sqlite3.Connection, sources: List[Source]) -> str:
+    """Cheap content fingerprint of the source tables."""
+    parts = []
+    for name, period, cols in sources:
+        totals = ", ".join(f'TOTAL("{c}"), TOTAL(LENGTH("{c}"))' for c, _ in cols)
+        row = conn.execute(f'SELECT COUNT(*), MAX(rowid), {totals} FROM "{name}"').fetchone()
+        parts.append([name, period, [c for c, _ in cols], list(row)])
+    return json.dumps(parts)
+
+
+def stored_signature(conn: sqlite3.Connection) -> Optional[str]:
+    """Signature ``orders_all`` was built from, or None if it was never built."""
+    exists = conn.execute(
+        "SELECT COUNT(*) FROM sqlite_master WHERE type='table' AND name IN (?, ?)", (ORDERS_ALL, META_TABLE)
+    ).fetchone()[0]
+    if exists < 2:
+        return None
+    row = conn.execute(f'SELECT signature FROM "{META_TABLE}" WHERE name = ?', (ORDERS_ALL,)).fetchone()
+    return row[0] if row else None
+
+
+# ── Refresh ─────────────────────────────────────────────────
+def refresh_orders_all(path: str = DB_PATH, force: bool = False) -> Dict[str, Any]:
+    """Rebuild ``orders_all`` in the database at ``path`` if its sources changed.
+
+    Args:
+        path: Database file, opened read-write for the rebuild
+        force: Rebuild even if the stored signature still matches
+
+    Returns:
+        Dictionary with status ("refreshed" or "fresh"), rows, tables and
+        seconds on success or status and error message on failure
+    """
+    started = time.perf_counter()
+    try:
+        conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+    except sqlite3.Error as e:
+        return {"status": "error", "error": str(e)}
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        sources = monthly_sources(conn)
+        if not sources:
+            conn.execute("ROLLBACK")
+            return {"status": "error", "error": "No monthly order tables to materialize"}
+        columns = sources[0][2]
+        mismatched = [name for name, _, cols in sources if cols != columns]
+        if mismatched:
+            conn.execute("ROLLBACK")
+            return {"status": "error", "error": f"Monthly tables with different columns: {', '.join(mismatched)}"}
+        if any(c == "month" for c, _ in columns):
+            conn.execute("ROLLBACK")
+            return {"status": "error", "error": "Monthly tables already have a 'month' column"}
+
+        sig = signature(conn, sources)
+        if not force and stored_signature(conn) == sig:
+            conn.execute("ROLLBACK")
+            return {"status": "fresh", "tables": len(sources), "seconds": time.perf_counter() - started}
+
+        col_list = ", ".join(f'"{c}"' for c, _ in columns)
+        col_defs = ", ".join(f'"{c}" {t}'.strip() for c, t in columns)
+        saved = [r[0] for r in conn.execute(
+            "SELECT sql FROM sqlite_master WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL", (ORDERS_ALL,))]
+        conn.execute(f'DROP TABLE IF EXISTS "{ORDERS_ALL}"')
+        conn.execute(f'CREATE TABLE "{ORDERS_ALL}" ({col_defs}, "month" TEXT NOT NULL)')
+        for name, period, _ in sources:
+            conn.execute(
+                f'INSERT INTO "{ORDERS_ALL}" ({col_list}, "month") SELECT {col_list}, ? FROM "{name}" ORDER BY rowid',
+                (period,),
+            )
+        names = {c for c, _ in columns} | {"month"}
+        for col in ORDERS_ALL_INDEXES:
+            if col in names:
+                conn.execute(f'CREATE INDEX "idx_{ORDERS_ALL}_{col}" ON "{ORDERS_ALL}" ("{col}")')
+        for ddl in saved:  # Keep indexes added later, e.g. by the index advisor
+            try:
+                conn.execute(ddl)
+            except sqlite3.OperationalError:
+                pass
+        conn.execute(f'ANALYZE "{ORDERS_ALL}"')
+        rows = conn.execute(f'SELECT COUNT(*) FROM "{ORDERS_ALL}"').fetchone()[0]
+        conn.execute(
+            f'CREATE TABLE IF NOT EXISTS "{META_TABLE}" '
+            "(name TEXT PRIMARY KEY, signature TEXT NOT NULL, row_count INTEGER, refreshed_at TEXT)"
+        )
+        conn.execute(
+            f"INSERT OR REPLACE INTO \"{META_TABLE}\" VALUES (?, ?, ?, datetime('now'))",
+            (ORDERS_ALL, sig, rows),
+        )
+        conn.execute("COMMIT")
+    except sqlite3.Error as e:
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")
+        return {"status": "error", "error": str(e)}
+    finally:
+        conn.close()
+    return {"status": "refreshed", "rows": rows, "tables": len(sources), "seconds": time.perf_counter() - started}
+
+
+# ── Freshness ───────────────────────────────────────────────
+@dataclass
+class OrdersAllState:
+    """Whether ``orders_all`` can stand in for the monthly tables."""
+    fresh: bool
+    periods: Dict[str, str] = field(default_factory=dict)  # Monthly table -> 'YYYY-MM'
+    counts: Dict[str, int] = field(default_factory=dict)   # 'YYYY-MM' -> rows in orders_all
+    columns: List[str] = field(default_factory=list)       # Source columns, without month
+    error: Optional[str] = None                             # Why the last refresh failed
+
+
+def _read_state() -> OrdersAllState:
+    with connection() as conn:
+        sources = monthly_sources(conn)
+        if not sources:
+            return OrdersAllState(False)
+        state = OrdersAllState(False, {n: p for n, p, _ in sources}, columns=[c for c, _ in sources[0][2]])
+        stored = stored_signature(conn)
+        if stored is not None and stored == signature(conn, sources):
+            state.fresh = True
+            state.counts = dict(conn.execute(f'SELECT month, COUNT(*) FROM "{ORDERS_ALL}" GROUP BY month'))
+    return state
+
+
+_state: Optional[OrdersAllState] = None
+_state_version: Optional[Tuple[Any, ...]] = None
+_state_lock = threading.Lock()
+
+
+def orders_all_state(auto_refresh: bool = ORDERS_ALL_AUTO_REFRESH) -> OrdersAllState:
+    """Freshness of ``orders_all``, checked once per database version.
+
+    A stale materialization is only reported, unless ``auto_refresh`` is
+    on: then it is rebuilt first, and a failed rebuild is not retried
+    until the database changes again.
+    """
+    global _state, _state_version
+    with _state_lock:
+        version = file_version()
+        if _state is not None and version == _state_version:
+            return _state
+        state = _read_state()
+        if not state.fresh and state.periods and auto_refresh:
+            result = refresh_orders_all()
+            if result["status"] == "error":
+                state.error = result["error"]
+            else:
+                version = file_version()
+                state = _read_state()
+        _state, _state_version = state, version
+        return state
+
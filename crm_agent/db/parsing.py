@@ -0,0 +1,65 @@
+"""SQL Parsing - Shared cache of parsed statements.
+
+One validate -> execute -> correct iteration looks at the same statement
+several times: the semantic validator, the result-cache key, the UNION ALL
+rewrite and the query guard each need its syntax tree. ``parse_sql``
+parses a statement once and hands out the cached tree (or re-raises the
+cached parse error) for every later request, keyed by a hash of the
+statement text.
+
+Cached trees are shared: callers that modify a tree must ``copy()`` it.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, Union
+
+import sqlglot
+from sqlglot import exp
+from sqlglot.errors import ParseError, SqlglotError
+
+from ..config import SQL_PARSE_CACHE_SIZE
+
+_cache: "OrderedDict[str, Union[exp.Expression, SqlglotError]]" = OrderedDict()
+_lock = threading.Lock()
+_stats: Dict[str, int] = {"hits": 0, "misses": 0}
+
+
+def sql_key(sql: str) -> str:
+    """Hash identifying a statement, ignoring surrounding whitespace and a trailing ';'."""
+    return hashlib.sha1(sql.strip().rstrip(";").strip().encode()).hexdigest()
+
+
+def parse_sql(sql: str) -> exp.Expression:
+    """Parsed (SQLite dialect) tree of ``sql``, from the cache when possible.
+
+    Raises:
+        SqlglotError: If the statement does not parse
+    """
+    key = sql_key(sql)
+    with _lock:
+        cached = _cache.get(key)
+        if cached is not None:
+            _cache.move_to_end(key)
+            _stats["hits"] += 1
+    if cached is None:
+        try:
+            cached = sqlglot.parse_one(sql, read="sqlite")
+            if cached is None:
+                cached = ParseError("No SQL statement found")
+        except SqlglotError as e:
+            cached = e
+        with _lock:
+            _stats["misses"] += 1
+            _cache[key] = cached
+            while len(_cache) > SQL_PARSE_CACHE_SIZE:
+                _cache.popitem(last=False)
+    if isinstance(cached, SqlglotError):
+        raise cached
+    return cached
+
+
+def parse_stats() -> Dict[str, int]:
+    """Hit/miss counters and size of the parse cache."""
+    with _lock:
+        return dict(_stats, entries=len(_cache))
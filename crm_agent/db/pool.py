@@ -0,0 +1,233 @@
+"""Connection Pool - Shared read-only SQLite connections.
+
+Opening a connection costs a file open, a schema parse and a cold page
+cache, so tool calls borrow an already-warm connection instead. Idle
+connections are kept on a LIFO stack: the most recently released (and
+therefore hottest) connection is handed out first.
+
+With snapshot serving on (``CRM_SNAPSHOT=1``) the shared pool opens its
+connections to the in-memory snapshot instead (see ``snapshot``).
+"""
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from urllib.request import pathname2url
+
+from ..config import DB_PATH, DB_POOL_SIZE, DB_MMAP_SIZE, DB_CACHE_SIZE_KB, SNAPSHOT_SERVING
+from .snapshot import Snapshot, SnapshotManager, disk_version, snapshots
+
+
+def _file_identity(path: str) -> Optional[Tuple[int, int]]:
+    """(device, inode) of the database file, or None if it is missing."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_dev, st.st_ino
+
+
+def file_version(path: str = DB_PATH) -> Tuple[Any, ...]:
+    """Identity, mtime and size of the database file and its WAL.
+
+    Changes whenever the file is replaced or a write is committed to it,
+    so it can tag anything derived from the database contents. While a
+    snapshot is served, it is the version of the file the snapshot was
+    copied from, and changes when the next snapshot is swapped in.
+    """
+    if SNAPSHOT_SERVING and path == DB_PATH:
+        return snapshots.version()
+    return disk_version(path)
+
+
+class _PooledConnection:
+    """A connection plus the file identity it was opened against."""
+    __slots__ = ("conn", "identity")
+
+    def __init__(self, conn: sqlite3.Connection, identity: Optional[Tuple[int, int]]):
+        self.conn = conn
+        self.identity = identity
+
+
+class ConnectionPool:
+    """Pool of read-only connections opened with a ``mode=ro`` URI.
+
+    Connections are created with ``check_same_thread=False`` so a borrowed
+    connection may be used from whichever thread or task holds it; a
+    connection is only ever held by one borrower at a time.
+
+    Given a ``snapshot`` manager, connections go to its current in-memory
+    snapshot and are retired once a newer one is swapped in.
+    """
+
+    def __init__(
+        self,
+        path: str = DB_PATH,
+        max_idle: int = DB_POOL_SIZE,
+        mmap_size: int = DB_MMAP_SIZE,
+        cache_size_kb: int = DB_CACHE_SIZE_KB,
+        snapshot: Optional[SnapshotManager] = None,
+    ):
+        self.path = path
+        self.max_idle = max_idle
+        self.mmap_size = mmap_size
+        self.cache_size_kb = cache_size_kb
+        self.snapshot = snapshot
+        self._idle: List[_PooledConnection] = []
+        self._lock = threading.Lock()
+        self._stats: Dict[str, int] = {"hits": 0, "misses": 0, "discarded": 0, "in_use": 0}
+        if snapshot is not None:
+            snapshot.on_swap(self._retire)
+
+    # ── Connection lifecycle ────────────────────────────────
+    def _identity(self) -> Any:
+        """What a connection must have been opened against to be reused."""
+        if self.snapshot is not None:
+            return self.snapshot.current().generation
+        return _file_identity(self.path)
+
+    def _open(self) -> _PooledConnection:
+        if self.snapshot is not None:
+            served = self.snapshot.current()
+            conn = sqlite3.connect(served.uri, uri=True, check_same_thread=False)
+            identity: Any = served.generation
+        else:
+            conn = sqlite3.connect(f"file:{pathname2url(self.path)}?mode=ro", uri=True, check_same_thread=False)
+            conn.execute(f"PRAGMA mmap_size = {int(self.mmap_size)}")
+            identity = _file_identity(self.path)
+        conn.execute(f"PRAGMA cache_size = -{int(self.cache_size_kb)}")
+        conn.execute("PRAGMA temp_store = MEMORY")
+        conn.execute("PRAGMA query_only = ON")
+        return _PooledConnection(conn, identity)
+
+    def _retire(self, served: Snapshot) -> None:
+        """Close idle connections to older snapshots so their memory is freed."""
+        with self._lock:
+            stale = [pc for pc in self._idle if pc.identity != served.generation]
+            self._idle = [pc for pc in self._idle if pc.identity == served.generation]
+            self._stats["discarded"] += len(stale)
+        for pc in stale:
+            pc.conn.close()
+
+    def _healthy(self, pc: _PooledConnection) -> bool:
+        """A connection is reusable if its file (or snapshot) was not replaced and it still answers."""
+        if pc.identity != self._identity():
+            return False
+        try:
+            pc.conn.execute("SELECT 1").fetchone()
+        except sqlite3.Error:
+            return False
+        return True
+
+    def _acquire(self) -> _PooledConnection:
+        while True:
+            with self._lock:
+                pc = self._idle.pop() if self._idle else None
+            if pc is None:
+                pc = self._open()
+                with self._lock:
+                    self._stats["misses"] += 1
+                    self._stats["in_use"] += 1
+                return pc
+            if self._healthy(pc):
+                with self._lock:
+                    self._stats["hits"] += 1
+                    self._stats["in_use"] += 1
+                return pc
+            pc.conn.close()
+            with self._lock:
+                self._stats["discarded"] += 1
+
+    def _release(self, pc: _PooledConnection) -> None:
+        try:
+            if pc.conn.in_transaction:
+                pc.conn.rollback()
+        except sqlite3.Error:
+            pc.conn.close()
+            with self._lock:
+                self._stats["in_use"] -= 1
+                self._stats["discarded"] += 1
+            return
+        retired = self.snapshot is not None and pc.identity != self.snapshot.current().generation
+        with self._lock:
+            self._stats["in_use"] -= 1
+            if retired:
+                self._stats["discarded"] += 1
+            elif len(self._idle) < self.max_idle:
+                self._idle.append(pc)
+                return
+        pc.conn.close()
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """Borrow a read-only connection for the duration of the ``with`` block."""
+        pc = self._acquire()
+        try:
+            yield pc.conn
+        finally:
+            self._release(pc)
+
+    def prefill(self, n: Optional[int] = None) -> int:
+        """Open idle connections up to ``n`` (default ``max_idle``); returns how many were opened.
+
+        Each one parses the schema up front, which a new connection
+        otherwise does on its first statement.
+        """
+        target = self.max_idle if n is None else min(n, self.max_idle)
+        opened = 0
+        while True:
+            with self._lock:
+                if len(self._idle) + self._stats["in_use"] >= target:
+                    return opened
+            pc = self._open()
+            pc.conn.execute("SELECT 1 FROM sqlite_master LIMIT 1").fetchall()
+            with self._lock:
+                if len(self._idle) >= self.max_idle:
+                    pc.conn.close()
+                    return opened
+                self._idle.append(pc)
+            opened += 1
+
+    def close(self) -> None:
+        """Close every idle connection. Borrowed connections close on release."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+            self.max_idle = 0
+        for pc in idle:
+            pc.conn.close()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters plus current idle and in-use connection counts."""
+        with self._lock:
+            s: Dict[str, Any] = dict(self._stats, idle=len(self._idle))
+        total = s["hits"] + s["misses"]
+        s["hit_rate"] = s["hits"] / total if total else 0.0
+        if self.snapshot is not None:
+            s["snapshot"] = self.snapshot.stats()
+        return s
+
+
+# ── Shared Pool ─────────────────────────────────────────────
+_pool: Optional[ConnectionPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ConnectionPool:
+    """Return the process-wide pool, creating it on first use."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(snapshot=snapshots if SNAPSHOT_SERVING else None)
+    return _pool
+
+
+def connection():
+    """Borrow a connection from the shared pool (context manager)."""
+    return get_pool().connection()
+
+
+def pool_stats() -> Dict[str, Any]:
+    """Statistics for the shared pool."""
+    return get_pool().stats()
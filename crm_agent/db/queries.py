@@ -0,0 +1,200 @@
+"""Query Tools - Schema lookup and read-only SQL execution."""
+import threading
+import time
+from typing import Dict, Iterator, List, Any, Optional, Set, Tuple
+from ..config import RESULT_MAX_ROWS, RESULT_MAX_BYTES, RESULT_FETCH_BATCH, ROLLUP_VERIFY, TRACE_SQL_MAX_CHARS
+from ..tracing import Span, tracer
+from .pool import connection
+from .cache import result_cache
+from .streaming import fetch_bounded, iter_batches, to_columnar
+from .guard import QueryGuard, QueryTooExpensive
+from .catalog import schema_catalog
+from .rewrite import output_names, rewrite_monthly_unions
+from .rollup import route_rollup, same_result
+from .result_tables import session_results
+from .workload import workload_log
+
+BLOCKED: Set[str] = {"INSERT", "UPDATE", "DELETE", "DROP", "ALTER", "CREATE", "TRUNCATE", "REPLACE"}
+
+# Budget applied to crm_agent's own tool calls; callers pass their own guard.
+DEFAULT_GUARD = QueryGuard.for_agent("crm_agent")
+
+def _blocked(sql: str) -> Optional[Dict[str, Any]]:
+    """Error result if the statement starts with a write keyword."""
+    u = sql.strip().upper()
+    for kw in BLOCKED:
+        if u.startswith(kw):
+            return {"status": "error", "error": f"Blocked: {kw}"}
+    return None
+
+def get_schema() -> str:
+    """Retrieve the database schema for all tables."""
+    return schema_catalog.ddl()
+
+def get_compact_schema(question: Optional[str] = None, tables: Optional[List[str]] = None,
+                       session: Optional[str] = None) -> str:
+    """Compact schema limited to ``tables`` or to the tables relevant to ``question``.
+
+    The result tables of ``session`` are listed after the database tables.
+    """
+    text = schema_catalog.render(question=question, tables=tables)
+    results = session_results.describe(session)
+    return f"{text}\n{results}" if results else text
+
+def run_sql_query(sql: str) -> Dict[str, Any]:
+    """Execute a read-only SQL query and return results.
+
+    Large results are truncated; check ``truncated`` and ``total_rows``
+    and aggregate or add a LIMIT instead of selecting raw rows.
+
+    Args:
+        sql: SQL query string to execute
+
+    Returns:
+        Dictionary with status, columns, rows, row_count, truncated and
+        total_rows on success or status and error message on failure
+    """
+    return run_sql_query_bounded(sql)
+
+def run_sql_query_bounded(
+    sql: str,
+    max_rows: int = RESULT_MAX_ROWS,
+    max_bytes: int = RESULT_MAX_BYTES,
+    columnar: bool = False,
+    guard: Optional[QueryGuard] = None,
+    cancel: Optional[threading.Event] = None,
+    session: Optional[str] = None,
+    keep_result: bool = True,
+) -> Dict[str, Any]:
+    """Execute a read-only SQL query keeping at most ``max_rows``/``max_bytes``.
+
+    UNION ALL chains over the monthly order tables run as one scan of
+    ``orders_all`` when it is fresh, and matching aggregates run on the
+    pre-aggregated rollups; columns and rows are unchanged.
+    With a ``session``, the query may read that session's earlier results
+    (``result_1``, ...) and its own result is kept as the next one.
+
+    Args:
+        sql: SQL query string to execute
+        max_rows: Maximum number of rows returned
+        max_bytes: Maximum serialized size of the returned rows
+        columnar: Return ``data`` (one list per column) instead of ``rows``
+        guard: Cost limits to enforce, defaults to ``DEFAULT_GUARD``
+        cancel: Event that aborts the running statement when set
+        session: Session whose result tables the query may read
+        keep_result: Store a successful result as a table of ``session``
+
+    Returns:
+        Dictionary with status, columns, rows (or data), row_count,
+        truncated, total_rows and total_rows_exact on success
+        or status and error message on failure. Queries rejected by the
+        guard carry ``error_type: "too_expensive"``, a reason and a hint.
+    """
+    with tracer.span("sql", "sql", sql=sql[:TRACE_SQL_MAX_CHARS]) as span:
+        result = _run_bounded(sql, max_rows, max_bytes, guard, span, cancel, session)
+        if keep_result:
+            span.set(result_table=session_results.register(session, sql, result))
+        span.set(row_count=result.get("row_count"), error=result.get("error"))
+        if result.get("status") != "success":
+            span.status = "error"
+    return to_columnar(result) if columnar else result
+
+def _run_bounded(sql: str, max_rows: int, max_bytes: int, guard: Optional[QueryGuard], span: Span,
+                 cancel: Optional[threading.Event], session: Optional[str]) -> Dict[str, Any]:
+    """Body of ``run_sql_query_bounded``; notes cache hits, rewrites and rollups on ``span``."""
+    blocked = _blocked(sql)
+    if blocked:
+        return blocked
+    guard = guard or DEFAULT_GUARD
+    variant = (max_rows, max_bytes)
+    exec_sql, started = None, time.perf_counter()
+    try:
+        with connection() as c, session_results.attached(c, session, sql) as private:
+            # Session tables differ per session, so their queries skip the shared cache
+            result = None if private else result_cache.get(sql, c, variant)
+            span.set(cached=result is not None)
+            if result is None:
+                rewritten = rewrite_monthly_unions(sql)
+                base_sql = rewritten or sql
+                routed = route_rollup(base_sql)
+                span.set(rewritten=rewritten is not None, rollup=routed is not None)
+                exec_sql = routed or base_sql
+                started = time.perf_counter()
+                guard.check_plan(c, exec_sql)
+                cols, fetched = _fetch(c, exec_sql, max_rows, max_bytes, guard, cancel)
+                if routed and ROLLUP_VERIFY:
+                    base = _fetch(c, base_sql, max_rows, max_bytes, guard, cancel)[1]
+                    if not same_result(fetched, base, sql):
+                        span.set(rollup_mismatch=True)
+                        exec_sql, fetched = base_sql, base
+                if routed or rewritten:
+                    cols = output_names(c, sql) or cols
+                result = {"status": "success", "columns": cols, "rows": fetched["rows"],
+                          "row_count": len(fetched["rows"]), "truncated": fetched["truncated"],
+                          "total_rows": fetched["total_rows"], "total_rows_exact": fetched["total_rows_exact"]}
+                workload_log.record(sql, time.perf_counter() - started, "success", fetched["total_rows"], exec_sql)
+                if not private:
+                    result_cache.put(sql, result, variant)
+    except QueryTooExpensive as e:
+        if exec_sql:
+            workload_log.record(sql, time.perf_counter() - started, "too_expensive", exec_sql=exec_sql)
+        return e.to_result()
+    except Exception as e:
+        if exec_sql:
+            workload_log.record(sql, time.perf_counter() - started, "error", exec_sql=exec_sql)
+        return {"status": "error", "error": str(e)}
+    return result
+
+def _fetch(c: Any, sql: str, max_rows: int, max_bytes: int, guard: QueryGuard,
+           cancel: Optional[threading.Event]) -> Tuple[List[str], Dict[str, Any]]:
+    """Column names and ``fetch_bounded`` result of ``sql`` under the guard's limits."""
+    cur = c.cursor()
+    try:
+        with guard.limits(c, cancel):
+            cur.execute(sql)
+            cols = [d[0] for d in cur.description] if cur.description else []
+            return cols, fetch_bounded(cur, max_rows, max_bytes)
+    finally:
+        cur.close()
+
+def stream_sql_query(sql: str, batch_size: int = RESULT_FETCH_BATCH, session: Optional[str] = None,
+                     guard: Optional[QueryGuard] = None,
+                     cancel: Optional[threading.Event] = None) -> Iterator[List[Any]]:
+    """Yield the full result of a read-only query in batches of rows.
+
+    The first batch is the list of column names. Intended for exports,
+    where every row is needed but must not be held in memory at once.
+    The pooled connection is held until the generator is exhausted or closed.
+    With a ``session``, the query may read that session's result tables.
+    The guard's plan check applies before the statement runs, and its
+    timeout and VM-step budget to the whole stream.
+
+    Args:
+        sql: SQL query string to execute
+        batch_size: Rows per yielded batch
+        session: Session whose result tables the query may read
+        guard: Cost limits to enforce, defaults to ``DEFAULT_GUARD``
+        cancel: Event that aborts the stream when set
+
+    Raises:
+        ValueError: If the statement is blocked
+        QueryTooExpensive: If the guard rejects or stops the statement
+    """
+    blocked = _blocked(sql)
+    if blocked:
+        raise ValueError(blocked["error"])
+    guard = guard or DEFAULT_GUARD
+    rewritten = rewrite_monthly_unions(sql)
+    exec_sql = route_rollup(rewritten or sql) or rewritten or sql
+    with connection() as c, session_results.attached(c, session, sql):
+        guard.check_plan(c, exec_sql)
+        cur = c.cursor()
+        try:
+            with guard.limits(c, cancel):
+                cur.execute(exec_sql)
+                cols = [d[0] for d in cur.description] if cur.description else []
+                yield (output_names(c, sql) or cols) if exec_sql != sql else cols
+                for batch in iter_batches(cur, batch_size):
+                    yield [list(r) for r in batch]
+        finally:
+            cur.close()
@@ -0,0 +1,261 @@
+"""Result Tables - Earlier query results kept as tables a follow-up can refine.
+
+Follow-ups ("now split that by regional office", "only for GTX Pro")
+usually narrow or re-group the previous answer. The result each turn
+answers from is therefore stored as a table of its session (``result_1``,
+``result_2``, ...); exploratory queries (entity probes, trial queries)
+pass ``keep_result=False`` so they never evict an answer. These tables are listed in the schema the planner
+and the SQL architect see, so a follow-up can select from or join a
+result instead of rescanning ``sales_pipeline`` or the monthly tables.
+
+SQLite TEMP tables live in one connection, while pooled connections are
+shared by every session. Each session's tables therefore live in a
+shared-cache in-memory database of its own. A pooled connection ATTACHes
+it (as ``results``) only for a statement that names one of its tables.
+SQLite resolves unqualified names through attached databases, so
+``SELECT ... FROM result_2`` works as written.
+
+Only complete results are kept, because a truncated one would silently
+miss rows. Statements reading a session's tables bypass the shared
+result cache and are not stored in the SQL library. When the process
+goes over ``SESSION_RESULTS_MAX_BYTES``, the least recently used tables
+(in any session) are dropped first; each session also keeps at most
+``SESSION_RESULTS_MAX_TABLES``.
+"""
+import itertools
+import json
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from sqlglot import exp
+from sqlglot.errors import SqlglotError
+
+from ..config import SESSION_RESULTS, SESSION_RESULTS_MAX_BYTES, SESSION_RESULTS_MAX_TABLES
+from .parsing import parse_sql, sql_key
+
+SCHEMA = "results"  # Name the session database is attached under
+_SQL_PREVIEW = 240  # SQL characters shown per table in the schema text
+
+
+@dataclass
+class ResultTable:
+    """One stored result."""
+    name: str
+    sql: str
+    key: str                 # ``sql_key`` of the statement, to store a repeated query once
+    columns: List[str]
+    rows: int
+    bytes: int
+
+
+class _Session:
+    """A session's in-memory database and its tables, oldest first."""
+
+    def __init__(self, uri: str):
+        self.uri = uri
+        self.holder = sqlite3.connect(uri, uri=True, check_same_thread=False)  # Keeps the database alive
+        self.tables: "OrderedDict[str, ResultTable]" = OrderedDict()
+        self.counter = itertools.count(1)
+
+
+def _column_names(columns: List[str]) -> List[str]:
+    """Unique, non-empty column names (a join can return two ``account`` columns)."""
+    names = [c or f"column_{i + 1}" for i, c in enumerate(columns)]
+    return [c if names.count(c) == 1 else f"{c}_{i + 1}" for i, c in enumerate(names)]
+
+
+class SessionResultStore:
+    """Per-session result tables with a process-wide byte budget."""
+
+    _ids = itertools.count(1)
+
+    def __init__(
+        self,
+        max_bytes: int = SESSION_RESULTS_MAX_BYTES,
+        max_tables: int = SESSION_RESULTS_MAX_TABLES,
+        enabled: bool = SESSION_RESULTS,
+    ):
+        """
+        Args:
+            max_bytes: Serialized size of all stored results, across sessions
+            max_tables: Tables kept per session
+            enabled: Store results at all
+        """
+        self.max_bytes = max_bytes
+        self.max_tables = max_tables
+        self.enabled = enabled
+        self._prefix = f"crm-results-{os.getpid()}-{next(self._ids)}"
+        self._session_ids = itertools.count(1)
+        self._sessions: Dict[str, _Session] = {}
+        self._lru: "OrderedDict[Tuple[str, str], int]" = OrderedDict()  # (session, table) -> bytes
+        self._bytes = 0
+        self._lock = threading.RLock()
+        self._stats: Dict[str, int] = {"stored": 0, "reused": 0, "evicted": 0, "skipped": 0, "failed": 0, "reads": 0}
+
+    # ── Lookup ──────────────────────────────────────────────
+    def tables(self, session: Optional[str]) -> Dict[str, List[str]]:
+        """Columns of each table of ``session``, oldest first."""
+        with self._lock:
+            s = self._sessions.get(session) if session else None
+            return {t.name: list(t.columns) for t in s.tables.values()} if s else {}
+
+    def referenced(self, session: Optional[str], sql: str) -> bool:
+        """Whether ``sql`` reads any table of ``session``."""
+        names = self.tables(session)
+        if not names:
+            return False
+        try:
+            tree = parse_sql(sql)
+        except SqlglotError:
+            return False
+        lower = {n.lower() for n in names}
+        return any(t.name.lower() in lower and t.db.lower() in ("", SCHEMA) for t in tree.find_all(exp.Table))
+
+    def describe(self, session: Optional[str]) -> str:
+        """Schema text listing the session's tables, or "" if it has none."""
+        with self._lock:
+            s = self._sessions.get(session) if session else None
+            tables = list(s.tables.values()) if s else []
+        if not tables:
+            return ""
+        lines = ["Earlier results in this conversation (query, filter or join them like tables instead of "
+                 "re-querying the source tables):"]
+        for i, t in enumerate(tables):
+            latest = " — latest" if i == len(tables) - 1 else ""
+            sql = " ".join(t.sql.split())
+            sql = sql if len(sql) <= _SQL_PREVIEW else sql[:_SQL_PREVIEW] + "…"
+            lines.append(f"{t.name} ({t.rows} rows{latest}): {', '.join(t.columns)} -- from: {sql}")
+        return "\n".join(lines)
+
+    @contextmanager
+    def attached(self, conn: sqlite3.Connection, session: Optional[str], sql: str) -> Iterator[bool]:
+        """Attach the session's database to ``conn`` while ``sql`` runs, if it reads it.
+
+        Yields whether it was attached; the caller closes its cursors
+        before the block ends.
+        """
+        if not self.referenced(session, sql):
+            yield False
+            return
+        with self._lock:
+            s = self._sessions.get(session)
+            self._stats["reads"] += 1
+        if s is None:  # Evicted since the check; the statement fails as it would have
+            yield False
+            return
+        uri = s.uri
+        conn.execute(f"ATTACH DATABASE ? AS {SCHEMA}", (uri,))
+        try:
+            yield True
+        finally:
+            conn.execute(f"DETACH DATABASE {SCHEMA}")
+
+    # ── Storage ─────────────────────────────────────────────
+    def register(self, session: Optional[str], sql: str, result: Dict[str, Any]) -> Optional[str]:
+        """Store a successful, complete result as a table of ``session``.
+
+        A statement already stored in the session keeps its table (now the
+        latest). Storing never fails the query: errors are counted and
+        None is returned.
+
+        Returns:
+            The table name, or None if the result was not stored
+        """
+        if not (self.enabled and session and result.get("status") == "success"):
+            return None
+        rows = result.get("rows") or []
+        columns = list(result.get("columns") or [])
+        if not rows or not columns or result.get("truncated"):
+            with self._lock:
+                self._stats["skipped"] += 1
+            return None
+        key = sql_key(sql)
+        size = len(json.dumps(rows, default=str))
+        if size > self.max_bytes:
+            with self._lock:
+                self._stats["skipped"] += 1
+            return None
+        with self._lock:
+            s = self._sessions.get(session)
+            if s is None:
+                uri = f"file:{self._prefix}-{next(self._session_ids)}?mode=memory&cache=shared"
+                s = self._sessions[session] = _Session(uri)
+            same = next((t for t in s.tables.values() if t.key == key), None)
+            if same is not None:
+                s.tables.move_to_end(same.name)
+                self._lru.move_to_end((session, same.name))
+                self._stats["reused"] += 1
+                return same.name
+            name = f"result_{next(s.counter)}"
+            names = _column_names(columns)
+            try:
+                cols = ", ".join(f'"{c}"' for c in (n.replace('"', '""') for n in names))
+                s.holder.execute(f'CREATE TABLE "{name}" ({cols})')
+                s.holder.executemany(f'INSERT INTO "{name}" VALUES ({", ".join("?" * len(names))})', rows)
+                s.holder.commit()
+            except sqlite3.Error:
+                s.holder.rollback()
+                self._drop(s, name)
+                self._stats["failed"] += 1
+                if not s.tables:
+                    s.holder.close()
+                    del self._sessions[session]
+                return None
+            s.tables[name] = ResultTable(name, sql, key, names, len(rows), size)
+            self._lru[(session, name)] = size
+            self._bytes += size
+            self._stats["stored"] += 1
+            self._evict(session)
+            return name
+
+    @staticmethod
+    def _drop(s: _Session, name: str) -> bool:
+        try:
+            s.holder.execute(f'DROP TABLE IF EXISTS "{name}"')
+            s.holder.commit()
+        except sqlite3.Error:
+            return False  # Still being read; dropped on a later eviction
+        return True
+
+    def _evict(self, session: str) -> None:
+        """Drop tables over the session's count, then the least recently used over the byte budget."""
+        s = self._sessions[session]
+        over = [(session, n) for n in list(s.tables)[:max(0, len(s.tables) - self.max_tables)]]
+        victims = over + [k for k in self._lru if k not in over]
+        for sid, name in victims:
+            if (sid, name) not in over and self._bytes <= self.max_bytes:
+                break
+            owner = self._sessions[sid]
+            if not self._drop(owner, name):
+                continue
+            self._bytes -= self._lru.pop((sid, name))
+            del owner.tables[name]
+            self._stats["evicted"] += 1
+            if not owner.tables:
+                owner.holder.close()
+                del self._sessions[sid]
+
+    def clear(self, session: Optional[str] = None) -> None:
+        """Drop the tables of ``session``, or of every session."""
+        with self._lock:
+            for sid in [session] if session else list(self._sessions):
+                s = self._sessions.pop(sid, None)
+                if s is None:
+                    continue
+                for name in s.tables:
+                    self._bytes -= self._lru.pop((sid, name))
+                s.holder.close()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self._stats, sessions=len(self._sessions), tables=len(self._lru),
+                        bytes=self._bytes, max_bytes=self.max_bytes)
+
+
+# Process-wide store shared by every session
+session_results = SessionResultStore()
@@ -0,0 +1,237 @@
+"""SQL Rewrite - Route UNION ALL chains over monthly tables to ``orders_all``.
+
+A chain like::
+
+    SELECT 'mar_2017' AS month, SUM(order_value) AS revenue FROM mar_2017_orders
+    UNION ALL SELECT 'apr_2017', SUM(order_value) FROM apr_2017_orders ...
+
+becomes a single scan of the materialization::
+
+    SELECT CASE orders_all.month WHEN '2017-03' THEN 'mar_2017' ... END AS month,
+           SUM(orders_all.order_value) AS revenue
+    FROM orders_all GROUP BY orders_all.month ...
+
+A chain is only rewritten when the result is provably identical: every
+branch reads one distinct monthly table in calendar order, branches differ
+only in literal projections (month labels), and nothing per-branch
+(``DISTINCT``, ``LIMIT``, windows, subqueries, empty months for
+ungrouped aggregates) would change across the merge. Anything else is
+left untouched.
+"""
+import threading
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlglot import exp
+from sqlglot.errors import SqlglotError
+
+from ..config import ORDERS_ALL_AUTO_REFRESH, SQL_REWRITE_MONTHLY_UNIONS
+from .catalog import ORDERS_ALL
+from .materialize import orders_all_state
+from .parsing import parse_sql
+
+# Select arguments a mergeable branch may use
+_BRANCH_ARGS = {"expressions", "from_", "where", "group", "having"}
+
+_stats_lock = threading.Lock()
+_stats: Dict[str, int] = {"checked": 0, "rewritten": 0}
+
+
+def _month_column() -> exp.Column:
+    return exp.column("month", ORDERS_ALL)
+
+
+def _flatten(node: exp.Expression, top: bool = True) -> Optional[List[exp.Expression]]:
+    """Branches of a UNION ALL chain, or None if any link is not a plain UNION ALL."""
+    if not isinstance(node, exp.Union):
+        return [node]
+    if node.args.get("distinct") or node.args.get("by_name"):
+        return None
+    if not top and any(node.args.get(k) for k in ("order", "limit", "offset", "with_")):
+        return None
+    left, right = _flatten(node.left, False), _flatten(node.right, False)
+    return left + right if left is not None and right is not None else None
+
+
+def _canonical_branch(select: exp.Expression, periods: Dict[str, str], columns: List[str]) -> Optional[Tuple[str, exp.Select]]:
+    """(period, branch reading ``orders_all`` with qualified columns), or None if not mergeable."""
+    if not isinstance(select, exp.Select):
+        return None
+    if any(v for k, v in select.args.items() if k not in _BRANCH_ARGS):
+        return None
+    table = select.args["from_"].this if select.args.get("from_") else None
+    if not isinstance(table, exp.Table) or table.args.get("db") or table.args.get("catalog"):
+        return None
+    period = periods.get(table.name)
+    if period is None:
+        return None
+    if len(list(select.find_all(exp.Select))) > 1 or select.find(exp.Window):
+        return None
+
+    branch = select.copy()
+    qualifier = table.alias_or_name
+    aliases = {e.alias for e in branch.expressions if isinstance(e, exp.Alias)}
+    for col in list(branch.find_all(exp.Column)):
+        if isinstance(col.this, exp.Star):
+            return None  # t.* is left alone
+        if col.table and col.table != qualifier:
+            return None
+        if col.name in columns:
+            col.replace(exp.column(col.name, ORDERS_ALL))
+        elif col.table or col.name not in aliases or col.name == "month":
+            return None  # Unknown column, or an alias the new month column would shadow
+    projections = []
+    for e in branch.expressions:
+        if isinstance(e, exp.Star):
+            projections.extend(exp.column(c, ORDERS_ALL) for c in columns)
+        else:
+            projections.append(e)
+    branch.set("expressions", projections)
+    branch.set("from_", exp.From(this=exp.to_table(ORDERS_ALL)))
+    return period, branch
+
+
+def _merge(union: exp.Union, periods: Dict[str, str], counts: Dict[str, int], columns: List[str]) -> Optional[exp.Select]:
+    """Single ``orders_all`` select equivalent to the UNION ALL chain, or None."""
+    branches = _flatten(union)
+    if not branches or len(branches) < 2:
+        return None
+    canon = [_canonical_branch(b, periods, columns) for b in branches]
+    if any(c is None for c in canon):
+        return None
+    months = [p for p, _ in canon]
+    if months != sorted(set(months)):
+        return None  # Repeated or out-of-calendar-order tables change the row order
+    selects = [s for _, s in canon]
+    first = selects[0]
+    width = len(first.expressions)
+    if any(len(s.expressions) != width for s in selects):
+        return None
+
+    def body(s: exp.Select) -> str:
+        rest = s.copy()
+        rest.set("expressions", [])
+        return rest.sql(dialect="sqlite")
+
+    if any(body(s) != body(first) for s in selects[1:]):
+        return None
+
+    merged = first.copy()
+    projections = []
+    for i, proj in enumerate(first.expressions):
+        values = [s.expressions[i].unalias() for s in selects]
+        if all(v == values[0] for v in values):
+            projections.append(proj.copy())
+            continue
+        if not all(isinstance(v, exp.Literal) for v in values):
+            return None
+        label = exp.Case(
+            this=_month_column(),
+            ifs=[exp.If(this=exp.Literal.string(p), true=v.copy()) for p, v in zip(months, values)],
+        )
+        projections.append(exp.alias_(label, proj.alias) if proj.alias else label)
+    merged.set("expressions", projections)
+
+    aggregated = any(e.find(exp.AggFunc) for e in first.expressions) or first.args.get("having")
+    group = first.args.get("group")
+    if aggregated:
+        if not group and (first.args.get("where") or any(counts.get(p, 0) == 0 for p in months)):
+            return None  # An ungrouped aggregate yields a row even for a month with no matches
+        keys = [_month_column()] + (list(group.expressions) if group else [])
+        merged.set("group", exp.Group(expressions=keys))
+    elif group:
+        return None
+    if set(months) != set(periods.values()):
+        merged = merged.where(_month_column().isin(*months), copy=False)
+
+    # ORDER BY on the chain names output columns; ordinals keep that meaning
+    # now that input columns (e.g. orders_all.month) could shadow an alias.
+    names = [e.alias_or_name for e in first.expressions]
+    order = union.args.get("order")
+    if order:
+        order = order.copy()
+        for ordered in order.expressions:
+            term = ordered.this
+            if isinstance(term, exp.Column) and not term.table and term.name in names:
+                ordered.set("this", exp.Literal.number(names.index(term.name) + 1))
+            elif not (isinstance(term, exp.Literal) and not term.is_string):
+                return None
+        merged.set("order", order)
+    elif not aggregated:
+        # Index scans could reorder rows; keep the chain's month-then-rowid order
+        merged.set("order", exp.Order(expressions=[exp.Ordered(this=exp.column("rowid", ORDERS_ALL), nulls_first=True)]))
+    for key in ("limit", "offset", "with_"):
+        if union.args.get(key):
+            merged.set(key, union.args[key].copy())
+    return merged
+
+
+@lru_cache(maxsize=512)
+def _rewrite(sql: str, periods: Tuple[Tuple[str, str], ...], counts: Tuple[Tuple[str, int], ...],
+             columns: Tuple[str, ...]) -> Optional[str]:
+    try:
+        tree = parse_sql(sql).copy()
+    except SqlglotError:
+        return None
+    period_map, count_map = dict(periods), dict(counts)
+    # A CTE named like a monthly table would change what the branches read
+    if any(cte.alias_or_name in period_map or cte.alias_or_name == ORDERS_ALL for cte in tree.find_all(exp.CTE)):
+        return None
+    changed = False
+    for union in reversed(list(tree.find_all(exp.Union))):  # Innermost chains first
+        if isinstance(union.parent, exp.Union) or union.root() is not tree:
+            continue  # Part of an enclosing chain, or already replaced
+        merged = _merge(union, period_map, count_map, list(columns))
+        if merged is None:
+            continue
+        if union is tree:
+            tree = merged
+        else:
+            union.replace(merged)
+        changed = True
+    return tree.sql(dialect="sqlite") if changed else None
+
+
+def rewrite_monthly_unions(sql: str) -> Optional[str]:
+    """``sql`` with monthly UNION ALL chains merged into ``orders_all`` scans.
+
+    Returns None when nothing was rewritten (rewriting disabled, no
+    eligible chain, or ``orders_all`` missing or stale). With
+    ``ORDERS_ALL_AUTO_REFRESH`` on, statements that name ``orders_all``
+    themselves get it refreshed first.
+    """
+    lowered = sql.lower()
+    if ORDERS_ALL_AUTO_REFRESH and ORDERS_ALL in lowered:
+        orders_all_state()  # Queries naming orders_all directly also see it refreshed
+    if not SQL_REWRITE_MONTHLY_UNIONS or "union" not in lowered or "_orders" not in lowered:
+        return None
+    state = orders_all_state()
+    if not state.fresh:
+        return None
+    with _stats_lock:
+        _stats["checked"] += 1
+    rewritten = _rewrite(sql.strip().rstrip(";"), tuple(state.periods.items()), tuple(state.counts.items()),
+                         tuple(state.columns))
+    if rewritten is not None:
+        with _stats_lock:
+            _stats["rewritten"] += 1
+    return rewritten
+
+
+def output_names(conn: Any, sql: str) -> Optional[List[str]]:
+    """Column names ``sql`` itself would report, without running it.
+
+    SQLite names unaliased expressions after their source text, which a
+    rewritten statement no longer matches.
+    """
+    try:
+        cur = conn.execute(f"SELECT * FROM ({sql.strip().rstrip(';')}) LIMIT 0")
+    except Exception:
+        return None
+    return [d[0] for d in cur.description] if cur.description else None
+
+
+def rewrite_stats() -> Dict[str, Any]:
+    """Counters for the UNION ALL rewrite pass."""
+    with _stats_lock:
+        return dict(_stats)
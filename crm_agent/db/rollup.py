@@ -0,0 +1,325 @@
+"""Rollup Routing - Answer aggregate queries from the pre-aggregated rollups.
+
+``python -m data`` builds ``_rollup_*`` tables (see ``data/rollups.py``)
+holding, per group of a few dimensions of ``sales_pipeline`` or
+``orders_all``, the row count ``n``, the non-NULL measure count
+``n_value`` and the measure sum ``sum_value``. A query such as::
+
+    SELECT t.regional_office, SUM(p.close_value) AS revenue
+    FROM sales_pipeline p JOIN sales_teams_1 t ON p.sales_agent = t.sales_agent
+    WHERE p.deal_stage = 'Won' GROUP BY t.regional_office
+
+then runs on the smallest rollup holding every column it reads::
+
+    SELECT _rollup_pipeline_team.regional_office, SUM(_rollup_pipeline_team.sum_value) AS revenue
+    FROM _rollup_pipeline_team WHERE _rollup_pipeline_team.deal_stage = 'Won'
+    GROUP BY _rollup_pipeline_team.regional_office ORDER BY _rollup_pipeline_team.regional_office
+
+A query is only routed when the answer is provably the same: one SELECT
+over the fact (or one monthly order table, which becomes a month filter),
+optionally inner-joined to the rollup's join table on its key, whose
+aggregates are SUM, AVG or COUNT of the measure, COUNT(*), or COUNT, MIN
+or MAX of a dimension, and whose other columns are all dimensions.
+Grouped queries without ORDER BY are ordered by their group keys, the
+order SQLite returns groups in anyway. Rollups whose sources no longer
+match the ``_ingest`` hashes of the loaded tables are not used.
+
+With ``ROLLUP_VERIFY`` on, every routed query also runs on the base
+tables; a mismatch is counted and the base result is served.
+"""
+import json
+import threading
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from sqlglot import exp
+from sqlglot.errors import SqlglotError
+
+from ..config import ROLLUP_ROUTING
+from .catalog import ORDERS_ALL, month_period
+from .materialize import orders_all_state
+from .parsing import parse_sql
+from .pool import connection, file_version
+
+ROLLUP_META = "_rollups"
+ROLLUP_PREFIX = "_rollup_"
+INGEST_TABLE = "_ingest"  # Content hash per loaded table, written by ``data.loader``
+
+# Select arguments a routable query may use
+_SELECT_ARGS = {"expressions", "from_", "joins", "where", "group", "having", "order", "limit", "offset", "distinct"}
+_ALIAS = "<alias>"  # Resolution of a name that refers to an output column
+
+_stats_lock = threading.Lock()
+_stats: Dict[str, Any] = {"checked": 0, "routed": 0, "verified": 0, "mismatched": 0, "last_mismatch": None}
+
+
+@dataclass(frozen=True)
+class Rollup:
+    """One fresh rollup table."""
+    table: str
+    fact: str
+    measure: str
+    dims: Tuple[str, ...]
+    join_table: Optional[str]
+    join_key: Optional[str]
+    rows: int
+
+
+@dataclass
+class RollupState:
+    """Rollups that match the loaded data, with the columns of their sources."""
+    rollups: Tuple[Rollup, ...] = ()
+    stale: List[str] = field(default_factory=list)                    # Rollup tables out of date
+    columns: Dict[str, Tuple[str, ...]] = field(default_factory=dict)  # Source table -> columns
+    periods: Dict[str, str] = field(default_factory=dict)              # Monthly table -> 'YYYY-MM'
+
+
+def _read_state() -> RollupState:
+    with connection() as conn:
+        names = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+        if ROLLUP_META not in names or INGEST_TABLE not in names:
+            return RollupState()
+        hashes = dict(conn.execute(f'SELECT table_name, sha256 FROM "{INGEST_TABLE}"'))
+        periods = {n: month_period(n) for n in names if month_period(n)}
+        state = RollupState(periods=periods)
+        fresh = []
+        for name, fact, measure, dims, join_table, join_key, sources, rows in conn.execute(
+            f'SELECT name, fact, measure, dims, join_table, join_key, sources, rows FROM "{ROLLUP_META}"'
+        ):
+            table, sources = ROLLUP_PREFIX + name, json.loads(sources)
+            ok = table in names and all(hashes.get(t) == h for t, h in sources.items())
+            if fact == ORDERS_ALL:
+                ok = ok and {t for t in sources if t != join_table} == set(periods)
+            if ok:
+                fresh.append(Rollup(table, fact, measure, tuple(json.loads(dims)), join_table, join_key, rows or 0))
+            else:
+                state.stale.append(table)
+        state.rollups = tuple(sorted(fresh, key=lambda r: r.rows))
+        read = {r.fact for r in fresh} | {r.join_table for r in fresh if r.join_table} | set(periods)
+        for t in read & names:
+            state.columns[t] = tuple(r[1] for r in conn.execute(f'PRAGMA table_info("{t}")'))
+    return state
+
+
+_state: Optional[RollupState] = None
+_state_version: Optional[Tuple[Any, ...]] = None
+_state_lock = threading.Lock()
+
+
+def rollup_state() -> RollupState:
+    """Fresh rollups, checked once per database version."""
+    global _state, _state_version
+    with _state_lock:
+        version = file_version()
+        if _state is None or version != _state_version:
+            _state, _state_version = _read_state(), version
+        return _state
+
+
+# ── Routing ─────────────────────────────────────────────────
+def _aggregate(agg: exp.AggFunc, resolve: Any, measure: str) -> Optional[Tuple[str, Optional[str]]]:
+    """(kind, dimension) an aggregate is computed from, or None if a rollup cannot answer it."""
+    if isinstance(agg.parent, (exp.Filter, exp.Window)):
+        return None
+    arg = agg.this
+    distinct = isinstance(arg, exp.Distinct)
+    if distinct:
+        if not isinstance(agg, exp.Count) or len(arg.expressions) != 1:
+            return None
+        arg = arg.expressions[0]
+    if isinstance(agg, exp.Count) and not distinct and isinstance(arg, (exp.Star, exp.Literal)):
+        return "rows", None
+    if not isinstance(arg, exp.Column) or agg.args.get("expressions"):
+        return None
+    name = resolve(arg)
+    if name is None or name == _ALIAS:
+        return None
+    if name == measure:
+        kind = {exp.Sum: "sum", exp.Avg: "avg", exp.Count: "count_value"}.get(type(agg))
+        return (kind, None) if kind and not distinct else None
+    if isinstance(agg, exp.Count):
+        return ("count_distinct" if distinct else "count_dim"), name
+    if isinstance(agg, (exp.Min, exp.Max)):
+        return ("min" if isinstance(agg, exp.Min) else "max"), name
+    return None
+
+
+def _rolled_up(kind: str, dim: Optional[str], table: str) -> exp.Expression:
+    """Aggregate over the rollup rows equal to the ``kind`` aggregate over the base rows."""
+    t = f'"{table}"'
+    sql = {
+        "rows": f'COALESCE(SUM({t}."n"), 0)',
+        "count_value": f'COALESCE(SUM({t}."n_value"), 0)',
+        "sum": f'SUM({t}."sum_value")',
+        "avg": f'(CAST(SUM({t}."sum_value") AS REAL) / SUM({t}."n_value"))',
+        "count_distinct": f'COUNT(DISTINCT {t}."{dim}")',
+        "count_dim": f'COALESCE(SUM(CASE WHEN {t}."{dim}" IS NOT NULL THEN {t}."n" END), 0)',
+        "min": f'MIN({t}."{dim}")',
+        "max": f'MAX({t}."{dim}")',
+    }[kind]
+    return exp.maybe_parse(sql, dialect="sqlite")
+
+
+@lru_cache(maxsize=512)
+def _route(sql: str, rollups: Tuple[Rollup, ...], columns: Tuple[Tuple[str, Tuple[str, ...]], ...],
+           periods: Tuple[Tuple[str, str], ...], orders_all_fresh: bool) -> Optional[str]:
+    try:
+        tree = parse_sql(sql).copy()
+    except SqlglotError:
+        return None
+    if not isinstance(tree, exp.Select) or any(v for k, v in tree.args.items() if k not in _SELECT_ARGS):
+        return None
+    if len(list(tree.find_all(exp.Select))) > 1 or tree.find(exp.Window):
+        return None
+    aggs = list(tree.find_all(exp.AggFunc))
+    if not aggs and not tree.args.get("group"):
+        return None  # Row-level queries need the base rows
+
+    # Source: one fact table, or one monthly table read as a month of orders_all
+    source = tree.args["from_"].this if tree.args.get("from_") else None
+    if not isinstance(source, exp.Table) or source.args.get("db") or source.args.get("catalog"):
+        return None
+    cols, period_map = dict(columns), dict(periods)
+    fact, period = source.name, period_map.get(source.name)
+    if period:
+        fact = ORDERS_ALL
+    elif fact == ORDERS_ALL and not orders_all_fresh:
+        return None
+    candidates = [r for r in rollups if r.fact == fact and (not period or "month" in r.dims)]
+    if not candidates or source.name not in cols:
+        return None
+    aliases = {source.alias_or_name: "fact"}
+    fact_cols, join_cols = set(cols[source.name]), set()
+
+    joins = tree.args.get("joins") or []
+    join_table = join_key = None
+    if len(joins) > 1:
+        return None
+    if joins:
+        join = joins[0]
+        target = join.this
+        if (not isinstance(target, exp.Table) or join.args.get("side") or join.args.get("using")
+                or join.args.get("kind") not in (None, "INNER") or target.name not in cols):
+            return None
+        join_table, join_cols = target.name, set(cols[target.name])
+        join_key = next((r.join_key for r in candidates if r.join_table == join_table), None)
+        aliases[target.alias_or_name] = "join"
+        on = join.args.get("on")
+        if join_key is None or len(aliases) != 2 or not isinstance(on, exp.EQ):
+            return None
+        sides = {(aliases.get(c.table), c.name) for c in (on.this, on.expression) if isinstance(c, exp.Column)}
+        if sides != {("fact", join_key), ("join", join_key)}:
+            return None
+    candidates = [r for r in candidates if r.join_table == join_table]
+
+    outputs = {e.alias for e in tree.expressions if isinstance(e, exp.Alias)}
+    shadowing = {e.alias for e in tree.expressions if isinstance(e, exp.Alias) and e.alias in fact_cols | join_cols
+                 and not (isinstance(e.this, exp.Column) and e.this.name == e.alias)}
+    clauses = [tree.args.get(k) for k in ("where", "group", "having", "order") if tree.args.get(k)]
+    if any(not c.table and c.name in shadowing for clause in clauses for c in clause.find_all(exp.Column)):
+        return None  # Could mean the output or the column
+
+    def resolve(col: exp.Column) -> Optional[str]:
+        """Rollup dimension (or the measure) a column reads, _ALIAS, or None."""
+        if isinstance(col.this, exp.Star):
+            return None
+        if col.table:
+            side = aliases.get(col.table)
+            if side == "fact":
+                return col.name if col.name in fact_cols else None
+            if side == "join" and col.name in join_cols:
+                return col.name if col.name == join_key or col.name not in fact_cols else None
+            return None
+        if col.name in fact_cols and col.name in join_cols:
+            return None  # Ambiguous in SQLite as well
+        if col.name in fact_cols or col.name in join_cols:
+            return col.name
+        return _ALIAS if col.name in outputs else None
+
+    measure = candidates[0].measure if candidates else None
+    needed: Set[str] = {"month"} if period else set()
+    plans = []
+    for agg in aggs:
+        plan = _aggregate(agg, resolve, measure)
+        if plan is None:
+            return None
+        plans.append((agg, plan))
+        if plan[1]:
+            needed.add(plan[1])
+    refs = []
+    for col in tree.find_all(exp.Column):
+        if col.find_ancestor(exp.AggFunc, exp.Join):
+            continue
+        name = resolve(col)
+        if name is None or name == measure:
+            return None  # Unknown column, or a per-row use of the measure
+        if name != _ALIAS:
+            refs.append((col, name))
+            needed.add(name)
+    if any(isinstance(e, exp.Star) for e in tree.expressions):
+        return None
+    rollup = next((r for r in candidates if needed <= set(r.dims)), None)  # Smallest first
+    if rollup is None:
+        return None
+
+    for agg, (kind, dim) in plans:
+        agg.replace(_rolled_up(kind, dim, rollup.table))
+    for col, name in refs:
+        col.replace(exp.column(name, rollup.table, quoted=True))
+    tree.set("joins", None)
+    tree.set("from_", exp.From(this=exp.to_table(rollup.table, quoted=True)))
+    if period:
+        tree = tree.where(exp.column("month", rollup.table, quoted=True).eq(exp.Literal.string(period)), copy=False)
+    group = tree.args.get("group")
+    if group and not tree.args.get("order"):
+        tree.set("order", exp.Order(expressions=[exp.Ordered(this=g.copy(), nulls_first=True) for g in group.expressions]))
+    return tree.sql(dialect="sqlite")
+
+
+def route_rollup(sql: str) -> Optional[str]:
+    """``sql`` rewritten to read a rollup instead of the base tables.
+
+    Returns None when it cannot be routed (routing disabled, not an
+    aggregate over a fact, columns no rollup has, or no fresh rollup).
+    """
+    if not ROLLUP_ROUTING or "(" not in sql:
+        return None
+    state = rollup_state()
+    if not state.rollups:
+        return None
+    with _stats_lock:
+        _stats["checked"] += 1
+    orders_all_fresh = ORDERS_ALL in sql.lower() and orders_all_state().fresh
+    routed = _route(sql.strip().rstrip(";"), state.rollups, tuple(state.columns.items()),
+                    tuple(state.periods.items()), orders_all_fresh)
+    if routed is not None:
+        with _stats_lock:
+            _stats["routed"] += 1
+    return routed
+
+
+def same_result(routed: Dict[str, Any], base: Dict[str, Any], sql: str = "") -> bool:
+    """Whether a routed result matches the base-table result; counted in ``rollup_stats``.
+
+    Rows are compared in any order: without ORDER BY, or with ties in it,
+    both answers are correct.
+    """
+    same = (routed["total_rows"] == base["total_rows"]
+            and sorted(map(repr, routed["rows"])) == sorted(map(repr, base["rows"])))
+    with _stats_lock:
+        _stats["verified"] += 1
+        if not same:
+            _stats["mismatched"] += 1
+            _stats["last_mismatch"] = sql
+    return same
+
+
+def rollup_stats() -> Dict[str, Any]:
+    """Routing and verification counters, with the fresh and stale rollups."""
+    state = _state
+    with _stats_lock:
+        stats = dict(_stats)
+    if state is not None:
+        stats.update(rollups=[r.table for r in state.rollups], stale=list(state.stale))
+    return stats
@@ -0,0 +1,185 @@
+"""Snapshot Serving - Serves reads from an in-memory copy of the database.
+
+With ``CRM_SNAPSHOT=1`` the pool opens its connections to a shared-cache
+in-memory database instead of ``crm.db``. The copy is made with the
+SQLite backup API, which reads the file under one read transaction, so a
+snapshot is always a committed state even while ``python -m data`` is
+loading.
+
+A watcher thread polls the file's version. Once a change has held still
+for one poll interval (a load in progress keeps changing it), a fresh
+snapshot is built in the background and swapped in with a single
+assignment. Connections opened on the old snapshot keep it alive until
+they are released, so in-flight queries finish on the data they started
+on. The pool then drops them instead of reusing them.
+
+``file_version()`` reports the served snapshot's version, so the result
+cache, schema catalog and fuzzy indexes follow the swap, and nothing on
+the query path touches the disk.
+"""
+import itertools
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.request import pathname2url
+
+from ..config import DB_PATH, SNAPSHOT_POLL_S
+
+
+def disk_version(path: str = DB_PATH) -> Tuple[Any, ...]:
+    """Identity, mtime and size of the database file and its WAL."""
+    version: Tuple[Any, ...] = ()
+    for p in (path, path + "-wal"):
+        try:
+            st = os.stat(p)
+        except OSError:
+            version += (None,)
+            continue
+        version += ((st.st_dev, st.st_ino, st.st_mtime_ns, st.st_size),)
+    return version
+
+
+@dataclass
+class Snapshot:
+    """One in-memory copy of the database."""
+    generation: int
+    uri: str
+    version: Tuple[Any, ...]         # ``disk_version`` of the file it was copied from
+    holder: sqlite3.Connection       # Keeps the in-memory database alive
+    bytes: int
+    seconds: float                   # Time the copy took
+
+
+class SnapshotManager:
+    """Builds, watches and atomically replaces the served snapshot."""
+
+    _ids = itertools.count(1)
+
+    def __init__(self, path: str = DB_PATH, poll_s: float = SNAPSHOT_POLL_S):
+        """
+        Args:
+            path: Database file to copy
+            poll_s: Seconds between checks of the file (0 disables the watcher)
+        """
+        self.path = path
+        self.poll_s = poll_s
+        self._current: Optional[Snapshot] = None
+        self._generations = itertools.count(1)
+        self._name = f"crm-snapshot-{os.getpid()}-{next(self._ids)}"
+        self._lock = threading.Lock()
+        self._reload_lock = threading.Lock()  # One rebuild at a time
+        self._listeners: List[Callable[[Snapshot], None]] = []
+        self._watcher: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._stats: Dict[str, Any] = {"loads": 0, "failures": 0, "last_error": None}
+
+    def _build(self) -> Snapshot:
+        """Copy the file into a new in-memory database, retrying if it changed mid-copy."""
+        while True:
+            version = disk_version(self.path)
+            start = time.perf_counter()
+            gen = next(self._generations)
+            uri = f"file:{self._name}-{gen}?mode=memory&cache=shared"
+            holder = sqlite3.connect(uri, uri=True, check_same_thread=False)
+            src = sqlite3.connect(f"file:{pathname2url(self.path)}?mode=ro", uri=True, timeout=30)
+            try:
+                src.backup(holder)
+            except BaseException:
+                holder.close()
+                raise
+            finally:
+                src.close()
+            if disk_version(self.path) != version:
+                holder.close()
+                continue
+            size = holder.execute("PRAGMA page_count").fetchone()[0] * holder.execute("PRAGMA page_size").fetchone()[0]
+            return Snapshot(gen, uri, version, holder, size, time.perf_counter() - start)
+
+    def _swap(self, snapshot: Snapshot) -> None:
+        old, self._current = self._current, snapshot
+        with self._lock:
+            self._stats["loads"] += 1
+            listeners = list(self._listeners)
+        for listener in listeners:
+            listener(snapshot)
+        if old is not None:
+            old.holder.close()  # Borrowed connections still keep it alive
+
+    def current(self) -> Snapshot:
+        """The served snapshot, built (and the watcher started) on first use."""
+        snapshot = self._current
+        if snapshot is not None:
+            return snapshot
+        with self._lock:
+            if self._current is None:
+                self._current = self._build()
+                self._stats["loads"] += 1
+                if self.poll_s > 0:
+                    self._watcher = threading.Thread(target=self._watch, name="crm-snapshot", daemon=True)
+                    self._watcher.start()
+            return self._current
+
+    def version(self) -> Tuple[Any, ...]:
+        """``disk_version`` of the file the served snapshot was copied from."""
+        return self.current().version
+
+    def reload(self, force: bool = False) -> Dict[str, Any]:
+        """Build and swap in a new snapshot if the file changed (or ``force``).
+
+        Returns:
+            Dictionary with status ("reloaded", "unchanged" or "error"),
+            generation, bytes and seconds, or error
+        """
+        with self._reload_lock:
+            served = self.current()
+            if not force and disk_version(self.path) == served.version:
+                return {"status": "unchanged", "generation": served.generation}
+            try:
+                snapshot = self._build()
+            except (sqlite3.Error, OSError) as e:
+                with self._lock:
+                    self._stats["failures"] += 1
+                    self._stats["last_error"] = str(e)
+                return {"status": "error", "error": str(e)}
+            self._swap(snapshot)
+        return {"status": "reloaded", "generation": snapshot.generation,
+                "bytes": snapshot.bytes, "seconds": round(snapshot.seconds, 4)}
+
+    def _watch(self) -> None:
+        seen = None
+        while not self._stop.wait(self.poll_s):
+            version = disk_version(self.path)
+            if version == self.current().version:
+                seen = None
+            elif version == seen:
+                self.reload()  # Unchanged for a whole interval: the write is done
+            else:
+                seen = version
+
+    def on_swap(self, listener: Callable[[Snapshot], None]) -> None:
+        """Call ``listener`` with every new snapshot right after it is swapped in."""
+        with self._lock:
+            self._listeners.append(listener)
+
+    def close(self) -> None:
+        """Stop the watcher and release the served snapshot."""
+        self._stop.set()
+        with self._lock:
+            snapshot, self._current = self._current, None
+        if snapshot is not None:
+            snapshot.holder.close()
+
+    def stats(self) -> Dict[str, Any]:
+        snapshot = self._current
+        with self._lock:
+            s = dict(self._stats)
+        if snapshot is not None:
+            s.update(generation=snapshot.generation, bytes=snapshot.bytes, seconds=round(snapshot.seconds, 4))
+        return s
+
+
+# Process-wide manager used by the shared pool when CRM_SNAPSHOT is on
+snapshots = SnapshotManager()
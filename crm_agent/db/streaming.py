@@ -0,0 +1,73 @@
+"""Streaming - Bounded, batch-wise consumption of query cursors.
+
+Rows are pulled with ``fetchmany`` so a runaway result (a careless
+``SELECT *`` or an accidental cross join) never has to be materialized
+in full: only the rows that fit the row/byte budget are kept, the rest
+are counted and dropped.
+"""
+import sqlite3
+from typing import Any, Dict, Iterator, List, Tuple
+
+from ..config import RESULT_FETCH_BATCH, RESULT_COUNT_LIMIT
+
+
+def iter_batches(cur: sqlite3.Cursor, batch_size: int = RESULT_FETCH_BATCH) -> Iterator[List[Tuple[Any, ...]]]:
+    """Yield the cursor's remaining rows in lists of up to ``batch_size``."""
+    while True:
+        batch = cur.fetchmany(batch_size)
+        if not batch:
+            return
+        yield batch
+
+
+def row_bytes(row: Tuple[Any, ...]) -> int:
+    """Approximate serialized size of a row as it would appear in a prompt."""
+    return sum(len(str(v)) + 2 for v in row) + 2
+
+
+def fetch_bounded(
+    cur: sqlite3.Cursor,
+    max_rows: int,
+    max_bytes: int,
+    batch_size: int = RESULT_FETCH_BATCH,
+    count_limit: int = RESULT_COUNT_LIMIT,
+) -> Dict[str, Any]:
+    """Consume an executed cursor, keeping at most ``max_rows``/``max_bytes``.
+
+    Once a budget is hit the remaining rows are only counted, up to
+    ``count_limit`` extra rows; past that ``total_rows`` is a lower bound
+    and ``total_rows_exact`` is False.
+
+    Returns:
+        Dictionary with rows, truncated, total_rows and total_rows_exact
+    """
+    rows: List[List[Any]] = []
+    size = 0
+    total = 0
+    truncated = False
+    for batch in iter_batches(cur, batch_size):
+        if truncated:
+            total += len(batch)
+            if total - len(rows) >= count_limit:
+                return {"rows": rows, "truncated": True, "total_rows": total, "total_rows_exact": False}
+            continue
+        for i, r in enumerate(batch):
+            size += row_bytes(r)
+            if len(rows) >= max_rows or size > max_bytes:
+                truncated = True
+                total += len(batch) - i
+                break
+            rows.append(list(r))
+            total += 1
+    return {"rows": rows, "truncated": truncated, "total_rows": total, "total_rows_exact": True}
+
+
+def to_columnar(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert a row-oriented result into ``data``: one list per column."""
+    if result.get("status") != "success":
+        return result
+    cols = result.get("columns", [])
+    rows = result.get("rows", [])
+    out = {k: v for k, v in result.items() if k != "rows"}
+    out["data"] = [list(c) for c in zip(*rows)] if rows else [[] for _ in cols]
+    return out
@@ -0,0 +1,269 @@
+"""Semantic Validation - Resolve every table and column a statement references.
+
+``validate_sql`` checks a statement against the schema catalog before it
+is executed, so that a misspelled name costs a lookup instead of a failed
+execution and a correction round. Each ``SELECT`` scope (CTEs, derived
+tables and subqueries included) is resolved the way SQLite would:
+
+- every table must exist (or be a CTE),
+- ``alias.column`` must name a source of the scope and one of its columns,
+- a bare column must belong to exactly one source, or be an output alias,
+- correlated references resolve against the enclosing scopes.
+
+Problems come back as diagnostics with a ``code`` (``syntax_error``,
+``unknown_table``, ``unknown_alias``, ``unknown_column``,
+``ambiguous_column``), the offending names and suggested corrections.
+A double-quoted name that matches no column is only a warning: SQLite
+reads it as a string literal.
+"""
+import difflib
+from typing import Any, Dict, List, Optional, Sequence, Set
+
+from sqlglot import exp
+from sqlglot.errors import SqlglotError
+from sqlglot.optimizer.scope import Scope, traverse_scope
+
+from .catalog import SchemaCatalog, schema_catalog
+from .parsing import parse_sql
+from .result_tables import session_results
+
+_IMPLICIT_COLUMNS = {"rowid", "oid", "_rowid_"}
+_SYSTEM_TABLES = {
+    "sqlite_master": ["type", "name", "tbl_name", "rootpage", "sql"],
+    "sqlite_schema": ["type", "name", "tbl_name", "rootpage", "sql"],
+}
+
+
+def _close(name: str, candidates: Sequence[str], n: int = 3) -> List[str]:
+    by_lower = {c.lower(): c for c in candidates}
+    return [by_lower[m] for m in difflib.get_close_matches(name.lower(), list(by_lower), n=n, cutoff=0.6)]
+
+
+def _from_sources(scope: Scope) -> Dict[str, Any]:
+    """Sources named in the scope's FROM and JOIN clauses (``scope.sources`` also has every visible CTE)."""
+    return {alias: source for alias, (_, source) in scope.selected_sources.items()}
+
+
+def _diagnostic(code: str, message: str, severity: str = "error", **details: Any) -> Dict[str, Any]:
+    return {"severity": severity, "code": code, "message": message,
+            **{k: v for k, v in details.items() if v is not None}}
+
+
+class _Resolver:
+    """Column resolution for one parsed statement against one catalog snapshot."""
+
+    def __init__(self, tables: Dict[str, List[str]]):
+        self.tables = {t.lower(): (t, cols) for t, cols in tables.items()}
+        self.diagnostics: List[Dict[str, Any]] = []
+        self._seen: Set[str] = set()
+
+    def report(self, code: str, message: str, severity: str = "error", **details: Any) -> None:
+        if message not in self._seen:  # The same mistake repeated in a query is reported once
+            self._seen.add(message)
+            self.diagnostics.append(_diagnostic(code, message, severity, **details))
+
+    def source_columns(self, source: Any) -> Optional[List[str]]:
+        """Columns a FROM source provides, or None when they are unknown (e.g. ``SELECT *``)."""
+        if isinstance(source, Scope):
+            node = source.expression
+            cte = node.parent if isinstance(node.parent, exp.CTE) else None
+            alias_cols = cte.args["alias"].columns if cte is not None and cte.args.get("alias") else []
+            if alias_cols:
+                return [c.name for c in alias_cols]
+            if isinstance(node, exp.SetOperation):
+                node = node.left
+                while isinstance(node, exp.SetOperation):
+                    node = node.left
+                source = next((s for s in source.set_operation_scopes if s.expression is node), None)
+                return self.source_columns(source) if source is not None else None
+            if not isinstance(node, exp.Select):
+                return None
+            names: List[str] = []
+            for e in node.expressions:
+                if isinstance(e, exp.Star) or (isinstance(e, exp.Column) and isinstance(e.this, exp.Star)):
+                    # SELECT * / t.* expand to the columns of the inner sources
+                    inner_sources = _from_sources(source)
+                    picked = [inner_sources.get(e.table)] if isinstance(e, exp.Column) else list(inner_sources.values())
+                    for inner in picked:
+                        cols = self.source_columns(inner) if inner is not None else None
+                        if cols is None:
+                            return None
+                        names += cols
+                else:
+                    names.append(e.alias_or_name)
+            return names
+        if isinstance(source, exp.Table):
+            known = self.tables.get(source.name.lower())
+            return list(known[1]) if known else None
+        return None
+
+    def check_tables(self, scope: Scope) -> None:
+        for node in scope.tables:
+            name = node.name
+            if isinstance(scope.sources.get(node.alias_or_name), Scope):
+                continue  # CTE
+            if name.lower() in self.tables or not name:
+                continue
+            ctes = [n for n, s in scope.sources.items() if isinstance(s, Scope)]
+            suggestions = _close(name, [t for t, _ in self.tables.values()] + ctes)
+            hint = f" Did you mean {', '.join(repr(s) for s in suggestions)}?" if suggestions else ""
+            self.report("unknown_table", f"Unknown table '{name}'.{hint}", table=name, suggestions=suggestions)
+
+    def _lookup(self, scope: Scope, col: exp.Column) -> Optional[List[str]]:
+        """Names of the sources providing ``col`` in ``scope`` or its enclosing scopes.
+
+        Returns None when resolution is inconclusive (a source with unknown columns).
+        """
+        name = col.name.lower()
+        current: Optional[Scope] = scope
+        while current is not None:
+            owners, unknown = [], False
+            for alias, source in _from_sources(current).items():
+                cols = self.source_columns(source)
+                if cols is None:
+                    unknown = True
+                elif name in (c.lower() for c in cols) or (isinstance(source, exp.Table) and name in _IMPLICIT_COLUMNS):
+                    owners.append(alias)
+            if owners:
+                return owners
+            if unknown:
+                return None
+            current = current.parent
+        return []
+
+    def _using(self, select: exp.Select) -> Set[str]:
+        """Columns merged by ``JOIN ... USING`` (never ambiguous); '*' for a ``NATURAL JOIN``."""
+        merged: Set[str] = set()
+        for join in select.args.get("joins") or []:
+            merged.update(i.name.lower() for i in join.args.get("using") or [])
+            if str(join.args.get("method") or "").upper() == "NATURAL":
+                merged.add("*")
+        return merged
+
+    def check_columns(self, scope: Scope) -> None:
+        select = scope.expression
+        if not isinstance(select, exp.Select):
+            return
+        aliases = {e.alias.lower() for e in select.expressions if isinstance(e, exp.Alias)}
+        using = self._using(select)
+        for col in select.find_all(exp.Column):
+            if col.find_ancestor(exp.Select) is not select:
+                continue  # Belongs to a nested scope
+            if col.table:
+                self._check_qualified(scope, col)
+            elif not isinstance(col.this, exp.Star):
+                self._check_bare(scope, col, aliases, using)
+
+    def _scope_with(self, scope: Scope, alias: str) -> Optional[Scope]:
+        current: Optional[Scope] = scope
+        while current is not None:
+            if alias in _from_sources(current):
+                return current
+            current = current.parent
+        return None
+
+    def _check_qualified(self, scope: Scope, col: exp.Column) -> None:
+        owner = self._scope_with(scope, col.table)
+        if owner is None:
+            local = sorted(_from_sources(scope))
+            if any(a.lower() == col.table.lower() for a in local):
+                return  # Identifier case only differs
+            suggestions = _close(col.table, local) or local
+            self.report(
+                "unknown_alias",
+                f"'{col.table}.{col.name}' refers to '{col.table}', which is not a table or alias in this query. "
+                f"Available: {', '.join(local) or 'none'}.",
+                table=col.table, column=col.name, suggestions=suggestions,
+            )
+            return
+        if isinstance(col.this, exp.Star):
+            return
+        source = _from_sources(owner)[col.table]
+        cols = self.source_columns(source)
+        if cols is None or col.name.lower() in (c.lower() for c in cols):
+            return
+        if isinstance(source, exp.Table) and col.name.lower() in _IMPLICIT_COLUMNS:
+            return
+        table = source.name if isinstance(source, exp.Table) else col.table
+        suggestions = [f"{col.table}.{c}" for c in _close(col.name, cols)]
+        if not suggestions:
+            suggestions = [f"{t}.{col.name}" for t, tcols in self.tables.values()
+                           if col.name.lower() in (c.lower() for c in tcols)][:3]
+        hint = f" Did you mean {', '.join(suggestions)}?" if suggestions else ""
+        kind = "Table" if isinstance(source, exp.Table) else "Subquery"
+        self.report("unknown_column", f"{kind} '{table}' has no column '{col.name}'.{hint}",
+                    table=table, column=col.name, suggestions=suggestions)
+
+    def _check_bare(self, scope: Scope, col: exp.Column, aliases: Set[str], using: Set[str]) -> None:
+        name = col.name.lower()
+        owners = self._lookup(scope, col)
+        if owners is None:
+            return
+        if len(owners) > 1 and name not in using and "*" not in using:
+            suggestions = [f"{o}.{col.name}" for o in owners]
+            self.report("ambiguous_column",
+                        f"Column '{col.name}' is ambiguous: it exists in {', '.join(owners)}. Qualify it, e.g. {suggestions[0]}.",
+                        column=col.name, suggestions=suggestions)
+            return
+        if owners or name in aliases:
+            return
+        if col.this.args.get("quoted"):
+            self.report("double_quoted_string",
+                        f"\"{col.name}\" matches no column and is read as a string; use single quotes: '{col.name}'.",
+                        severity="warning", column=col.name, suggestions=[f"'{col.name}'"])
+            return
+        local = _from_sources(scope)
+        available = []
+        for alias, source in local.items():
+            cols = self.source_columns(source) or []
+            available += [f"{alias}.{c}" if len(local) > 1 else c for c in cols]
+        by_name = {a.split(".")[-1]: a for a in available}
+        suggestions = [by_name[c] for c in _close(col.name, list(by_name))]
+        if not suggestions:
+            suggestions = [f"{t}.{col.name}" for t, tcols in self.tables.values()
+                           if name in (c.lower() for c in tcols)][:3]
+        sources = ", ".join(s.name if isinstance(s, exp.Table) else a for a, s in local.items())
+        hint = f" Did you mean {', '.join(suggestions)}?" if suggestions else ""
+        self.report("unknown_column", f"No column '{col.name}' in {sources or 'this query (no FROM clause)'}.{hint}",
+                    column=col.name, suggestions=suggestions)
+
+
+def validate_sql(sql: str, catalog: Optional[SchemaCatalog] = None, session: Optional[str] = None) -> Dict[str, Any]:
+    """Check that ``sql`` parses and that every table and column it names exists.
+
+    Args:
+        sql: SQLite statement to check
+        catalog: Schema to resolve names against (defaults to the live catalog)
+        session: Session whose result tables count as tables too
+
+    Returns:
+        Dictionary with status ("valid" or "invalid") and diagnostics, a list
+        of dicts with severity, code, message, table, column and suggestions;
+        warnings alone do not make a statement invalid
+    """
+    try:
+        tree = parse_sql(sql)
+    except SqlglotError as e:
+        return {"status": "invalid", "diagnostics": [_diagnostic("syntax_error", f"Syntax error: {e}")]}
+    catalog = (catalog or schema_catalog).refresh()
+    tables: Dict[str, List[str]] = {t.name: t.column_names for t in catalog.tables.values()}
+    tables.update({k: v for k, v in _SYSTEM_TABLES.items() if k not in tables})
+    tables.update({k: v for k, v in session_results.tables(session).items() if k not in tables})
+    resolver = _Resolver(tables)
+    try:
+        scopes = traverse_scope(tree)
+    except SqlglotError as e:
+        return {"status": "invalid", "diagnostics": [_diagnostic("syntax_error", f"Unresolvable query structure: {e}")]}
+    for scope in scopes:
+        resolver.check_tables(scope)
+    if not any(d["code"] == "unknown_table" for d in resolver.diagnostics):
+        for scope in scopes:
+            resolver.check_columns(scope)
+    errors = any(d["severity"] == "error" for d in resolver.diagnostics)
+    return {"status": "invalid" if errors else "valid", "diagnostics": resolver.diagnostics}
+
+
+def format_diagnostics(diagnostics: List[Dict[str, Any]]) -> str:
+    """One line per diagnostic, errors first."""
+    ordered = sorted(diagnostics, key=lambda d: d["severity"] != "error")
+    return "\n".join(f"- [{d['code']}] {d['message']}" for d in ordered)
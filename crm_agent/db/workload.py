@@ -0,0 +1,77 @@
+"""Workload Log - Record of the statements executed against the database.
+
+Every statement ``run_sql_query`` actually executes (cache hits are not
+executions) is recorded as submitted, plus the statement that ran
+(``exec_sql``) when a UNION rewrite or rollup routing changed it,
+together with its duration and outcome, in a
+bounded in-memory deque and, through a background ``JsonlWriter``, in a
+size-rotated JSON-lines file. The index advisor reads this log to find
+the predicates and join keys the agents really use.
+"""
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+from ..config import QUERY_LOG_MAX_MB, QUERY_LOG_MEMORY, QUERY_LOG_PATH
+from ..logfile import JsonlWriter, read_jsonl
+
+
+class WorkloadLog:
+    """Statement log kept in memory and appended to a file off the query path."""
+
+    def __init__(self, path: Optional[str] = QUERY_LOG_PATH, memory: int = QUERY_LOG_MEMORY,
+                 max_mb: float = QUERY_LOG_MAX_MB):
+        self.max_mb = max_mb
+        self._recent: Deque[Dict[str, Any]] = deque(maxlen=memory)
+        self._lock = threading.Lock()
+        self._writer: Optional[JsonlWriter] = None
+        self.path = path
+
+    @property
+    def path(self) -> Optional[str]:
+        return self._writer.path if self._writer else None
+
+    @path.setter
+    def path(self, path: Optional[str]) -> None:
+        with self._lock:
+            if self._writer is not None:
+                self._writer.flush(5.0)
+            self._writer = JsonlWriter(path, self.max_mb) if path else None
+
+    def record(self, sql: str, seconds: float, status: str, rows: Optional[int] = None,
+               exec_sql: Optional[str] = None) -> None:
+        """Log one executed statement; never touches the disk itself."""
+        entry = {"ts": round(time.time(), 3), "sql": sql, "seconds": round(seconds, 6), "status": status}
+        if rows is not None:
+            entry["rows"] = rows
+        if exec_sql and exec_sql != sql:
+            entry["exec_sql"] = exec_sql
+        with self._lock:
+            self._recent.append(entry)
+            writer = self._writer
+        if writer is not None:
+            writer.write(entry)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every recorded entry is in the file."""
+        writer = self._writer
+        return writer.flush(timeout) if writer is not None else True
+
+    def recent(self) -> List[Dict[str, Any]]:
+        """Entries recorded by this process, oldest first."""
+        with self._lock:
+            return list(self._recent)
+
+    def load(self, path: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Every entry in the log file and ``<path>.1`` (skipping unreadable lines), else the in-memory ones."""
+        if path is None:
+            self.flush(5.0)
+        path = path or self.path
+        if not path or not os.path.isfile(path):
+            return self.recent()
+        return read_jsonl(path)
+
+
+workload_log = WorkloadLog()
@@ -0,0 +1,104 @@
+"""Log Files - Size-rotated JSON-lines files written off the query path.
+
+The workload log and the trace exporter record something on every query.
+Callers only append the entry to a bounded in-memory queue; a background
+thread serializes queued entries and appends them in batches, so no
+query waits on (or is slowed by) disk I/O, snapshot serving included.
+
+Past ``max_mb`` the file is moved to ``<path>.1`` (replacing the previous
+one) and a new one started, so a log keeps at most twice that on disk.
+Entries queued while ``max_pending`` are already waiting are dropped and
+counted; write failures disable the file, never the caller.
+"""
+import atexit
+import json
+import os
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+_IDLE_S = 1.0  # The writer thread exits after this long without entries
+
+
+class JsonlWriter:
+    """Appends entries to a JSON-lines file from a background thread."""
+
+    def __init__(self, path: str, max_mb: float = 0, max_pending: int = 10000):
+        self.path = path
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.dropped = 0
+        self.failed = False
+        self._pending: Deque[Dict[str, Any]] = deque()
+        self._max_pending = max_pending
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._queued = 0   # Entries accepted so far
+        self._written = 0  # Entries written (or given up on) so far
+        self._size: Optional[int] = None  # Bytes in the current file, read on the first write
+        atexit.register(self.flush, 5.0)
+
+    def write(self, entry: Dict[str, Any]) -> None:
+        """Queue one entry; never blocks on the file."""
+        with self._cond:
+            if self.failed:
+                return
+            if len(self._pending) >= self._max_pending:
+                self.dropped += 1
+                return
+            self._pending.append(entry)
+            self._queued += 1
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="jsonl-writer", daemon=True)
+                self._thread.start()
+            self._cond.notify_all()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every entry queued so far is on disk; False on timeout."""
+        with self._cond:
+            target = self._queued
+            return self._cond.wait_for(lambda: self._written >= target, timeout)
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                if not self._pending:
+                    self._cond.wait(_IDLE_S)
+                if not self._pending:
+                    self._thread = None
+                    return
+                batch: List[Dict[str, Any]] = list(self._pending)
+                self._pending.clear()
+            if not self.failed:
+                try:
+                    self._append("".join(json.dumps(e, default=str) + "\n" for e in batch).encode("utf-8"))
+                except (OSError, TypeError, ValueError):
+                    self.failed = True
+            with self._cond:
+                self._written += len(batch)
+                self._cond.notify_all()
+
+    def _append(self, data: bytes) -> None:
+        """Write one batch, rotating the file first if it would pass ``max_bytes``."""
+        if self._size is None:
+            self._size = os.path.getsize(self.path) if os.path.isfile(self.path) else 0
+        if self.max_bytes and self._size and self._size + len(data) > self.max_bytes:
+            os.replace(self.path, self.path + ".1")
+            self._size = 0
+        with open(self.path, "ab") as f:
+            f.write(data)
+        self._size += len(data)
+
+
+def read_jsonl(path: str) -> List[Dict[str, Any]]:
+    """Entries of ``<path>.1`` then ``path``, skipping unreadable lines."""
+    entries = []
+    for name in (path + ".1", path):
+        if not os.path.isfile(name):
+            continue
+        with open(name, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entries.append(json.loads(line))
+                except ValueError:
+                    continue
+    return entries
@@ -0,0 +1,68 @@
+"""ADK Tools - Async tool functions exposed to the planner.
+
+The tools await the DB thread pool instead of calling sqlite3 directly,
+so a slow query never blocks other sessions sharing the event loop.
+
+The planner's trial queries are not kept as session result tables; only
+the turn's last successful query, the one the answer is built from, is
+stored by ``keep_answer`` once the agent finishes.
+"""
+from typing import Any, Dict, List, Optional
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.tools import ToolContext
+from .db import get_compact_schema_async, run_in_db_thread, run_sql_query_async, session_results
+
+_LAST_RESULT = "temp:last_result"  # Invocation-scoped: {"sql": ..., "result": ...}
+
+
+def _question(tool_context: ToolContext) -> str:
+    content = tool_context.user_content
+    if not content or not content.parts:
+        return ""
+    return " ".join(p.text for p in content.parts if p.text)
+
+
+async def get_schema(tool_context: ToolContext, tables: Optional[List[str]] = None) -> str:
+    """Retrieve a compact schema of the tables relevant to the user's question.
+
+    Each line lists a table, its row count and its columns; small text
+    columns include their distinct values. Tables left out are listed by
+    name at the end - call again with ``tables`` to describe them.
+
+    Args:
+        tables: Table names to describe instead of the relevant ones
+
+    Returns:
+        Compact schema text
+    """
+    question = None if tables else _question(tool_context)
+    return await get_compact_schema_async(question, tables, session_id=tool_context.session.id)
+
+
+async def run_sql_query(sql: str, tool_context: ToolContext) -> Dict[str, Any]:
+    """Execute a read-only SQL query and return results.
+
+    Large results are truncated; check ``truncated`` and ``total_rows``
+    and aggregate or add a LIMIT instead of selecting raw rows.
+
+    Args:
+        sql: SQL query string to execute
+
+    Returns:
+        Dictionary with status, columns, rows, row_count, truncated and
+        total_rows on success or status and error message on failure
+    """
+    result = await run_sql_query_async(sql, session_id=tool_context.session.id, keep_result=False)
+    if result.get("status") == "success":
+        tool_context.state[_LAST_RESULT] = {"sql": sql, "result": result}
+    return result
+
+
+async def keep_answer(callback_context: CallbackContext) -> None:
+    """After-agent callback: keep the turn's last successful query as a session result table."""
+    last = callback_context.state.get(_LAST_RESULT)
+    if last:
+        session_id = callback_context.session.id
+        await run_in_db_thread(session_results.register, session_id, last["sql"], last["result"], session_id=session_id)
+        callback_context.state[_LAST_RESULT] = None
+    return None
@@ -0,0 +1,34 @@
+"""Tracing package - Per-stage latency and token spans for both agent pipelines."""
+import importlib
+
+from .tracer import Span, Tracer, current_span
+from .exporters import InMemoryExporter, JsonlExporter, OpenTelemetryExporter, exporter_from_config, load_spans
+from .summary import last_traces, print_summary, summarize_spans
+
+# Process-wide tracer, exporting where CRM_TRACE_EXPORTER says
+tracer = Tracer([e for e in (exporter_from_config(),) if e is not None])
+
+
+def __getattr__(name):
+    # The plugin needs ADK; the DB layer only needs ``tracer``
+    if name != "TracingPlugin":
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = importlib.import_module(".plugin", __name__).TracingPlugin
+    globals()[name] = value
+    return value
+
+__all__ = [
+    "Span",
+    "Tracer",
+    "current_span",
+    "tracer",
+    "InMemoryExporter",
+    "JsonlExporter",
+    "OpenTelemetryExporter",
+    "exporter_from_config",
+    "load_spans",
+    "TracingPlugin",
+    "last_traces",
+    "print_summary",
+    "summarize_spans",
+]
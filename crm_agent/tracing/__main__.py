@@ -0,0 +1,25 @@
+import argparse
+from ..config import TRACE_PATH
+from . import last_traces, load_spans, print_summary, summarize_spans
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(prog="python -m crm_agent.tracing", description="Per-stage latency percentiles from a trace file.")
+    ap.add_argument("--trace", default=TRACE_PATH, help="JSONL file written by the jsonl exporter")
+    ap.add_argument("--kind", choices=("invocation", "agent", "model", "tool", "sql"), help="Only stages of this kind")
+    ap.add_argument("--last", type=int, help="Only the N most recent questions")
+    ap.add_argument("--slowest", type=int, default=0, help="Also list the N slowest SQL statements")
+    args = ap.parse_args()
+    spans = load_spans(args.trace)
+    if args.last:
+        spans = last_traces(spans, args.last)
+    if not spans:
+        print(f"No spans in {args.trace}")
+        raise SystemExit(1)
+    print(f"{len({s['trace_id'] for s in spans})} question(s), {len(spans)} span(s)\n")
+    print_summary(summarize_spans(spans, args.kind))
+    if args.slowest:
+        print("\nSlowest SQL:")
+        sql = sorted((s for s in spans if s["kind"] == "sql" and s.get("duration_s") is not None),
+                     key=lambda s: -s["duration_s"])
+        for s in sql[:args.slowest]:
+            print(f"{s['duration_s'] * 1e3:9.1f} ms  {s['attributes'].get('row_count', '-'):>6} rows  {s['attributes'].get('sql', '')[:120]}")
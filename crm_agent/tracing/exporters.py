@@ -0,0 +1,107 @@
+"""Span Exporters - Where finished spans go.
+
+An exporter has ``export(span)``, called once per finished span, and
+optionally ``on_start(span)``. Three are provided:
+
+- ``JsonlExporter``: one JSON object per span appended to a file by a
+  background writer, read by ``python -m crm_agent.tracing`` and moved
+  to ``<path>.1`` past ``TRACE_MAX_MB``,
+- ``InMemoryExporter``: a bounded buffer, for tests and benchmarks,
+- ``OpenTelemetryExporter``: mirrors spans into the OpenTelemetry SDK
+  (requires the ``opentelemetry-api`` package and a configured provider).
+"""
+import json
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+from ..config import TRACE_EXPORTER, TRACE_MAX_MB, TRACE_MEMORY, TRACE_PATH
+from ..logfile import JsonlWriter, read_jsonl
+from .tracer import Span
+
+
+class InMemoryExporter:
+    """Keeps the most recent finished spans."""
+
+    def __init__(self, maxlen: int = TRACE_MEMORY):
+        self._spans: Deque[Span] = deque(maxlen=maxlen)
+        self._lock = threading.Lock()
+
+    def export(self, span: Span) -> None:
+        with self._lock:
+            self._spans.append(span)
+
+    def spans(self) -> List[Span]:
+        with self._lock:
+            return list(self._spans)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._spans.clear()
+
+
+class JsonlExporter:
+    """Appends each finished span to a size-rotated JSON-lines file from a background thread."""
+
+    def __init__(self, path: str = TRACE_PATH, max_mb: float = TRACE_MAX_MB):
+        self.path = path
+        self._writer = JsonlWriter(path, max_mb)
+
+    def export(self, span: Span) -> None:
+        self._writer.write(span.to_dict())
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every exported span is in the file."""
+        return self._writer.flush(timeout)
+
+
+def load_spans(path: str = TRACE_PATH) -> List[Dict[str, Any]]:
+    """Span dicts from a ``JsonlExporter`` file and ``<path>.1``, skipping unreadable lines."""
+    return read_jsonl(path)
+
+
+class OpenTelemetryExporter:
+    """Mirrors spans into OpenTelemetry, keeping the parent/child structure."""
+
+    def __init__(self, tracer_name: str = "crm_agent"):
+        try:
+            from opentelemetry import trace
+        except ImportError as e:
+            raise ImportError("OpenTelemetryExporter requires 'opentelemetry-api' (pip install opentelemetry-sdk)") from e
+        self._trace = trace
+        self._tracer = trace.get_tracer(tracer_name)
+        self._open: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def on_start(self, span: Span) -> None:
+        with self._lock:
+            parent = self._open.get(span.parent_id) if span.parent_id else None
+        context = self._trace.set_span_in_context(parent) if parent is not None else None
+        otel = self._tracer.start_span(f"{span.kind}:{span.name}", context=context, start_time=int(span.start * 1e9))
+        with self._lock:
+            self._open[span.span_id] = otel
+
+    def export(self, span: Span) -> None:
+        with self._lock:
+            otel = self._open.pop(span.span_id, None)
+        if otel is None:
+            return
+        for key, value in span.attributes.items():
+            otel.set_attribute(f"crm.{key}", value if isinstance(value, (str, bool, int, float)) else json.dumps(value, default=str))
+        if span.status != "ok":
+            otel.set_status(self._trace.Status(self._trace.StatusCode.ERROR, span.attributes.get("error")))
+        otel.end(end_time=int(span.end * 1e9) if span.end else None)
+
+
+def exporter_from_config(kind: Optional[str] = TRACE_EXPORTER) -> Optional[Any]:
+    """Exporter named by ``CRM_TRACE_EXPORTER`` ('jsonl', 'memory', 'otel'; '' or 'none' disables)."""
+    kind = (kind or "").strip().lower()
+    if kind in ("", "none", "off"):
+        return None
+    if kind == "jsonl":
+        return JsonlExporter(TRACE_PATH) if TRACE_PATH else None
+    if kind == "memory":
+        return InMemoryExporter()
+    if kind in ("otel", "opentelemetry"):
+        return OpenTelemetryExporter()
+    raise ValueError(f"Unknown trace exporter '{kind}' (expected jsonl, memory, otel or none)")
@@ -0,0 +1,150 @@
+"""Tracing Plugin - ADK runner callbacks that open and close spans.
+
+Registered on an ``App``, the plugin sees every agent (LLM agents and the
+custom ``BaseAgent`` subclasses alike), model call and tool call of an
+invocation and records:
+
+- agents: one span per run, so ``sql_loop`` retries show up as repeats,
+- model calls: prompt, completion, thought and cached token counts, the
+  thinking budget from the request and the share of it used,
+- tool calls: arguments (SQL text) and result status and row count.
+
+SQL statements are traced by ``run_sql_query_bounded`` itself and nest
+under whichever agent or tool span is current.
+
+A cancelled invocation (client gone, task cancelled) gets neither
+``after_run_callback`` nor ``on_run_error_callback``. Its spans are closed
+as "expired" by the next run once they are older than
+``TRACE_OPEN_SPAN_TTL_S``, so they neither leak nor go missing.
+"""
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from google.adk.plugins.base_plugin import BasePlugin
+
+from ..config import TRACE_OPEN_SPAN_TTL_S, TRACE_SQL_MAX_CHARS
+from .tracer import Span, Tracer
+
+
+def _clip(value: Any) -> Any:
+    return value[:TRACE_SQL_MAX_CHARS] if isinstance(value, str) else value
+
+
+class TracingPlugin(BasePlugin):
+    """Spans for the invocation, agents, model calls and tool calls."""
+
+    def __init__(self, tracer: Optional[Tracer] = None, name: str = "tracing",
+                 open_span_ttl_s: float = TRACE_OPEN_SPAN_TTL_S):
+        super().__init__(name=name)
+        self.open_span_ttl_s = open_span_ttl_s
+        if tracer is None:
+            from . import tracer as default_tracer
+            tracer = default_tracer
+        self.tracer = tracer
+        # Open spans by (invocation id, kind, key); closed explicitly or at the end of the run
+        self._open: Dict[Tuple[str, str, str], Span] = {}
+
+    def _start(self, key: Tuple[str, str, str], name: str, kind: str, **attributes: Any) -> None:
+        if self.tracer.enabled:
+            self._open[key] = self.tracer.start(name, kind, **attributes)
+
+    def _end(self, key: Tuple[str, str, str], status: Optional[str] = None, **attributes: Any) -> None:
+        span = self._open.pop(key, None)
+        if span is not None:
+            self.tracer.end(span, status, **attributes)
+
+    def _expire(self) -> None:
+        """Close every span of invocations with a span open for longer than ``open_span_ttl_s``."""
+        cutoff = time.time() - self.open_span_ttl_s
+        stale = {k[0] for k, span in self._open.items() if span.start < cutoff}
+        for key in [k for k in self._open if k[0] in stale][::-1]:
+            self._end(key, "expired")
+
+    # ── Invocation ──────────────────────────────────────────
+    async def before_run_callback(self, *, invocation_context):
+        self._expire()
+        question = " ".join(p.text for p in (invocation_context.user_content.parts or []) if p.text) \
+            if invocation_context.user_content else ""
+        self._start((invocation_context.invocation_id, "invocation", ""), invocation_context.app_name, "invocation",
+                    session_id=invocation_context.session.id, invocation_id=invocation_context.invocation_id,
+                    question=_clip(question))
+        return None
+
+    async def after_run_callback(self, *, invocation_context):
+        inv = invocation_context.invocation_id
+        # Agents skipped by a before-callback never reach after_agent_callback
+        for key in [k for k in self._open if k[0] == inv and k[1] != "invocation"][::-1]:
+            self._end(key, "unfinished")
+        self._end((inv, "invocation", ""))
+
+    async def on_run_error_callback(self, *, invocation_context, error):
+        inv = invocation_context.invocation_id
+        for key in [k for k in self._open if k[0] == inv][::-1]:
+            self._end(key, "error", error=f"{type(error).__name__}: {error}")
+
+    # ── Agents ──────────────────────────────────────────────
+    async def before_agent_callback(self, *, agent, callback_context):
+        self._start((callback_context.invocation_id, "agent", agent.name), agent.name, "agent",
+                    agent_type=type(agent).__name__)
+        return None
+
+    async def after_agent_callback(self, *, agent, callback_context):
+        self._end((callback_context.invocation_id, "agent", agent.name))
+        return None
+
+    async def on_agent_error_callback(self, *, agent, callback_context, error):
+        self._end((callback_context.invocation_id, "agent", agent.name), "error", error=f"{type(error).__name__}: {error}")
+
+    # ── Model calls ─────────────────────────────────────────
+    async def before_model_callback(self, *, callback_context, llm_request):
+        thinking = llm_request.config.thinking_config if llm_request.config else None
+        self._start((callback_context.invocation_id, "model", callback_context.agent_name),
+                    callback_context.agent_name, "model", model=llm_request.model,
+                    thinking_budget=thinking.thinking_budget if thinking else None)
+        return None
+
+    async def after_model_callback(self, *, callback_context, llm_response):
+        key = (callback_context.invocation_id, "model", callback_context.agent_name)
+        span = self._open.get(key)
+        if span is None or llm_response.partial:
+            return None
+        usage = llm_response.usage_metadata
+        attrs: Dict[str, Any] = {}
+        if usage is not None:
+            attrs = {"prompt_tokens": usage.prompt_token_count, "completion_tokens": usage.candidates_token_count,
+                     "thought_tokens": usage.thoughts_token_count, "cached_tokens": usage.cached_content_token_count}
+            budget = span.attributes.get("thinking_budget")
+            if budget and usage.thoughts_token_count is not None:
+                attrs["thinking_budget_used"] = round(usage.thoughts_token_count / budget, 4)
+        parts = llm_response.content.parts if llm_response.content and llm_response.content.parts else []
+        attrs["function_calls"] = sum(1 for p in parts if p.function_call)
+        self._end(key, "error" if llm_response.error_code else None, error=llm_response.error_message, **attrs)
+        return None
+
+    async def on_model_error_callback(self, *, callback_context, llm_request, error):
+        self._end((callback_context.invocation_id, "model", callback_context.agent_name), "error",
+                  error=f"{type(error).__name__}: {error}")
+        return None
+
+    # ── Tool calls ──────────────────────────────────────────
+    async def before_tool_callback(self, *, tool, tool_args, tool_context):
+        self._start((tool_context.invocation_id, "tool", tool_context.function_call_id or tool.name), tool.name, "tool",
+                    agent=tool_context.agent_name, **{f"arg_{k}": _clip(v) for k, v in tool_args.items()
+                                                      if isinstance(v, (str, int, float, bool))})
+        return None
+
+    async def after_tool_callback(self, *, tool, tool_args, tool_context, result):
+        attrs: Dict[str, Any] = {}
+        status = None
+        if isinstance(result, dict):
+            attrs["result_status"] = result.get("status")
+            attrs["row_count"] = result.get("row_count")
+            if result.get("status") == "error":
+                status, attrs["error"] = "error", _clip(str(result.get("error")))
+        self._end((tool_context.invocation_id, "tool", tool_context.function_call_id or tool.name), status, **attrs)
+        return None
+
+    async def on_tool_error_callback(self, *, tool, tool_args, tool_context, error):
+        self._end((tool_context.invocation_id, "tool", tool_context.function_call_id or tool.name), "error",
+                  error=f"{type(error).__name__}: {error}")
+        return None
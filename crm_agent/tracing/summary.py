@@ -0,0 +1,59 @@
+"""Trace Summary - Latency percentiles and token totals per pipeline stage."""
+from typing import Any, Dict, List, Optional
+
+_TOKEN_KEYS = ("prompt_tokens", "completion_tokens", "thought_tokens")
+
+
+def _pct(ordered: List[float], q: float) -> float:
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+def last_traces(spans: List[Dict[str, Any]], n: int) -> List[Dict[str, Any]]:
+    """Spans of the ``n`` most recently started traces."""
+    starts: Dict[str, float] = {}
+    for s in spans:
+        starts[s["trace_id"]] = min(starts.get(s["trace_id"], s["start"]), s["start"])
+    keep = set(sorted(starts, key=starts.get)[-n:])
+    return [s for s in spans if s["trace_id"] in keep]
+
+
+def summarize_spans(spans: List[Dict[str, Any]], kind: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+    """Per stage (``kind:name``): count, errors, p50/p95/max/total seconds and token totals."""
+    groups: Dict[str, List[Dict[str, Any]]] = {}
+    for s in spans:
+        if s.get("duration_s") is None or (kind and s["kind"] != kind):
+            continue
+        groups.setdefault(f"{s['kind']}:{s['name']}", []).append(s)
+    summary = {}
+    for stage, members in groups.items():
+        durations = sorted(s["duration_s"] for s in members)
+        row: Dict[str, Any] = {
+            "count": len(members),
+            "errors": sum(1 for s in members if s["status"] != "ok"),
+            "p50_s": _pct(durations, 0.5),
+            "p95_s": _pct(durations, 0.95),
+            "max_s": durations[-1],
+            "total_s": sum(durations),
+        }
+        for key in _TOKEN_KEYS:
+            values = [s["attributes"].get(key) for s in members if s["attributes"].get(key) is not None]
+            if values:
+                row[key] = sum(values)
+        budgets = [s["attributes"]["thinking_budget_used"] for s in members if "thinking_budget_used" in s["attributes"]]
+        if budgets:
+            row["thinking_budget_used_p95"] = _pct(sorted(budgets), 0.95)
+        rows = [s["attributes"].get("row_count") for s in members if s["attributes"].get("row_count") is not None]
+        if rows:
+            row["rows"] = sum(rows)
+        summary[stage] = row
+    return dict(sorted(summary.items(), key=lambda kv: -kv[1]["total_s"]))
+
+
+def print_summary(summary: Dict[str, Dict[str, Any]]) -> None:
+    """Table of ``summarize_spans`` output, slowest stages (by total time) first."""
+    print(f"{'stage':<40}{'count':>7}{'err':>5}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}{'total s':>9}"
+          f"{'prompt tok':>12}{'compl tok':>11}{'thought tok':>13}")
+    for stage, r in summary.items():
+        print(f"{stage[:39]:<40}{r['count']:>7}{r['errors']:>5}{r['p50_s'] * 1e3:>10.1f}{r['p95_s'] * 1e3:>10.1f}"
+              f"{r['max_s'] * 1e3:>10.1f}{r['total_s']:>9.2f}{r.get('prompt_tokens', ''):>12}"
+              f"{r.get('completion_tokens', ''):>11}{r.get('thought_tokens', ''):>13}")
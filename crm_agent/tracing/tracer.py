@@ -0,0 +1,125 @@
+"""Tracer - Timed spans for pipeline stages.
+
+A span covers one stage of answering a question: the whole invocation,
+an agent, a model call, a tool call or a SQL statement. Spans nest
+through a context variable: a span started while another is current
+becomes its child, including SQL run on the DB threads (``run_in_db_thread``
+carries the context over). Finished spans go to every registered exporter.
+"""
+import contextvars
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional
+
+_current: "contextvars.ContextVar[Optional[Span]]" = contextvars.ContextVar("crm_current_span", default=None)
+
+
+@dataclass
+class Span:
+    """One timed stage; ``attributes`` hold token counts, SQL text, row counts etc."""
+    name: str
+    kind: str  # invocation, agent, model, tool or sql
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str] = None
+    start: float = 0.0                  # Unix time
+    end: Optional[float] = None
+    status: str = "ok"
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    parent: Optional["Span"] = field(default=None, repr=False, compare=False)
+    _started: float = field(default=0.0, repr=False, compare=False)  # perf_counter at start
+
+    @property
+    def duration_s(self) -> Optional[float]:
+        return None if self.end is None else self.end - self.start
+
+    def set(self, **attributes: Any) -> None:
+        self.attributes.update({k: v for k, v in attributes.items() if v is not None})
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id, "span_id": self.span_id, "parent_id": self.parent_id,
+            "name": self.name, "kind": self.kind, "start": round(self.start, 6),
+            "duration_s": None if self.end is None else round(self.end - self.start, 6),
+            "status": self.status, "attributes": self.attributes,
+        }
+
+
+class Tracer:
+    """Creates spans and hands finished ones to the exporters."""
+
+    def __init__(self, exporters: Optional[List[Any]] = None):
+        self.exporters: List[Any] = list(exporters or [])
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.exporters)
+
+    def add_exporter(self, exporter: Any) -> None:
+        with self._lock:
+            self.exporters.append(exporter)
+
+    def remove_exporter(self, exporter: Any) -> None:
+        with self._lock:
+            if exporter in self.exporters:
+                self.exporters.remove(exporter)
+
+    def start(self, name: str, kind: str, parent: Optional[Span] = None, activate: bool = True,
+              **attributes: Any) -> Span:
+        """Open a span under ``parent`` (default: the current span) and make it current."""
+        parent = parent if parent is not None else _current.get()
+        span = Span(
+            name=name, kind=kind,
+            trace_id=parent.trace_id if parent else uuid.uuid4().hex,
+            span_id=uuid.uuid4().hex[:16],
+            parent_id=parent.span_id if parent else None,
+            start=time.time(), parent=parent, _started=time.perf_counter(),
+        )
+        span.set(**attributes)
+        for exporter in list(self.exporters):
+            on_start = getattr(exporter, "on_start", None)
+            if on_start is not None:
+                try:
+                    on_start(span)
+                except Exception:
+                    pass
+        if activate:
+            _current.set(span)
+        return span
+
+    def end(self, span: Span, status: Optional[str] = None, **attributes: Any) -> None:
+        """Close ``span`` (once), restore its parent as current and export it."""
+        if span.end is not None:
+            return
+        span.end = span.start + (time.perf_counter() - span._started)
+        if status:
+            span.status = status
+        span.set(**attributes)
+        if _current.get() is span:
+            _current.set(span.parent)
+        for exporter in list(self.exporters):
+            try:
+                exporter.export(span)
+            except Exception:
+                pass  # Tracing must never fail a question
+
+    @contextmanager
+    def span(self, name: str, kind: str, **attributes: Any) -> Iterator[Span]:
+        """Span for the duration of the block; an exception marks it as an error."""
+        span = self.start(name, kind, **attributes)
+        try:
+            yield span
+        except BaseException as e:
+            self.end(span, "error", error=f"{type(e).__name__}: {e}")
+            raise
+        else:
+            self.end(span)
+
+
+def current_span() -> Optional[Span]:
+    """Innermost open span of the running task or thread."""
+    return _current.get()
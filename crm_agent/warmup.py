@@ -0,0 +1,159 @@
+"""Warm-up - Prepares the process for its first question ahead of time.
+
+A cold process pays for everything on its first question: reading
+crm.db from disk, opening connections, importing sqlglot, building the
+schema catalog, checking ``orders_all`` and the rollups, building the fuzzy entity
+indexes, importing the part of ADK that only loads when a runner first
+runs an agent (most of the cost) and, for digests, pandas. ``warm_up`` does all of it up front
+and ``start_warmup`` does it on a background thread, so it overlaps with
+whatever the process does before the first question arrives (loading
+the agent, waiting for a request).
+
+Every step is idempotent and uses the same caches a query would, so a
+question that arrives mid warm-up simply shares the work.
+"""
+import importlib
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple
+
+from .config import DB_PATH, WARMUP_CONNECTIONS
+
+_READ_CHUNK = 1024 * 1024
+# Loaded by ADK on an agent's first run; missing ones (other ADK versions) are skipped
+_RUNTIME_MODULES = (
+    "google.adk.workflow._workflow",
+    "google.adk.agents._agent_router",
+    "google.adk.auth.auth_preprocessor",
+    "google.adk.tools.google_search_tool",
+    "google.adk.flows.llm_flows.auto_flow",
+    "google.adk.models.google_llm",
+    "google.adk.telemetry.tracing",
+)
+
+
+def page_in(path: str = DB_PATH) -> int:
+    """Read the database file once so its pages are in the OS cache; returns bytes read."""
+    total = 0
+    with open(path, "rb", buffering=0) as f:
+        while True:
+            chunk = f.read(_READ_CHUNK)
+            if not chunk:
+                return total
+            total += len(chunk)
+
+
+# Steps import what they warm when they run, so importing this module
+# (from the agent, on the main thread) stays cheap
+def _connections() -> int:
+    from .db.pool import get_pool
+    return get_pool().prefill(WARMUP_CONNECTIONS)
+
+
+def _sql() -> None:
+    from .db import queries, validate  # noqa: F401  (sqlglot and the query path)
+    from .db.parsing import parse_sql
+    parse_sql("SELECT 1")
+
+
+def _catalog() -> int:
+    from .db.catalog import schema_catalog
+    return len(schema_catalog.refresh().tables)
+
+
+def _orders_all() -> bool:
+    from .db.materialize import orders_all_state
+    return orders_all_state().fresh
+
+
+def _rollups() -> int:
+    from .db.rollup import rollup_state
+    return len(rollup_state().rollups)
+
+
+def _fuzzy() -> Dict[str, int]:
+    from .db.fuzzy import fuzzy_index
+    fuzzy_index.warm()
+    return fuzzy_index.stats()["entities"]
+
+
+def _runtime() -> int:
+    loaded = 0
+    for name in _RUNTIME_MODULES:
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            continue
+        loaded += 1
+    return loaded
+
+
+def _digest() -> None:
+    importlib.import_module("pandas")
+    importlib.import_module(".db.digest", __package__)
+
+
+# In order: the file is paged in before anything reads it
+STEPS: Tuple[Tuple[str, Callable[[], Any]], ...] = (
+    ("page_in", page_in),
+    ("connections", _connections),
+    ("sql", _sql),
+    ("catalog", _catalog),
+    ("orders_all", _orders_all),
+    ("rollups", _rollups),
+    ("fuzzy", _fuzzy),
+    ("runtime", _runtime),
+    ("digest", _digest),
+)
+
+
+def warm_up(steps: Optional[Sequence[str]] = None) -> Dict[str, Dict[str, Any]]:
+    """Run the warm-up steps (all by default) in order.
+
+    Returns:
+        ``{step: {"status", "seconds", "result" or "error"}}``; a failed
+        step is reported and the remaining steps still run
+    """
+    report: Dict[str, Dict[str, Any]] = {}
+    for name, step in STEPS:
+        if steps is not None and name not in steps:
+            continue
+        start = time.perf_counter()
+        try:
+            entry: Dict[str, Any] = {"status": "success", "result": step()}
+        except Exception as e:
+            entry = {"status": "error", "error": str(e)}
+        entry["seconds"] = round(time.perf_counter() - start, 4)
+        report[name] = entry
+    return report
+
+
+# ── Background Warm-up ──────────────────────────────────────
+_thread: Optional[threading.Thread] = None
+_report: Optional[Dict[str, Dict[str, Any]]] = None
+_thread_lock = threading.Lock()
+
+
+def _run(steps: Optional[Sequence[str]]) -> None:
+    global _report
+    _report = warm_up(steps)
+
+
+def start_warmup(steps: Optional[Sequence[str]] = None) -> threading.Thread:
+    """Start the warm-up on a daemon thread, once per process; returns the thread.
+
+    ``join()`` the thread to wait for it; ``warmup_report()`` has the
+    outcome once it is done.
+    """
+    global _thread
+    with _thread_lock:
+        if _thread is None:
+            _thread = threading.Thread(target=_run, args=(steps,), name="crm-warmup", daemon=True)
+            _thread.start()
+        return _thread
+
+
+def warmup_report() -> Optional[Dict[str, Dict[str, Any]]]:
+    """Report of the background warm-up, or None until it has finished."""
+    return _report
+
@@ -1,4 +1,19 @@
 """CRM Agent Classic — Original subagent pipeline."""
-from .agent import root_agent
+import importlib
 
-__all__ = ["root_agent"]
+# The pipeline and its subagents are built on first access (PEP 562)
+_LAZY_MEMBERS = {
+    "app": ".agent",
+    "root_agent": ".agent",
+}
+
+
+def __getattr__(name):
+    if name not in _LAZY_MEMBERS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_LAZY_MEMBERS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+__all__ = ["app", "root_agent"]
@@ -4,30 +4,60 @@ CRM Agent Classic — Original multi-subagent pipeline.
 Architecture:
   SequentialAgent (root)
     ├── SchemaExtractorAgent  → Loads DB schema into session state
-    ├── rewrite_prompt_agent  → Rewrites user query into SQL requirements
-    ├── sql_generator_agent   → Generates SQL from requirements
+    ├── SqlLibraryAgent       → Reuses verified SQL for a question answered before
+    ├── rewrite_prompt_agent  → Rewrites user query into SQL requirements (skipped on a library hit)
+    ├── sql_generator_agent   → Generates SQL from requirements (skipped on a library hit)
+    │   or, with CRM_CLASSIC_SQL_CANDIDATES=K > 1:
+    │   ├── ParallelAgent (sql_candidates) → K architects with varied temperature and approach
+    │   └── SqlCandidateSelectorAgent      → Validates and runs all K at once, picks by result and agreement
     ├── LoopAgent (sql_loop, max 3 iterations)
-    │     ├── SqlValidatorAgent   → Validates SQL syntax
+    │     ├── SqlValidatorAgent   → Validates SQL syntax and table/column references
     │     ├── SqlExecutorAgent    → Executes SQL against DB
-    │     ├── ResultVerifierAgent → Checks results, exits loop if data found
+    │     ├── ResultVerifierAgent → Checks results, exits loop if data found, records verified SQL
     │     └── sql_corrector_agent → Fixes SQL if validation/execution failed
+    ├── ResultDigestAgent     → Profiles large results (totals, top-k, percentiles, monthly trend) for the analyst
     └── response_agent        → Formats final business answer
 
 This agent is preserved for comparison against the Smart Planner agent.
 """
 
-from google.adk.agents import SequentialAgent, LoopAgent
+from google.adk.agents import SequentialAgent, LoopAgent, ParallelAgent
+from crm_agent.config import CLASSIC_SQL_CANDIDATES, WARMUP
+from crm_agent.warmup import start_warmup
+from google.adk.apps import App
+from crm_agent.compaction import CompactionPlugin
+from crm_agent.tracing import TracingPlugin
 from .subagents import (
     rewrite_prompt_agent,
     sql_generator_agent,
+    make_sql_candidates,
     sql_corrector_agent,
     response_agent,
     SqlValidatorAgent,
     SchemaExtractorAgent,
+    SqlLibraryAgent,
+    SqlCandidateSelectorAgent,
     SqlExecutorAgent,
     ResultVerifierAgent,
+    ResultDigestAgent,
 )
 
+# ── Startup Warm-up ─────────────────────────────────────────
+# Caches, connections and the database pages are prepared in the background
+# while the rest of the agent is built and the first request is awaited
+if WARMUP:
+    start_warmup()
+
+# ── SQL Generation ──────────────────────────────────────────
+# One architect, or K speculative ones whose best result seeds sql_loop
+if CLASSIC_SQL_CANDIDATES > 1:
+    sql_generation = [
+        ParallelAgent(sub_agents=make_sql_candidates(CLASSIC_SQL_CANDIDATES), name="sql_candidates"),
+        SqlCandidateSelectorAgent(candidates=CLASSIC_SQL_CANDIDATES),
+    ]
+else:
+    sql_generation = [sql_generator_agent]
+
 # ── SQL Validation + Execution Loop ────────────────────────
 sql_loop = LoopAgent(
     sub_agents=[
@@ -44,10 +74,21 @@ sql_loop = LoopAgent(
 root_agent = SequentialAgent(
     sub_agents=[
         SchemaExtractorAgent(),
+        SqlLibraryAgent(),
         rewrite_prompt_agent,
-        sql_generator_agent,
+        *sql_generation,
         sql_loop,
+        ResultDigestAgent(),
         response_agent,
     ],
     name="crm_agent_classic",
 )
+
+# ── App (plugins) ───────────────────────────────────────────
+# ADK web and runners pick up ``app`` first; plugins trace every stage and
+# compact each finished turn (superseded sql_loop iterations are dropped)
+app = App(
+    name="crm_agent_classic",
+    root_agent=root_agent,
+    plugins=[TracingPlugin(), CompactionPlugin(loop_agents=[a.name for a in sql_loop.sub_agents])],
+)
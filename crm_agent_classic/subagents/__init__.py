@@ -1,23 +1,32 @@
 """Subagents package."""
-from .utils import clean_sql_output, check_evaluation_success
+from .utils import clean_sql_output, check_evaluation_success, content_text, skip_on_library_hit
 from .query_analyst import rewrite_prompt_agent
-from .sql_architect import sql_generator_agent
+from .sql_architect import make_sql_candidates, sql_generator_agent
 from .sql_debugger import sql_corrector_agent
 from .business_analyst import response_agent
 from .sql_validator import SqlValidatorAgent
 from .schema_extractor import SchemaExtractorAgent
+from .sql_library import SqlLibraryAgent
+from .sql_selector import SqlCandidateSelectorAgent
 from .sql_executor import SqlExecutorAgent
 from .result_verifier import ResultVerifierAgent
+from .result_digest import ResultDigestAgent
 
 __all__ = [
     "clean_sql_output",
     "check_evaluation_success",
+    "content_text",
+    "skip_on_library_hit",
     "rewrite_prompt_agent",
     "sql_generator_agent",
+    "make_sql_candidates",
     "sql_corrector_agent",
     "response_agent",
     "SqlValidatorAgent",
     "SchemaExtractorAgent",
+    "SqlLibraryAgent",
+    "SqlCandidateSelectorAgent",
     "SqlExecutorAgent",
-    "ResultVerifierAgent"
+    "ResultVerifierAgent",
+    "ResultDigestAgent",
 ]
@@ -13,5 +13,6 @@ response_agent = Agent(
     name="business_analyst", 
     description="Communicates insights.", 
     instruction=_instruction, 
-    output_key="final_answer"
+    output_key="final_answer",
+    include_contents="none",  # Everything it needs is in the instruction; history may hold raw rows
 )
@@ -2,6 +2,7 @@
 import os
 from google.adk.agents import Agent
 from crm_agent.config import MODEL_NAME
+from ..utils import skip_on_library_hit
 
 # Load instruction from file
 _instruction_path = os.path.join(os.path.dirname(__file__), "instruction.md")
@@ -13,5 +14,6 @@ rewrite_prompt_agent = Agent(
     name="query_analyst", 
     description="Refines requirements.", 
     instruction=_instruction, 
-    output_key="rewritten_query"
+    output_key="rewritten_query",
+    before_agent_callback=skip_on_library_hit,
 )
@@ -0,0 +1,4 @@
+"""Result Digest package."""
+from .agent import ResultDigestAgent
+
+__all__ = ["ResultDigestAgent"]
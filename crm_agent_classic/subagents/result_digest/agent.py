@@ -0,0 +1,27 @@
+"""Result Digest Agent - Condenses large query results before the response agent reads them."""
+from google.adk.agents import BaseAgent
+from google.adk.events import Event
+from google.genai import types
+from crm_agent.db import digest_query, run_in_db_thread
+from ..tools import CLASSIC_GUARD
+from ..utils import content_text
+
+
+class ResultDigestAgent(BaseAgent):
+    name: str = "result_digest_agent"
+    async def _run_async_impl(self, ctx):
+        res = ctx.session.state.get("query_results", {})
+        # query_results keeps the full result for export; the analyst reads analyst_input
+        # The re-read runs under the executor's guard and stops if the invocation is cancelled
+        digest = await run_in_db_thread(digest_query, ctx.session.state.get("sql_query", ""), res,
+                                         session=ctx.session.id, guard=CLASSIC_GUARD,
+                                         session_id=ctx.session.id, cancellable=True)
+        ctx.session.state["analyst_input"] = digest
+        # The analyst reads no history (whose tool results may hold every row), so pass it the question
+        ctx.session.state["analyst_question"] = content_text(ctx.user_content)
+        if digest is res:
+            return
+        yield Event(author=self.name, content=types.Content(parts=[types.Part(text=(
+            f"∑ Digested {digest['profiled_rows']} row(s) into profiles of {len(digest['numeric'])} numeric and "
+            f"{len(digest['text'])} text column(s)" + (", with a monthly trend" if digest["trend"] else "") + "."
+        ))]))
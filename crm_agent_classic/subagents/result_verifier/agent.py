@@ -1,7 +1,20 @@
 """Result Verifier Agent - Verifies query results and controls loop termination."""
+from typing import Any, Dict, Optional
 from google.adk.agents import BaseAgent
 from google.adk.events import Event, EventActions
 from google.genai import types
+from crm_agent.db import run_in_db_thread, schema_catalog, session_results, sql_library
+from ..utils import content_text, is_first_turn
+
+
+def _remember(question: str, sql: str, hit: Optional[Dict[str, Any]], session: str) -> None:
+    """Record a verified pair, or count the reuse of the library entry it came from."""
+    if session_results.referenced(session, sql):
+        return  # Reads this conversation's results, which other sessions do not have
+    if hit and hit.get("sql") == sql:
+        sql_library.touch(hit["id"])
+    else:
+        sql_library.record(question, sql, schema_catalog.fingerprint())
 
 
 class ResultVerifierAgent(BaseAgent):
@@ -21,12 +34,22 @@ class ResultVerifierAgent(BaseAgent):
             )
         elif res.get("status") == "success" and rows:
             row_count = res.get("row_count", len(rows))
+            question = content_text(ctx.user_content) if is_first_turn(ctx) else ""
+            if question:
+                await run_in_db_thread(
+                    _remember, question, ctx.session.state.get("sql_query", ""), ctx.session.state.get("library_hit"),
+                    ctx.session.id, session_id=ctx.session.id,
+                )
             yield Event(
                 author=self.name, 
                 content=types.Content(parts=[types.Part(text=f"✓ Success: Found {row_count} matching record(s). Terminating refinement loop and proceeding to response generation.")]),
                 actions=EventActions(escalate=True)
             )
         else:
+            hit = ctx.session.state.get("library_hit")
+            if hit and hit.get("sql") == ctx.session.state.get("sql_query"):
+                # The stored query no longer answers its question; let the corrector take over
+                await run_in_db_thread(sql_library.forget, hit["id"], session_id=ctx.session.id)
             reason = "Query returned no results" if res.get("status") == "success" else f"Error: {res.get('error', 'Unknown')}"
             iteration = ctx.session.state.get("_loop_iteration", 0) + 1
             yield Event(author=self.name, content=types.Content(parts=[types.Part(text=f"⟳ Attempt {iteration}: {reason}. Broadening search filters and retrying...")]))
@@ -2,13 +2,15 @@
 from google.adk.agents import BaseAgent
 from google.adk.events import Event
 from google.genai import types
-from crm_agent.db import get_schema
+from crm_agent.db import get_compact_schema_async, schema_catalog
+from ..utils import content_text
 
 
 class SchemaExtractorAgent(BaseAgent):
     name: str = "schema_extractor_agent"
     async def _run_async_impl(self, ctx):
-        s = get_schema()
+        question = content_text(ctx.user_content)
+        s = await get_compact_schema_async(question, session_id=ctx.session.id)
         ctx.session.state["db_schema"] = s
-        table_count = s.count("CREATE TABLE")
-        yield Event(author=self.name, content=types.Content(parts=[types.Part(text=f"✓ Database Schema Loaded: Extracted schema for {table_count} table(s) from CRM database.\n\n{s}")]))
+        tables = schema_catalog.relevant_tables(question) if question else list(schema_catalog.tables)
+        yield Event(author=self.name, content=types.Content(parts=[types.Part(text=f"✓ Database Schema Loaded: {len(tables)} of {len(schema_catalog.tables)} table(s) relevant to the question: {', '.join(tables)}")]))
@@ -1,4 +1,4 @@
 """SQL Architect package."""
-from .agent import sql_generator_agent
+from .agent import candidate_key, make_sql_candidates, sql_generator_agent
 
-__all__ = ["sql_generator_agent"]
+__all__ = ["candidate_key", "make_sql_candidates", "sql_generator_agent"]
@@ -1,12 +1,12 @@
 """SQL Architect Agent - Generates SQLite queries using PlanReActPlanner."""
 import os
-from typing import Any
+from typing import Any, List, Optional
 from google.adk.agents.llm_agent import LlmAgent
 from google.adk.planners import PlanReActPlanner
+from google.genai import types
 from crm_agent.config import MODEL_NAME
-from crm_agent.db import run_sql_query
-from ..utils import extract_sql_from_text
-from crm_agent_classic.subagents.tools import find_closest_entity
+from ..utils import extract_sql_from_text, skip_on_library_hit
+from crm_agent_classic.subagents.tools import find_closest_entity, run_sql_query
 
 # Load instruction from file
 _instruction_path = os.path.join(os.path.dirname(__file__), "instruction.md")
@@ -18,8 +18,11 @@ _INSTRUCTION += "\n\nCRITICAL: Your final answer MUST be the final SQL query onl
 
 class SmartSqlArchitectAgent(LlmAgent):
     """Custom LlmAgent that saves its final answer (SQL) to session state."""
-    
+
+    sql_state_key: str = "sql_query"  # Speculative candidates each write their own key
+
     async def _run_async_impl(self, ctx):
+        ctx.session.state[self.sql_state_key] = ""  # Never leave a previous question's SQL behind
         # Run the standard LlmAgent logic (Plan -> React loop)
         # We iterate over the event stream yielded by the planner
         async for event in super()._run_async_impl(ctx):
@@ -29,7 +32,7 @@ class SmartSqlArchitectAgent(LlmAgent):
                 
                 # Clean and save to session state for the downstream loop
                 cleaned_sql = extract_sql_from_text(final_sql)
-                ctx.session.state["sql_query"] = cleaned_sql
+                ctx.session.state[self.sql_state_key] = cleaned_sql
             
             # Yield the event so the pipeline continues
             yield event
@@ -42,4 +45,40 @@ sql_generator_agent = SmartSqlArchitectAgent(
     instruction=_INSTRUCTION,
     planner=PlanReActPlanner(),
     tools=[run_sql_query, find_closest_entity],  # Added robust fuzzy tool
+    before_agent_callback=skip_on_library_hit,  # Verified SQL already in state
+)
+
+# ── Speculative Candidates ──────────────────────────────────
+# (temperature, approach hint) per candidate; the first matches sql_generator_agent
+_CANDIDATE_STYLES = (
+    (None, ""),
+    (0.7, "Approach: prefer the simplest query - one table where possible, joining only for columns that live elsewhere."),
+    (1.0, "Approach: aggregate in CTEs first, join for attributes afterwards, and check every text filter against the distinct values in the schema."),
 )
+
+
+def candidate_key(index: int) -> str:
+    """Session state key holding the SQL of candidate ``index``."""
+    return f"sql_candidate_{index}"
+
+
+def make_sql_candidates(count: int) -> List[SmartSqlArchitectAgent]:
+    """``count`` architects with varied temperature and approach, for a ``ParallelAgent``."""
+    agents = []
+    for i in range(count):
+        temperature, hint = _CANDIDATE_STYLES[i % len(_CANDIDATE_STYLES)]
+        config: Optional[types.GenerateContentConfig] = None
+        if temperature is not None:
+            config = types.GenerateContentConfig(temperature=temperature)
+        agents.append(SmartSqlArchitectAgent(
+            model=MODEL_NAME,
+            name=f"sql_architect_{i + 1}",
+            description=f"SQL candidate {i + 1} for speculative generation.",
+            instruction=_INSTRUCTION + (f"\n\n{hint}" if hint else ""),
+            planner=PlanReActPlanner(),
+            tools=[run_sql_query, find_closest_entity],
+            generate_content_config=config,
+            before_agent_callback=skip_on_library_hit,
+            sql_state_key=candidate_key(i + 1),
+        ))
+    return agents
@@ -2,7 +2,8 @@
 from google.adk.agents import BaseAgent
 from google.adk.events import Event
 from google.genai import types
-from crm_agent.db import run_sql_query
+from crm_agent.db import run_sql_query_async
+from ..tools import CLASSIC_GUARD
 
 
 class SqlExecutorAgent(BaseAgent):
@@ -11,15 +12,20 @@ class SqlExecutorAgent(BaseAgent):
         sql = ctx.session.state.get("sql_query")
         if not ctx.session.state.get("sql_valid", False):
             e = ctx.session.state.get("validation_error", "Validation failed.")
-            ctx.session.state["query_results"] = {"status": "error", "error": e}
+            ctx.session.state["query_results"] = {
+                "status": "error", "error": e, "diagnostics": ctx.session.state.get("validation_diagnostics", []),
+            }
             yield Event(author=self.name, content=types.Content(parts=[types.Part(text=f"⚠️ Cannot Execute: Query failed validation.\n\nReason: {e}")]))
             return
-        r = run_sql_query(sql)
+        r = await run_sql_query_async(sql, session_id=ctx.session.id, guard=CLASSIC_GUARD)
         ctx.session.state["query_results"] = r
         
         if r.get("status") == "success":
             row_count = r.get("row_count", 0)
             msg = f"✓ Query Executed Successfully\n\nQuery: {sql}\n\nResults: {row_count} row(s) returned"
+            if r.get("truncated"):
+                total = r.get("total_rows", row_count)
+                msg += f" (truncated from {total}{'' if r.get('total_rows_exact', True) else '+'} total)"
             if row_count > 0:
                 msg += f"\nColumns: {', '.join(r.get('columns', []))}"
             yield Event(author=self.name, content=types.Content(parts=[types.Part(text=msg)]))
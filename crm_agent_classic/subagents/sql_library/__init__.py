@@ -0,0 +1,4 @@
+"""SQL Library package."""
+from .agent import SqlLibraryAgent
+
+__all__ = ["SqlLibraryAgent"]
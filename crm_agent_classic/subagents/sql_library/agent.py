@@ -0,0 +1,27 @@
+"""SQL Library Agent - Reuses verified SQL for questions answered before."""
+from typing import Optional
+from google.adk.agents import BaseAgent
+from google.adk.events import Event
+from google.genai import types
+from crm_agent.db import LibraryMatch, run_in_db_thread, schema_catalog, sql_library
+from ..utils import content_text, is_first_turn
+
+
+def _lookup(question: str) -> Optional[LibraryMatch]:
+    return sql_library.lookup(question, schema_catalog.fingerprint())
+
+
+class SqlLibraryAgent(BaseAgent):
+    name: str = "sql_library_agent"
+    async def _run_async_impl(self, ctx):
+        state = ctx.session.state
+        state["library_hit"] = None
+        question = content_text(ctx.user_content) if is_first_turn(ctx) else ""
+        match = await run_in_db_thread(_lookup, question, session_id=ctx.session.id) if question else None
+        if match is None:
+            yield Event(author=self.name, content=types.Content(parts=[types.Part(text="No verified query on file for this question. Generating SQL.")]))
+            return
+        # Query analysis and SQL generation check library_hit and skip themselves
+        state["library_hit"] = {"id": match.id, "sql": match.sql, "question": match.question, "score": match.score}
+        state["sql_query"] = match.sql
+        yield Event(author=self.name, content=types.Content(parts=[types.Part(text=f"✓ Verified Query Reused: matches \"{match.question}\" (score {match.score:.2f}).\n\nQuery: {match.sql}")]))
@@ -0,0 +1,4 @@
+"""SQL Selector package."""
+from .agent import SqlCandidateSelectorAgent
+
+__all__ = ["SqlCandidateSelectorAgent"]
@@ -0,0 +1,94 @@
+"""SQL Selector Agent - Validates and runs speculative SQL candidates at once and picks one.
+
+The winner is chosen with ``ResultVerifierAgent``'s criteria (rows beat a
+handled "Error: ..." row, which beats an empty result, which beats a
+failure) and, among candidates with rows, by agreement: the result
+returned by the most candidates wins, ties going to the lowest-numbered
+candidate. The winner's SQL, validation and results are left in state
+exactly as the validator and executor would, so ``sql_loop`` confirms it
+from the caches, or corrects it if every candidate failed.
+"""
+import asyncio
+import hashlib
+from typing import Any, Dict, List
+from google.adk.agents import BaseAgent
+from google.adk.events import Event
+from google.genai import types
+from crm_agent.db import format_diagnostics, run_in_db_thread, run_sql_query_async, sql_key, validate_sql
+from ..sql_architect import candidate_key
+from ..tools import CLASSIC_GUARD
+
+
+def _rank(result: Dict[str, Any]) -> int:
+    rows = result.get("rows") or []
+    if result.get("status") != "success":
+        return 0
+    if len(rows) == 1 and str(rows[0][0]).lower().startswith("error"):
+        return 2
+    return 3 if rows else 1
+
+
+def _fingerprint(result: Dict[str, Any]) -> str:
+    """Order-insensitive hash of the rows, so equivalent queries agree."""
+    rows = sorted(repr(tuple(round(v, 6) if isinstance(v, float) else v for v in row)) for row in result.get("rows") or [])
+    return hashlib.sha1("\n".join(rows).encode()).hexdigest()
+
+
+class SqlCandidateSelectorAgent(BaseAgent):
+    name: str = "sql_selector_agent"
+    candidates: int = 3
+
+    async def _try(self, sql: str, session_id: str) -> Dict[str, Any]:
+        v = await run_in_db_thread(validate_sql, sql, session=session_id, session_id=session_id)
+        if v["status"] != "valid":
+            e = format_diagnostics(v["diagnostics"])
+            return {"valid": False, "error": e, "diagnostics": v["diagnostics"],
+                    "result": {"status": "error", "error": e, "diagnostics": v["diagnostics"]}}
+        # Only the winner becomes a result table, when sql_loop executes it
+        r = await run_sql_query_async(sql, session_id=session_id, guard=CLASSIC_GUARD, keep_result=False)
+        return {"valid": True, "error": None, "diagnostics": v["diagnostics"], "result": r}
+
+    async def _run_async_impl(self, ctx):
+        state = ctx.session.state
+        if state.get("library_hit"):
+            return  # The verified query is already in sql_query
+        sqls = [state.get(candidate_key(i + 1)) or "" for i in range(self.candidates)]
+        unique = {sql_key(s): s for s in sqls if s.strip() and s.strip().upper() not in ("INCORRECT", "INCORRECT;")}
+        if not unique:
+            state["sql_query"] = ""
+            yield Event(author=self.name, content=types.Content(parts=[types.Part(text="❌ No candidate produced SQL.")]))
+            return
+        keys = list(unique)
+        outcomes = dict(zip(keys, await asyncio.gather(*(self._try(unique[k], ctx.session.id) for k in keys))))
+
+        agree: Dict[str, int] = {}
+        for k in keys:
+            if _rank(outcomes[k]["result"]) == 3:
+                fp = _fingerprint(outcomes[k]["result"])
+                agree[fp] = agree.get(fp, 0) + sum(1 for s in sqls if s.strip() and sql_key(s) == k)
+
+        def score(k: str) -> tuple:
+            r = outcomes[k]["result"]
+            return _rank(r), agree.get(_fingerprint(r), 0) if _rank(r) == 3 else 0
+
+        # max() keeps the first of equals, i.e. the lowest-numbered candidate
+        best = max(keys, key=score)
+        won = outcomes[best]
+        state["sql_query"] = unique[best]
+        state["sql_valid"], state["validation_error"] = won["valid"], won["error"]
+        state["validation_diagnostics"] = won["diagnostics"]
+        state["query_results"] = won["result"]
+        summary: List[Dict[str, Any]] = []
+        for i, s in enumerate(sqls, 1):
+            r = outcomes[sql_key(s)]["result"] if s and sql_key(s) in outcomes else {"status": "missing"}
+            summary.append({"candidate": i, "status": r.get("status"), "row_count": r.get("row_count"),
+                            "chosen": bool(s) and sql_key(s) == best})
+        state["sql_candidates"] = summary
+
+        chosen = next(c["candidate"] for c in summary if c["chosen"])
+        votes = score(best)[1]
+        lines = [f"  #{c['candidate']}: {c['status']}" + (f", {c['row_count']} row(s)" if c["row_count"] is not None else "")
+                 for c in summary]
+        msg = (f"⚡ Candidate {chosen} of {self.candidates} chosen" + (f" ({votes} agree)" if votes > 1 else "")
+               + ".\n" + "\n".join(lines) + f"\n\nQuery: {unique[best]}")
+        yield Event(author=self.name, content=types.Content(parts=[types.Part(text=msg)]))
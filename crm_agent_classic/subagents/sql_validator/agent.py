@@ -1,22 +1,29 @@
-"""SQL Validator Agent - Validates SQL syntax."""
-import sqlglot
+"""SQL Validator Agent - Validates SQL syntax and resolves its tables and columns."""
 from google.adk.agents import BaseAgent
 from google.adk.events import Event
 from google.genai import types
+from crm_agent.db import format_diagnostics, run_in_db_thread, validate_sql
 
 
 class SqlValidatorAgent(BaseAgent):
     name: str = "sql_validator_agent"
     async def _run_async_impl(self, ctx):
         sql = ctx.session.state.get("sql_query")
+        ctx.session.state["validation_diagnostics"] = []
         if not sql or sql.strip().upper() in ["INCORRECT", "INCORRECT;"]:
             ctx.session.state["sql_valid"], ctx.session.state["validation_error"] = False, "Missing or invalid SQL query generated."
             yield Event(author=self.name, content=types.Content(parts=[types.Part(text="❌ Validation Failed: No valid SQL query was generated by the SQL Architect.")]))
             return
-        try:
-            sqlglot.transpile(sql, read="sqlite", write="sqlite")[0]
+        r = await run_in_db_thread(validate_sql, sql, session=ctx.session.id, session_id=ctx.session.id)
+        diagnostics = r["diagnostics"]
+        ctx.session.state["validation_diagnostics"] = diagnostics
+        if r["status"] == "valid":
             ctx.session.state["sql_valid"], ctx.session.state["validation_error"] = True, None
-            yield Event(author=self.name, content=types.Content(parts=[types.Part(text=f"✓ SQL Syntax Valid: Query passed validation checks.\n\nQuery: {sql}")]))
-        except Exception as e:
-            ctx.session.state["sql_valid"], ctx.session.state["validation_error"] = False, str(e)
-            yield Event(author=self.name, content=types.Content(parts=[types.Part(text=f"❌ SQL Syntax Error: {str(e)}\n\nProblematic Query: {sql}")]))
+            msg = f"✓ SQL Valid: Query passed syntax and schema checks.\n\nQuery: {sql}"
+            if diagnostics:
+                msg += f"\n\nWarnings:\n{format_diagnostics(diagnostics)}"
+            yield Event(author=self.name, content=types.Content(parts=[types.Part(text=msg)]))
+        else:
+            e = format_diagnostics(diagnostics)
+            ctx.session.state["sql_valid"], ctx.session.state["validation_error"] = False, e
+            yield Event(author=self.name, content=types.Content(parts=[types.Part(text=f"❌ SQL Validation Failed:\n{e}\n\nProblematic Query: {sql}")]))
@@ -1,18 +1,37 @@
-import difflib
-import sqlite3
-import os
-from typing import Optional, List
-from crm_agent.config.database import DB_PATH
+from typing import Any, Dict, Optional, List
+from google.adk.tools import ToolContext
+from crm_agent.db import ENTITY_KEYS, QueryGuard, fuzzy_index, schema_catalog, run_in_db_thread, run_sql_query_async
 
-def find_closest_entity(
+# Cost limits for every query this pipeline runs (see QUERY_GUARDS)
+CLASSIC_GUARD = QueryGuard.for_agent("crm_agent_classic")
+
+async def run_sql_query(sql: str, tool_context: ToolContext) -> Dict[str, Any]:
+    """Execute a read-only SQL query and return results.
+
+    Large results are truncated; check ``truncated`` and ``total_rows``
+    and aggregate or add a LIMIT instead of selecting raw rows.
+
+    Args:
+        sql: SQL query string to execute
+
+    Returns:
+        Dictionary with status, columns, rows, row_count, truncated and
+        total_rows on success or status and error message on failure
+    """
+    # Probes (entity lookups, DISTINCT checks) are not kept; SqlExecutorAgent keeps the answer
+    return await run_sql_query_async(sql, session_id=tool_context.session.id, guard=CLASSIC_GUARD, keep_result=False)
+
+async def find_closest_entity(
     table_name: str, 
     column_name: str, 
     search_term: str, 
+    tool_context: ToolContext,
     cutoff: float = 0.6
 ) -> str:
     """
     Finds the closest matching value in a database column for a given search term using fuzzy matching.
     This is useful for correcting typos in entity names (e.g. 'Kancode' -> 'Kan-code').
+    Account, sales_agent and product names are searched across every table holding them.
     
     Args:
         table_name: The table to search (e.g., 'accounts_3').
@@ -23,6 +42,13 @@ def find_closest_entity(
     Returns:
         A string describing the best match found, or a message if no match is found.
     """
+    return await run_in_db_thread(
+        _find_closest_entity, table_name, column_name, search_term, cutoff,
+        session_id=tool_context.session.id,
+    )
+
+def _find_closest_entity(table_name: str, column_name: str, search_term: str, cutoff: float) -> str:
+    """Synchronous body of ``find_closest_entity``; runs on the DB thread pool."""
     if not table_name or not column_name or not search_term:
         return "Error: Missing table, column, or search term."
         
@@ -32,29 +58,28 @@ def find_closest_entity(
     clean_table = table_name.strip().replace(";", "").split()[0]
     clean_column = column_name.strip().replace(";", "").split()[0]
     
-    sql = f"SELECT DISTINCT {clean_column} FROM {clean_table} WHERE {clean_column} IS NOT NULL"
-    
     try:
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        cursor.execute(sql)
-        rows = cursor.fetchall()
-        conn.close()
-        
-        # Flatten list of tuples to list of strings
-        candidates = [str(row[0]) for row in rows if row[0]]
-        
-        # Use difflib to find matching candidates
-        # n=3 to see top 3 if needed, but we'll return top 1 for simplicity of the agent
-        matches = difflib.get_close_matches(search_term, candidates, n=1, cutoff=cutoff)
+        # Entity columns (account, sales_agent, product) are searched across
+        # every table that holds them, so a name missing from one table can
+        # still be found in another.
+        if clean_column in ENTITY_KEYS:
+            index, owners = fuzzy_index.entity(clean_column)
+        else:
+            index, owners = fuzzy_index.column(clean_table, clean_column), None
+        matches = index.search(search_term, k=3, cutoff=cutoff)
         
         if matches:
-            best_match = matches[0]
-            # Calculate a quick confidence? difflib doesn't give score directly in this function.
-            # But if it passed cutoff, it's good.
-            return f"Found fuzzy match: '{best_match}' (Original search: '{search_term}')"
+            best_match, score = matches[0]
+            msg = f"Found fuzzy match: '{best_match}' (score {score:.2f}, Original search: '{search_term}')"
+            if owners is not None:
+                msg += f". Present in: {schema_catalog.summarize_tables(owners[best_match])}"
+            if len(matches) > 1:
+                msg += ". Other candidates: " + ", ".join(f"'{v}' ({s:.2f})" for v, s in matches[1:])
+            return msg
         else:
-            return f"No fuzzy match found for '{search_term}' in {clean_table}.{clean_column} (Checked {len(candidates)} values)"
+            return f"No fuzzy match found for '{search_term}' in {clean_table}.{clean_column} (Checked {len(index)} values)"
             
+    except KeyError as e:
+        return f"Error: {e.args[0]}"
     except Exception as e:
         return f"Database Error during fuzzy search: {str(e)}"
@@ -23,6 +23,20 @@ def extract_sql_from_text(text: str) -> str:
     
     return s
 
+def content_text(content: Optional[types.Content]) -> str:
+    """Concatenate the text parts of a message (e.g. the user's question)."""
+    if not content or not content.parts: return ""
+    return " ".join(p.text for p in content.parts if p.text)
+
+def is_first_turn(ctx: Any) -> bool:
+    """True when the session has no user message before the current one.
+
+    A follow-up ("and last month?") only means something together with the
+    turns before it, so it is never looked up in or recorded to the SQL
+    library.
+    """
+    return not any(e.author == "user" and e.invocation_id != ctx.invocation_id for e in ctx.session.events)
+
 def clean_sql_output(callback_context: Any, llm_response: Any, **kwargs: Any) -> Any:
     """Callback wrapper: Clean and format SQL output from LLM response."""
     r = llm_response
@@ -48,3 +62,14 @@ def check_evaluation_success(callback_context: Any) -> Optional[types.Content]:
         callback_context._event_actions.escalate = True
         return types.Content(parts=[types.Part(text="Data found. Terminating loop.")])
     return None
+
+
+def skip_on_library_hit(callback_context: Any) -> Optional[types.Content]:
+    """Before-agent callback: skip the agent when the SQL library supplied the query.
+
+    Returns:
+        Content noting the skip if ``library_hit`` is set, None otherwise
+    """
+    if callback_context.state.get("library_hit"):
+        return types.Content(parts=[types.Part(text="Skipped: reusing a verified query from the SQL library.")])
+    return None
@@ -1,5 +1,27 @@
-from . import init_db, load_data, verify
+import argparse, time
+from . import DATA_DIR, DB_PATH, load_data, print_report, print_rollup_report, refresh_orders_all, refresh_rollups, verify
 if __name__ == "__main__":
-    init_db()
-    load_data()
-    verify()
+    ap = argparse.ArgumentParser(prog="python -m data", description="Load the CSV exports into the CRM database.")
+    ap.add_argument("--db", default=DB_PATH, help="SQLite database to load into")
+    ap.add_argument("--data-dir", default=DATA_DIR, help="Directory with the CSV files")
+    ap.add_argument("--force", action="store_true", help="Reload files whose content hash is unchanged")
+    ap.add_argument("--skip-rollups", action="store_true", help="Do not refresh the pre-aggregated rollups")
+    ap.add_argument("--quiet", action="store_true", help="Skip the table summary")
+    args = ap.parse_args()
+    started = time.perf_counter()
+    reports = load_data(args.data_dir, args.db, force=args.force)
+    print_report(reports, time.perf_counter() - started)
+    orders_all = refresh_orders_all(args.db, force=args.force)
+    if orders_all["status"] == "error":
+        print(f"\norders_all: error: {orders_all['error']}")
+    elif orders_all["status"] == "refreshed":
+        print(f"\norders_all: refreshed {orders_all['rows']:,} rows from {orders_all['tables']} tables "
+              f"in {orders_all['seconds']:.3f}s")
+    else:
+        print("\norders_all: fresh")
+    if not args.skip_rollups:
+        print()
+        print_rollup_report(refresh_rollups(args.db, force=args.force))
+    if not args.quiet:
+        print()
+        verify(args.db)
@@ -0,0 +1,215 @@
+"""Rollups - Pre-aggregated cubes over the fact tables, refreshed after each load.
+
+Most questions are aggregates over a few dimensions (agent, product,
+account, month, deal stage, regional office). Each rollup in ``ROLLUPS``
+groups one fact by a set of dimensions and stores, per group, the row
+count ``n``, the non-NULL measure count ``n_value`` and the measure sum
+``sum_value``. SUM, COUNT and AVG over any subset of those dimensions,
+filtered on them, can then be answered from a few hundred rows instead
+of the base tables (``crm_agent.db.rollup`` routes such queries).
+
+Facts:
+
+- ``sales_pipeline`` with measure ``close_value``,
+- ``orders_all`` (the monthly ``<mon>_<year>_orders`` tables, one month
+  per table) with measure ``order_value`` and the ``month`` dimension
+  ('2017-03') taken from the table name.
+
+Dimensions of ``sales_teams_1`` (``manager``, ``regional_office``) join it
+on ``sales_agent``, exactly as a query joining the two would.
+
+Every rollup records the ``_ingest`` hash of each source table in
+``_rollups``. A refresh skips rollups whose sources are unchanged,
+rewrites only the months whose order table changed, and rebuilds the rest.
+"""
+import json
+import sqlite3
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from crm_agent.db.catalog import ORDERS_ALL, month_period
+
+from .loader import DB_PATH, META_TABLE as INGEST_TABLE
+
+META_TABLE = "_rollups"
+PREFIX = "_rollup_"
+# Fact -> measure column
+FACTS: Dict[str, str] = {"sales_pipeline": "close_value", ORDERS_ALL: "order_value"}
+MONTHLY_FACT = ORDERS_ALL
+JOIN_TABLE, JOIN_KEY = "sales_teams_1", "sales_agent"
+# (name, fact, dimensions); the table is PREFIX + name
+ROLLUPS: Tuple[Tuple[str, str, Tuple[str, ...]], ...] = (
+    ("pipeline_agent", "sales_pipeline", ("deal_stage", "sales_agent", "product")),
+    ("pipeline_account", "sales_pipeline", ("deal_stage", "account", "product")),
+    ("pipeline_close_date", "sales_pipeline", ("deal_stage", "close_date")),
+    ("pipeline_team", "sales_pipeline", ("deal_stage", "sales_agent", "product", "manager", "regional_office")),
+    ("orders_agent", "orders_all", ("month", "sales_agent", "product")),
+    ("orders_account", "orders_all", ("month", "account", "product")),
+    ("orders_create_date", "orders_all", ("month", "create_date")),
+    ("orders_team", "orders_all", ("month", "sales_agent", "product", "manager", "regional_office")),
+)
+
+
+def _columns(c: sqlite3.Connection, table: str) -> Dict[str, str]:
+    return {r[1]: r[2] or "" for r in c.execute(f'PRAGMA table_info("{table}")')}
+
+
+def _fact_tables(c: sqlite3.Connection, fact: str) -> Dict[str, Optional[str]]:
+    """Source table -> month period (None for an unpartitioned fact)."""
+    if fact != MONTHLY_FACT:
+        return {fact: None} if _columns(c, fact) else {}
+    names = [r[0] for r in c.execute("SELECT name FROM sqlite_master WHERE type='table'")]
+    return {n: month_period(n) for n in sorted(names) if month_period(n)}
+
+
+def _plan(c: sqlite3.Connection, fact: str, dims: Tuple[str, ...]) -> Dict[str, Any]:
+    """Sources, column types and join of one rollup, or an ``error``."""
+    tables = _fact_tables(c, fact)
+    if not tables:
+        return {"error": f"No source tables for {fact}"}
+    fact_cols = _columns(c, next(iter(tables)))
+    measure = FACTS[fact]
+    if any(_columns(c, t) != fact_cols for t in tables):
+        return {"error": f"Source tables of {fact} have different columns"}
+    join_cols = _columns(c, JOIN_TABLE)
+    types, joined = {}, False
+    for d in dims:
+        if d == "month" and fact == MONTHLY_FACT:
+            types[d] = "TEXT"
+        elif d in fact_cols:
+            types[d] = fact_cols[d]
+        elif d in join_cols and JOIN_KEY in fact_cols:
+            types[d], joined = join_cols[d], True
+        else:
+            return {"error": f"Unknown dimension {d!r} for {fact}"}
+    if measure not in fact_cols:
+        return {"error": f"{fact} has no {measure} column"}
+    hashes = dict(c.execute(f'SELECT table_name, sha256 FROM "{INGEST_TABLE}"'))
+    sources = list(tables) + ([JOIN_TABLE] if joined else [])
+    missing = [t for t in sources if t not in hashes]
+    if missing:
+        return {"error": f"Not loaded by the ingest: {', '.join(missing)}"}
+    return {"tables": tables, "types": types, "measure": measure, "measure_type": fact_cols[measure],
+            "join": joined, "sources": {t: hashes[t] for t in sources}}
+
+
+def _insert(c: sqlite3.Connection, table: str, dims: Tuple[str, ...], plan: Dict[str, Any],
+            source: str, period: Optional[str]) -> None:
+    """Aggregate one source table into the rollup."""
+    own = _columns(c, source)
+    select, params = [], []
+    for d in dims:
+        if d == "month" and period:
+            select.append("?")
+            params.append(period)
+        else:
+            select.append(f'f."{d}"' if d in own else f't."{d}"')
+    keys = ", ".join(str(i + 1) for i in range(len(dims)))
+    join = f' JOIN "{JOIN_TABLE}" t ON t."{JOIN_KEY}" = f."{JOIN_KEY}"' if plan["join"] else ""
+    m = plan["measure"]
+    c.execute(
+        f'INSERT INTO "{table}" SELECT {", ".join(select)}, COUNT(*), COUNT(f."{m}"), SUM(f."{m}") '
+        f'FROM "{source}" f{join} GROUP BY {keys}',
+        params,
+    )
+
+
+def _build(c: sqlite3.Connection, table: str, dims: Tuple[str, ...], plan: Dict[str, Any]) -> None:
+    col_defs = ", ".join(f'"{d}" {plan["types"][d]}'.strip() for d in dims)
+    saved = [r[0] for r in c.execute(
+        "SELECT sql FROM sqlite_master WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL", (table,))]
+    c.execute(f'DROP TABLE IF EXISTS "{table}"')
+    sum_def = f'"sum_value" {plan["measure_type"]}'.strip()
+    c.execute(f'CREATE TABLE "{table}" ({col_defs}, "n" INTEGER, "n_value" INTEGER, {sum_def})')
+    for source, period in plan["tables"].items():
+        _insert(c, table, dims, plan, source, period)
+    for ddl in saved:  # Keep indexes added later, e.g. by the index advisor
+        try:
+            c.execute(ddl)
+        except sqlite3.OperationalError:
+            pass
+
+
+def refresh_rollups(db_path: str = DB_PATH, force: bool = False) -> List[Dict[str, Any]]:
+    """Build or update every rollup in ``ROLLUPS`` whose sources changed.
+
+    Args:
+        db_path: Database loaded by ``load_data``
+        force: Rebuild every rollup even if its sources are unchanged
+
+    Returns:
+        One report per rollup with rollup, status ("built", "updated",
+        "fresh" or "error"), rows, months rewritten and seconds,
+        or the error message
+    """
+    c = sqlite3.connect(db_path, timeout=30, isolation_level=None)
+    reports: List[Dict[str, Any]] = []
+    try:
+        c.execute("BEGIN IMMEDIATE")
+        c.execute(
+            f'CREATE TABLE IF NOT EXISTS "{META_TABLE}" (name TEXT PRIMARY KEY, fact TEXT NOT NULL, '
+            "measure TEXT NOT NULL, dims TEXT NOT NULL, join_table TEXT, join_key TEXT, sources TEXT NOT NULL, "
+            "rows INTEGER, refreshed_at TEXT)"
+        )
+        stored = {r[0]: r[1:] for r in c.execute(f'SELECT name, fact, dims, join_table, sources FROM "{META_TABLE}"')}
+        existing = {r[0] for r in c.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+        for name, fact, dims in ROLLUPS:
+            started = time.perf_counter()
+            table = PREFIX + name
+            plan = _plan(c, fact, dims)
+            if "error" in plan:
+                reports.append({"rollup": name, "status": "error", "error": plan["error"]})
+                continue
+            join_table = JOIN_TABLE if plan["join"] else None
+            old = stored.get(name)
+            same_shape = old is not None and table in existing and old[:3] == (fact, json.dumps(dims), join_table)
+            old_sources = json.loads(old[3]) if same_shape else {}
+            months = 0
+            if same_shape and not force and old_sources == plan["sources"]:
+                reports.append({"rollup": name, "status": "fresh", "seconds": time.perf_counter() - started})
+                continue
+            partitioned = fact == MONTHLY_FACT and "month" in dims
+            if same_shape and not force and partitioned and old_sources.get(JOIN_TABLE) == plan["sources"].get(JOIN_TABLE):
+                # Only months whose order table changed, appeared or disappeared are rewritten
+                changed = [t for t in plan["tables"] if old_sources.get(t) != plan["sources"][t]]
+                removed = [t for t in old_sources if t != JOIN_TABLE and t not in plan["tables"]]
+                for t in changed + removed:
+                    c.execute(f'DELETE FROM "{table}" WHERE "month" = ?', (month_period(t),))
+                for t in changed:
+                    _insert(c, table, dims, plan, t, plan["tables"][t])
+                status, months = "updated", len(changed) + len(removed)
+            else:
+                _build(c, table, dims, plan)
+                status, months = "built", len(plan["tables"]) if partitioned else 0
+            rows = c.execute(f'SELECT COUNT(*) FROM "{table}"').fetchone()[0]
+            c.execute(
+                f"INSERT OR REPLACE INTO \"{META_TABLE}\" VALUES (?, ?, ?, ?, ?, ?, ?, ?, datetime('now'))",
+                (name, fact, plan["measure"], json.dumps(dims), join_table, JOIN_KEY if join_table else None,
+                 json.dumps(plan["sources"]), rows),
+            )
+            reports.append({"rollup": name, "status": status, "rows": rows, "months": months,
+                            "seconds": time.perf_counter() - started})
+        # Rollups no longer in ROLLUPS
+        for name in set(stored) - {r[0] for r in ROLLUPS}:
+            c.execute(f'DROP TABLE IF EXISTS "{PREFIX + name}"')
+            c.execute(f'DELETE FROM "{META_TABLE}" WHERE name = ?', (name,))
+        c.execute("COMMIT")
+    except BaseException:
+        if c.in_transaction:
+            c.execute("ROLLBACK")
+        raise
+    finally:
+        c.close()
+    return reports
+
+
+def print_rollup_report(reports: List[Dict[str, Any]]) -> None:
+    """One line per rollup."""
+    for r in reports:
+        if r["status"] == "error":
+            print(f"{PREFIX + r['rollup']:<28} error: {r['error']}")
+        elif r["status"] == "fresh":
+            print(f"{PREFIX + r['rollup']:<28} fresh")
+        else:
+            months = f"  ({r['months']} month(s))" if r["months"] else ""
+            print(f"{PREFIX + r['rollup']:<28} {r['status']:<8} {r['rows']:>8,} rows  {r['seconds']:7.3f}s{months}")